@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+PriceTracker Extraction Benchmark
+Compares the original extraction path (html.parser + soup.select) with
+ExtractionService on saved product pages, and with the JSON-LD lookup
+when --json-path is given.
+
+Usage:
+    python bench_extraction.py pages/amazon.com-echo.html pages/bestbuy.com-tv.html
+    python bench_extraction.py --selector ".price" page.html
+    python bench_extraction.py --json-path '$..offers.price' pages/walmart.com-item.html
+    python bench_extraction.py            # synthetic ~1.5 MB page
+
+Save pages with e.g. `curl -A "Mozilla/5.0" -o pages/walmart.com-item.html <url>`.
+Without --selector, the store is detected from the file name prefix using
+UrlParserService.STORE_PATTERNS.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from src.services.extraction_service import extraction_service
+from src.services.url_parser_service import UrlParserService
+
+
+def baseline_extract(html: str, selector: str):
+    """The pre-ExtractionService path from ScraperService."""
+    elements = BeautifulSoup(html, "html.parser").select(selector)
+    return elements[0].get_text() if elements else None
+
+
+def synthetic_page() -> str:
+    filler = "".join(
+        f'<div class="tile"><a href="/p/{i}"><img src="/i/{i}.jpg"><span class="name">Item {i}</span></a>'
+        f'<ul><li>Feature A</li><li>Feature B</li></ul></div>'
+        for i in range(8000)
+    )
+    return (
+        "<html><head><title>Synthetic</title>"
+        '<script type="application/ld+json">{"@context":"https://schema.org","@type":"BreadcrumbList"}</script>'
+        '<script type="application/ld+json">{"@context":"https://schema.org","@type":"Product",'
+        '"offers":{"@type":"Offer","price":"1299.99","priceCurrency":"USD"}}</script>'
+        "</head><body>"
+        f"{filler[: len(filler) // 2]}"
+        '<div class="a-price"><span class="a-offscreen">$1,299.99</span></div>'
+        f"{filler[len(filler) // 2:]}</body></html>"
+    )
+
+
+def selector_for(path: str):
+    name = os.path.basename(path).lower()
+    for domain, config in UrlParserService.STORE_PATTERNS.items():
+        if name.startswith(domain):
+            return config["selector"]
+    return None
+
+
+def structured_extract(body: bytes, json_path: str):
+    found = extraction_service.structured_data(body).find(json_path)
+    return found[0] if found else None
+
+
+def timed(fn, html, selector: str, iterations: int):
+    result = fn(html, selector)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(html, selector)
+    return result, (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="*", help="Saved HTML pages")
+    parser.add_argument("--selector", help="CSS selector (default: detect from file name)")
+    parser.add_argument("--json-path", help="Also time the JSON-LD lookup for this json_path")
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.pages:
+        cases = []
+        for path in args.pages:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                cases.append((path, f.read(), args.selector or selector_for(path)))
+    else:
+        cases = [("<synthetic>", synthetic_page(), args.selector or ".a-price .a-offscreen")]
+        args.json_path = args.json_path or "$..offers.price"
+
+    print(f"Parser backend: {extraction_service.parser}")
+    print(f"{'page':40} {'size':>9} {'baseline ms':>12} {'fast ms':>9} {'speedup':>8}  match"
+          + (f" {'json-ld ms':>11}  json-ld price" if args.json_path else ""))
+    for name, html, selector in cases:
+        if not selector:
+            print(f"{name:40} skipped (no selector; pass --selector)")
+            continue
+        base_text, base_ms = timed(baseline_extract, html, selector, args.iterations)
+        fast_text, fast_ms = timed(extraction_service.extract_text, html, selector, args.iterations)
+        line = (
+            f"{name[-40:]:40} {len(html) // 1024:>7}KB {base_ms:>12.1f} {fast_ms:>9.1f} "
+            f"{base_ms / fast_ms:>7.1f}x  {'ok' if base_text == fast_text else 'DIFF':5}"
+        )
+        if args.json_path:
+            # The scraper looks structured data up in the raw bytes, before any decoding
+            json_value, json_ms = timed(structured_extract, html.encode("utf-8"), args.json_path, args.iterations)
+            line += f" {json_ms:>11.2f}  {json_value}"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+PriceTracker Serialization Benchmark
+Compares the original price history response path (SELECT * -> dict per
+row -> camelCase dict -> jsonable_encoder -> json.dumps) with rows encoded
+by SQLite's json_object() and joined into the body as-is.
+
+Usage:
+    python bench_serialization.py                 # 10,000 rows
+    python bench_serialization.py --rows 50000 --iterations 10
+
+Runs against a throwaway database; reports CPU time and peak Python
+allocations per request, and checks both paths produce the same data.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Point the app at a scratch database before anything opens the real one
+os.environ["DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="pricetracker-bench-"), "bench.db")
+
+from fastapi.encoders import jsonable_encoder
+
+from src.repositories.database_repository import db_repo
+from src.repositories.price_repository import price_repo
+from src.services import serialization_service
+from src.services.serialization_service import json_rows_body
+
+SOURCE_ID = "bench-source"
+
+
+def baseline_record(record: dict) -> dict:
+    """The pre-json_object per-row conversion from prices_route."""
+    return {
+        "id": str(record.get("id", "")),
+        "sourceId": record.get("source_id", ""),
+        "price": record.get("price", 0),
+        "currency": record.get("currency", "USD"),
+        "fetchedAt": record.get("timestamp", ""),
+        "success": bool(record.get("scrape_success", True)),
+        "error": record.get("error_message"),
+        "lastSeen": record.get("last_seen"),
+        "seenCount": record.get("seen_count") or 1
+    }
+
+
+async def baseline_body(limit: int) -> bytes:
+    rows = await price_repo.get_history_by_source(SOURCE_ID, limit)
+    content = {"success": True, "data": [baseline_record(r) for r in rows], "nextCursor": None}
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+async def fast_body(limit: int) -> bytes:
+    rows = await price_repo.get_history_json(SOURCE_ID, limit)
+    return json_rows_body(rows, nextCursor=None)
+
+
+async def seed(rows: int) -> None:
+    schema_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "schema.sql")
+    await db_repo.init_db(schema_path)
+    await db_repo.execute(
+        "INSERT INTO products (id, name, identifier_type, identifier_value) VALUES (?, ?, ?, ?)",
+        ("bench-product", "Benchmark Product", "SKU", "BENCH-1")
+    )
+    await db_repo.execute(
+        "INSERT INTO sources (id, product_id, store_name, url) VALUES (?, ?, ?, ?)",
+        (SOURCE_ID, "bench-product", "Bench Store", "https://example.com/item")
+    )
+    start = datetime.now() - timedelta(minutes=rows)
+    # Every price differs from the last, so change-only storage keeps all rows
+    await price_repo.add_price_records([
+        (SOURCE_ID, 100 + (i % 500) / 100 + (i % 2) * 7, "USD",
+         (start + timedelta(minutes=i)).isoformat(), 1, None, None, 1)
+        for i in range(rows)
+    ])
+
+
+async def measure(build, limit: int, iterations: int):
+    body = await build(limit)
+    cpu = 0.0
+    for _ in range(iterations):
+        start = time.process_time()
+        await build(limit)
+        cpu += time.process_time() - start
+    tracemalloc.start()
+    await build(limit)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return body, cpu / iterations * 1000, peak / (1024 * 1024)
+
+
+async def run(args) -> int:
+    await seed(args.rows)
+    try:
+        base, base_ms, base_mb = await measure(baseline_body, args.rows, args.iterations)
+        fast, fast_ms, fast_mb = await measure(fast_body, args.rows, args.iterations)
+    finally:
+        await db_repo.close()
+
+    encoder = "orjson" if serialization_service.orjson is not None else "json (orjson not installed)"
+    print(f"Rows: {args.rows}  body: {len(fast) // 1024} KB  envelope encoder: {encoder}")
+    print(f"{'path':10} {'cpu ms/req':>11} {'peak alloc MB':>14}")
+    print(f"{'baseline':10} {base_ms:>11.1f} {base_mb:>14.2f}")
+    print(f"{'json_rows':10} {fast_ms:>11.1f} {fast_mb:>14.2f}")
+    print(f"speedup {base_ms / fast_ms:.1f}x, {base_mb / fast_mb:.1f}x less allocated; "
+          f"data {'ok' if json.loads(base) == json.loads(fast) else 'DIFF'}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
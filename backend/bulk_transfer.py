@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+PriceTracker Bulk Transfer
+Moves catalogs (products + sources) and price history between instances
+through the /api/bulk endpoints.
+
+Usage:
+    python bulk_transfer.py export-catalog catalog.csv
+    python bulk_transfer.py import-catalog catalog.csv [--dry-run]
+    python bulk_transfer.py export-history history.csv.gz [--source-id ID]
+    python bulk_transfer.py import-history history.csv.gz
+
+Catalog files are CSV (one row per source) or JSON lines (one product per
+line with nested "sources"), chosen by file extension (.csv / .jsonl,
+optionally .gz). Migrating an instance: export both from the old one, then
+import the catalog and then the history into the new one.
+
+Environment Variables:
+    PRICETRACKER_API_URL - Base URL of the API (default: http://localhost:8000)
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+# Configuration
+API_BASE_URL = os.environ.get("PRICETRACKER_API_URL", "http://localhost:8000")
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+
+def catalog_format(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    return "jsonl" if name.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def endpoint(path: str, **params) -> str:
+    params = {k: v for k, v in params.items() if v is not None}
+    return f"{API_BASE_URL}/api/bulk/{path}" + (f"?{urlencode(params)}" if params else "")
+
+
+def download(url: str, path: str) -> None:
+    with urlopen(url, timeout=600) as response, open(path, "wb") as f:
+        shutil.copyfileobj(response, f)
+    logger.info(f"✓ Wrote {path} ({os.path.getsize(path) // 1024} KB)")
+
+
+def upload(url: str, path: str) -> dict:
+    with open(path, "rb") as f:
+        request = Request(url, data=f.read(), method="POST", headers={"Content-Type": "application/octet-stream"})
+    with urlopen(request, timeout=600) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("export-catalog", "import-catalog", "export-history", "import-history"))
+    parser.add_argument("file")
+    parser.add_argument("--dry-run", action="store_true", help="Validate a catalog import without writing")
+    parser.add_argument("--source-id", help="Export history for one source only")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "export-catalog":
+            download(endpoint("catalog", format=catalog_format(args.file)), args.file)
+        elif args.command == "export-history":
+            download(endpoint("history", sourceId=args.source_id), args.file)
+        elif args.command == "import-catalog":
+            url = endpoint("catalog", format=catalog_format(args.file), dryRun="true" if args.dry_run else None)
+            logger.info(f"✓ {upload(url, args.file)['data']}")
+        else:
+            logger.info(f"✓ {upload(endpoint('history'), args.file)['data']}")
+        return 0
+    except HTTPError as e:
+        logger.error(f"HTTP Error {e.code}: {e.read().decode('utf-8', errors='replace')}")
+        return 1
+    except URLError as e:
+        logger.error(f"Connection failed: {e.reason}")
+        logger.error("Is the PriceTracker backend running?")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+PriceTracker Rate Limit Check
+Drives the scraper's download path against a local stub store and checks
+the politeness behaviour end to end:
+
+  - token-bucket pacing: a burst goes out at once, the rest at the set rate
+  - adaptive backoff: a 429 halves the store's rate and pauses it for the
+    Retry-After; successes win the rate back
+  - 503 with an oversized Retry-After: the pause is capped at
+    SCRAPER_MAX_RETRY_AFTER
+  - robots.txt Crawl-delay: requests are spaced by it, with no burst
+
+Usage:
+    python check_rate_limits.py
+    python check_rate_limits.py --rate 10 --burst 2
+
+Runs against a throwaway database and a stub server on 127.0.0.1 (the
+Crawl-delay store is reached as "localhost", so it gets its own limit).
+Exits non-zero if any check fails.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Point the app at a scratch database and keep the breaker out of the way
+# before anything reads the settings
+os.environ["DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="pricetracker-ratecheck-"), "check.db")
+os.environ["SCRAPER_BREAKER_THRESHOLD"] = "0"
+os.environ.setdefault("SCRAPER_MAX_RETRY_AFTER", "1.5")
+# Fast enough by default that the Crawl-delay, not the rate, spaces the robots.txt store
+os.environ.setdefault("SCRAPER_RATE_PER_SECOND", "20")
+
+CRAWL_DELAY = 0.5
+RETRY_AFTER = 1
+# Scheduling slack allowed on every timing assertion, in seconds
+SLACK = 0.06
+
+
+class StubStore(BaseHTTPRequestHandler):
+    """
+    /page*           200
+    /throttle/<code> <code> with the Retry-After in the query (?after=N) while
+                     `pending_errors` is above 0, then 200
+    /robots.txt      a Crawl-delay for Host: localhost, 404 for any other host
+    """
+    arrivals = []  # (path, host, monotonic time)
+    pending_errors = [0]
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers: dict = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        host = self.headers.get("Host", "").split(":")[0]
+        if self.path == "/robots.txt":
+            if host == "localhost":
+                self._send(200, f"User-agent: *\nCrawl-delay: {CRAWL_DELAY}\n".encode())
+            else:
+                self._send(404)
+            return
+        StubStore.arrivals.append((self.path, host, time.monotonic()))
+        if self.path.startswith("/throttle/") and StubStore.pending_errors[0] > 0:
+            StubStore.pending_errors[0] -= 1
+            path, _, query = self.path.partition("?")
+            headers = {"Retry-After": query.split("=", 1)[1]} if query.startswith("after=") else {}
+            self._send(int(path.rsplit("/", 1)[1]), headers=headers)
+            return
+        self._send(200, b"<html><body><span class='price'>$10.00</span></body></html>", {"Content-Type": "text/html"})
+
+
+class Checks:
+    def __init__(self):
+        self.failed = 0
+
+    def check(self, name: str, ok: bool, detail: str) -> None:
+        print(f"{'PASS' if ok else 'FAIL'}  {name}: {detail}")
+        if not ok:
+            self.failed += 1
+
+
+async def fetch_all(scraper_service, headers: dict, urls) -> list:
+    """Download `urls` concurrently; returns (path, arrival time) in arrival order."""
+    first = len(StubStore.arrivals)
+    await asyncio.gather(*(scraper_service._download(url, headers) for url in urls))
+    return [(path, at) for path, _, at in StubStore.arrivals[first:]]
+
+
+def gaps(arrivals: list) -> list:
+    return [round(b[1] - a[1], 3) for a, b in zip(arrivals, arrivals[1:])]
+
+
+async def run(args, port: int) -> int:
+    from src.repositories.database_repository import db_repo
+    from src.services.http_client_service import http_client_service
+    from src.services.rate_limit_service import rate_limiter, USER_AGENT, MAX_RETRY_AFTER
+    from src.services.scraper_service import scraper_service
+
+    schema_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "schema.sql")
+    await db_repo.init_db(schema_path)
+    await rate_limiter.set_policy("127.0.0.1", args.rate, args.burst, None)
+    headers = {"User-Agent": USER_AGENT}
+    base = f"http://127.0.0.1:{port}"
+    interval = 1 / args.rate
+    checks = Checks()
+
+    def current_rate(domain: str) -> float:
+        state = rate_limiter._domains[domain]
+        return round(1 / state.interval(), 4)
+
+    try:
+        # 1. Pacing: `burst` requests back to back, then one per interval
+        count = args.burst + 6
+        arrivals = await fetch_all(scraper_service, headers, [f"{base}/page{i}" for i in range(count)])
+        start = arrivals[0][1]
+        offsets = [at - start for _, at in arrivals]
+        expected = [max(0, i - args.burst + 1) * interval for i in range(count)]
+        checks.check(
+            "token bucket",
+            all(e - SLACK <= o <= e + SLACK for o, e in zip(offsets, expected)),
+            f"offsets {[round(o, 3) for o in offsets]} vs expected {[round(e, 3) for e in expected]}"
+        )
+
+        # 2. 429 with Retry-After halves the rate and pauses the store
+        StubStore.pending_errors[0] = 1
+        throttled = await fetch_all(scraper_service, headers, [f"{base}/throttle/429?after={RETRY_AFTER}"])
+        checks.check(
+            "429 halves the rate", current_rate("127.0.0.1") == round(args.rate / 2, 4),
+            f"{args.rate} -> {current_rate('127.0.0.1')} req/s"
+        )
+        after = await fetch_all(scraper_service, headers, [f"{base}/page-after-429"])
+        paused = after[0][1] - throttled[0][1]
+        checks.check("429 honours Retry-After", paused >= RETRY_AFTER - SLACK, f"next request {paused:.2f}s later")
+
+        # 3. Successes win the rate back a tenth at a time
+        await fetch_all(scraper_service, headers, [f"{base}/recover{i}" for i in range(5)])
+        checks.check(
+            "recovery after successes", current_rate("127.0.0.1") == round(args.rate, 4),
+            f"back to {current_rate('127.0.0.1')} req/s after 6 successes"
+        )
+
+        # 4. 503 with an oversized Retry-After: paused for the cap, not the header
+        StubStore.pending_errors[0] = 1
+        throttled = await fetch_all(scraper_service, headers, [f"{base}/throttle/503?after=30"])
+        after = await fetch_all(scraper_service, headers, [f"{base}/page-after-503"])
+        paused = after[0][1] - throttled[0][1]
+        checks.check(
+            "503 Retry-After capped", MAX_RETRY_AFTER - SLACK <= paused <= MAX_RETRY_AFTER + 0.5,
+            f"next request {paused:.2f}s later (cap {MAX_RETRY_AFTER}s, header 30s)"
+        )
+
+        # 5. robots.txt Crawl-delay spaces every request, burst or not
+        arrivals = await fetch_all(scraper_service, headers, [f"http://localhost:{port}/crawl{i}" for i in range(4)])
+        spacing = gaps(arrivals)
+        checks.check(
+            "robots.txt Crawl-delay", all(CRAWL_DELAY - SLACK <= g <= CRAWL_DELAY + SLACK for g in spacing),
+            f"gaps {spacing} (Crawl-delay {CRAWL_DELAY}s, default burst {os.environ.get('SCRAPER_RATE_BURST', '2')})"
+        )
+        domains = {d["domain"]: d for d in await rate_limiter.get_domains()}
+        checks.check(
+            "Crawl-delay reported", domains.get("localhost", {}).get("robots_crawl_delay") == CRAWL_DELAY,
+            f"robots_crawl_delay={domains.get('localhost', {}).get('robots_crawl_delay')}"
+        )
+    finally:
+        await http_client_service.close()
+        await db_repo.close()
+
+    print(f"{checks.failed} check(s) failed" if checks.failed else "All rate limit checks passed")
+    return 1 if checks.failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=20.0, help="requests per second for the stub store")
+    parser.add_argument("--burst", type=int, default=3)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubStore)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        return asyncio.run(run(args, server.server_address[1]))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -32,32 +32,488 @@ CREATE TABLE IF NOT EXISTS price_history (
     currency TEXT DEFAULT 'USD',
     timestamp TEXT DEFAULT (datetime('now')),
     scrape_success INTEGER DEFAULT 1,
-    error_message TEXT
+    error_message TEXT,
+    last_seen TEXT,  -- Latest scrape that repeated this result (NULL: seen once)
+    seen_count INTEGER DEFAULT 1
 );
 
 -- Indexes for common queries
-CREATE INDEX IF NOT EXISTS idx_price_history_source ON price_history(source_id);
+-- (source_id, timestamp) serves per-source history and latest-price lookups without a sort
+DROP INDEX IF EXISTS idx_price_history_source;
+CREATE INDEX IF NOT EXISTS idx_price_history_source_time ON price_history(source_id, timestamp);
 CREATE INDEX IF NOT EXISTS idx_price_history_timestamp ON price_history(timestamp);
 CREATE INDEX IF NOT EXISTS idx_sources_product ON sources(product_id);
 
+-- Latest scrape per source, kept current by the trigger below (same transaction as the insert)
+CREATE TABLE IF NOT EXISTS latest_prices (
+    source_id TEXT PRIMARY KEY REFERENCES sources(id) ON DELETE CASCADE,
+    price_history_id INTEGER NOT NULL,
+    price REAL NOT NULL,
+    currency TEXT,
+    timestamp TEXT NOT NULL,
+    scrape_success INTEGER,
+    error_message TEXT,
+    last_success_price REAL,  -- Most recent successful price (failed scrapes record 0.0)
+    last_success_at TEXT
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_price_history_latest
+AFTER INSERT ON price_history
+BEGIN
+    INSERT INTO latest_prices (
+        source_id, price_history_id, price, currency, timestamp, scrape_success, error_message,
+        last_success_price, last_success_at
+    )
+    VALUES (
+        NEW.source_id, NEW.id, NEW.price, NEW.currency, NEW.timestamp, NEW.scrape_success, NEW.error_message,
+        CASE WHEN NEW.scrape_success = 1 THEN NEW.price END,
+        CASE WHEN NEW.scrape_success = 1 THEN NEW.timestamp END
+    )
+    ON CONFLICT(source_id) DO UPDATE SET
+        price_history_id = excluded.price_history_id,
+        price = excluded.price,
+        currency = excluded.currency,
+        timestamp = excluded.timestamp,
+        scrape_success = excluded.scrape_success,
+        error_message = excluded.error_message,
+        last_success_price = COALESCE(excluded.last_success_price, latest_prices.last_success_price),
+        last_success_at = COALESCE(excluded.last_success_at, latest_prices.last_success_at)
+    WHERE excluded.timestamp >= latest_prices.timestamp;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sources_delete_latest
+AFTER DELETE ON sources
+BEGIN
+    DELETE FROM latest_prices WHERE source_id = OLD.id;
+END;
+
+-- Backfill for databases created before latest_prices existed
+INSERT OR IGNORE INTO latest_prices (
+    source_id, price_history_id, price, currency, timestamp, scrape_success, error_message,
+    last_success_price, last_success_at
+)
+SELECT
+    ph.source_id, ph.id, ph.price, ph.currency, ph.timestamp, ph.scrape_success, ph.error_message,
+    (SELECT s.price FROM price_history s
+     WHERE s.source_id = ph.source_id AND s.scrape_success = 1
+     ORDER BY s.timestamp DESC, s.id DESC LIMIT 1),
+    (SELECT s.timestamp FROM price_history s
+     WHERE s.source_id = ph.source_id AND s.scrape_success = 1
+     ORDER BY s.timestamp DESC, s.id DESC LIMIT 1)
+FROM price_history ph
+WHERE NOT EXISTS (SELECT 1 FROM latest_prices)
+  AND ph.id = (
+    SELECT p2.id FROM price_history p2
+    WHERE p2.source_id = ph.source_id
+    ORDER BY p2.timestamp DESC, p2.id DESC LIMIT 1
+  );
+
+-- Cheapest current price per product and currency across its active sources (prices
+-- in different currencies are never compared). The triggers below re-pick a
+-- product's rows from latest_prices (one row per source of that product, via
+-- idx_sources_product) whenever a source's last successful price, its currency, its
+-- is_active flag or its product changes, so reads never touch price_history.
+-- Replaces best_prices, which was keyed on product_id alone.
+DROP TRIGGER IF EXISTS trg_latest_prices_best_insert;
+DROP TRIGGER IF EXISTS trg_latest_prices_best_update;
+DROP TRIGGER IF EXISTS trg_sources_best_update;
+DROP TRIGGER IF EXISTS trg_sources_best_delete;
+DROP TRIGGER IF EXISTS trg_products_delete_best;
+DROP TABLE IF EXISTS best_prices;
+
+CREATE TABLE IF NOT EXISTS best_prices_by_currency (
+    product_id TEXT NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+    currency TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    price REAL NOT NULL,
+    price_at TEXT NOT NULL,  -- When the source last confirmed this price
+    PRIMARY KEY (product_id, currency)
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_latest_prices_best_insert
+AFTER INSERT ON latest_prices
+WHEN NEW.last_success_price IS NOT NULL
+BEGIN
+    DELETE FROM best_prices_by_currency WHERE product_id = (SELECT product_id FROM sources WHERE id = NEW.source_id);
+    INSERT INTO best_prices_by_currency (product_id, currency, source_id, price, price_at)
+    SELECT product_id, currency, source_id, last_success_price, last_success_at FROM (
+        SELECT s.product_id, COALESCE(lp.currency, 'USD') AS currency, lp.source_id, lp.last_success_price, lp.last_success_at,
+               ROW_NUMBER() OVER (
+                   PARTITION BY COALESCE(lp.currency, 'USD') ORDER BY lp.last_success_price, lp.last_success_at DESC
+               ) AS pick
+        FROM latest_prices lp JOIN sources s ON s.id = lp.source_id
+        WHERE s.product_id = (SELECT product_id FROM sources WHERE id = NEW.source_id)
+          AND s.is_active = 1 AND lp.last_success_price IS NOT NULL
+    )
+    WHERE pick = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_latest_prices_best_update
+AFTER UPDATE OF last_success_price, last_success_at, currency ON latest_prices
+WHEN NEW.last_success_price IS NOT OLD.last_success_price OR NEW.last_success_at IS NOT OLD.last_success_at
+  OR NEW.currency IS NOT OLD.currency
+BEGIN
+    DELETE FROM best_prices_by_currency WHERE product_id = (SELECT product_id FROM sources WHERE id = NEW.source_id);
+    INSERT INTO best_prices_by_currency (product_id, currency, source_id, price, price_at)
+    SELECT product_id, currency, source_id, last_success_price, last_success_at FROM (
+        SELECT s.product_id, COALESCE(lp.currency, 'USD') AS currency, lp.source_id, lp.last_success_price, lp.last_success_at,
+               ROW_NUMBER() OVER (
+                   PARTITION BY COALESCE(lp.currency, 'USD') ORDER BY lp.last_success_price, lp.last_success_at DESC
+               ) AS pick
+        FROM latest_prices lp JOIN sources s ON s.id = lp.source_id
+        WHERE s.product_id = (SELECT product_id FROM sources WHERE id = NEW.source_id)
+          AND s.is_active = 1 AND lp.last_success_price IS NOT NULL
+    )
+    WHERE pick = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sources_best_update
+AFTER UPDATE OF is_active, product_id ON sources
+BEGIN
+    DELETE FROM best_prices_by_currency WHERE product_id IN (OLD.product_id, NEW.product_id);
+    INSERT INTO best_prices_by_currency (product_id, currency, source_id, price, price_at)
+    SELECT product_id, currency, source_id, last_success_price, last_success_at FROM (
+        SELECT s.product_id, COALESCE(lp.currency, 'USD') AS currency, lp.source_id, lp.last_success_price, lp.last_success_at,
+               ROW_NUMBER() OVER (
+                   PARTITION BY s.product_id, COALESCE(lp.currency, 'USD') ORDER BY lp.last_success_price, lp.last_success_at DESC
+               ) AS pick
+        FROM latest_prices lp JOIN sources s ON s.id = lp.source_id
+        WHERE s.product_id IN (OLD.product_id, NEW.product_id)
+          AND s.is_active = 1 AND lp.last_success_price IS NOT NULL
+    )
+    WHERE pick = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sources_best_delete
+AFTER DELETE ON sources
+BEGIN
+    DELETE FROM best_prices_by_currency WHERE product_id = OLD.product_id;
+    INSERT INTO best_prices_by_currency (product_id, currency, source_id, price, price_at)
+    SELECT product_id, currency, source_id, last_success_price, last_success_at FROM (
+        SELECT s.product_id, COALESCE(lp.currency, 'USD') AS currency, lp.source_id, lp.last_success_price, lp.last_success_at,
+               ROW_NUMBER() OVER (
+                   PARTITION BY COALESCE(lp.currency, 'USD') ORDER BY lp.last_success_price, lp.last_success_at DESC
+               ) AS pick
+        FROM latest_prices lp JOIN sources s ON s.id = lp.source_id
+        WHERE s.product_id = OLD.product_id
+          AND s.is_active = 1 AND lp.last_success_price IS NOT NULL
+    )
+    WHERE pick = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_delete_best
+AFTER DELETE ON products
+BEGIN
+    DELETE FROM best_prices_by_currency WHERE product_id = OLD.id;
+END;
+
+-- Backfill for new databases and those upgraded from best_prices
+INSERT OR IGNORE INTO best_prices_by_currency (product_id, currency, source_id, price, price_at)
+SELECT product_id, currency, source_id, last_success_price, last_success_at FROM (
+    SELECT s.product_id, COALESCE(lp.currency, 'USD') AS currency, lp.source_id, lp.last_success_price, lp.last_success_at,
+           ROW_NUMBER() OVER (
+               PARTITION BY s.product_id, COALESCE(lp.currency, 'USD') ORDER BY lp.last_success_price, lp.last_success_at DESC
+           ) AS pick
+    FROM latest_prices lp JOIN sources s ON s.id = lp.source_id
+    WHERE s.is_active = 1 AND lp.last_success_price IS NOT NULL
+)
+WHERE pick = 1 AND NOT EXISTS (SELECT 1 FROM best_prices_by_currency);
+
+-- Hourly OHLC per source, built by the trigger below as successful scrapes land
+CREATE TABLE IF NOT EXISTS price_rollup_hourly (
+    source_id TEXT NOT NULL REFERENCES sources(id) ON DELETE CASCADE,
+    bucket_start TEXT NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    count INTEGER NOT NULL,
+    sum_price REAL NOT NULL,  -- For the bucket average
+    first_at TEXT NOT NULL,  -- Timestamps of the open and close samples
+    last_at TEXT NOT NULL,
+    PRIMARY KEY (source_id, bucket_start)
+);
+
+-- An imported run-length row (seen_count > 1) counts as that many observations
+DROP TRIGGER IF EXISTS trg_price_history_price_rollup_hourly;
+CREATE TRIGGER IF NOT EXISTS trg_price_history_price_rollup_hourly
+AFTER INSERT ON price_history
+WHEN NEW.scrape_success = 1
+BEGIN
+    INSERT INTO price_rollup_hourly (source_id, bucket_start, open, high, low, close, count, sum_price, first_at, last_at)
+    VALUES (
+        NEW.source_id, strftime('%Y-%m-%dT%H:00:00', NEW.timestamp),
+        NEW.price, NEW.price, NEW.price, NEW.price,
+        COALESCE(NEW.seen_count, 1), NEW.price * COALESCE(NEW.seen_count, 1), NEW.timestamp, NEW.timestamp
+    )
+    ON CONFLICT(source_id, bucket_start) DO UPDATE SET
+        open = CASE WHEN excluded.first_at < price_rollup_hourly.first_at THEN excluded.open ELSE price_rollup_hourly.open END,
+        first_at = MIN(excluded.first_at, price_rollup_hourly.first_at),
+        close = CASE WHEN excluded.last_at >= price_rollup_hourly.last_at THEN excluded.close ELSE price_rollup_hourly.close END,
+        last_at = MAX(excluded.last_at, price_rollup_hourly.last_at),
+        high = MAX(excluded.high, price_rollup_hourly.high),
+        low = MIN(excluded.low, price_rollup_hourly.low),
+        count = price_rollup_hourly.count + excluded.count,
+        sum_price = price_rollup_hourly.sum_price + excluded.sum_price;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sources_delete_price_rollup_hourly
+AFTER DELETE ON sources
+BEGIN
+    DELETE FROM price_rollup_hourly WHERE source_id = OLD.id;
+END;
+
+-- Backfill for databases created before price_rollup_hourly existed
+INSERT OR IGNORE INTO price_rollup_hourly (source_id, bucket_start, open, high, low, close, count, sum_price, first_at, last_at)
+SELECT source_id, bucket_start, open, MAX(price), MIN(price), close, SUM(seen), SUM(price * seen), MIN(timestamp), MAX(timestamp)
+FROM (
+    SELECT
+        source_id, price, timestamp, COALESCE(seen_count, 1) AS seen,
+        strftime('%Y-%m-%dT%H:00:00', timestamp) AS bucket_start,
+        FIRST_VALUE(price) OVER (
+            PARTITION BY source_id, strftime('%Y-%m-%dT%H:00:00', timestamp) ORDER BY timestamp, id
+        ) AS open,
+        FIRST_VALUE(price) OVER (
+            PARTITION BY source_id, strftime('%Y-%m-%dT%H:00:00', timestamp) ORDER BY timestamp DESC, id DESC
+        ) AS close
+    FROM price_history
+    WHERE scrape_success = 1 AND NOT EXISTS (SELECT 1 FROM price_rollup_hourly)
+)
+GROUP BY source_id, bucket_start;
+
+-- Daily OHLC per source, built by the trigger below as successful scrapes land
+CREATE TABLE IF NOT EXISTS price_rollup_daily (
+    source_id TEXT NOT NULL REFERENCES sources(id) ON DELETE CASCADE,
+    bucket_start TEXT NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    count INTEGER NOT NULL,
+    sum_price REAL NOT NULL,  -- For the bucket average
+    first_at TEXT NOT NULL,  -- Timestamps of the open and close samples
+    last_at TEXT NOT NULL,
+    PRIMARY KEY (source_id, bucket_start)
+);
+
+-- An imported run-length row (seen_count > 1) counts as that many observations
+DROP TRIGGER IF EXISTS trg_price_history_price_rollup_daily;
+CREATE TRIGGER IF NOT EXISTS trg_price_history_price_rollup_daily
+AFTER INSERT ON price_history
+WHEN NEW.scrape_success = 1
+BEGIN
+    INSERT INTO price_rollup_daily (source_id, bucket_start, open, high, low, close, count, sum_price, first_at, last_at)
+    VALUES (
+        NEW.source_id, strftime('%Y-%m-%dT00:00:00', NEW.timestamp),
+        NEW.price, NEW.price, NEW.price, NEW.price,
+        COALESCE(NEW.seen_count, 1), NEW.price * COALESCE(NEW.seen_count, 1), NEW.timestamp, NEW.timestamp
+    )
+    ON CONFLICT(source_id, bucket_start) DO UPDATE SET
+        open = CASE WHEN excluded.first_at < price_rollup_daily.first_at THEN excluded.open ELSE price_rollup_daily.open END,
+        first_at = MIN(excluded.first_at, price_rollup_daily.first_at),
+        close = CASE WHEN excluded.last_at >= price_rollup_daily.last_at THEN excluded.close ELSE price_rollup_daily.close END,
+        last_at = MAX(excluded.last_at, price_rollup_daily.last_at),
+        high = MAX(excluded.high, price_rollup_daily.high),
+        low = MIN(excluded.low, price_rollup_daily.low),
+        count = price_rollup_daily.count + excluded.count,
+        sum_price = price_rollup_daily.sum_price + excluded.sum_price;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sources_delete_price_rollup_daily
+AFTER DELETE ON sources
+BEGIN
+    DELETE FROM price_rollup_daily WHERE source_id = OLD.id;
+END;
+
+-- Backfill for databases created before price_rollup_daily existed
+INSERT OR IGNORE INTO price_rollup_daily (source_id, bucket_start, open, high, low, close, count, sum_price, first_at, last_at)
+SELECT source_id, bucket_start, open, MAX(price), MIN(price), close, SUM(seen), SUM(price * seen), MIN(timestamp), MAX(timestamp)
+FROM (
+    SELECT
+        source_id, price, timestamp, COALESCE(seen_count, 1) AS seen,
+        strftime('%Y-%m-%dT00:00:00', timestamp) AS bucket_start,
+        FIRST_VALUE(price) OVER (
+            PARTITION BY source_id, strftime('%Y-%m-%dT00:00:00', timestamp) ORDER BY timestamp, id
+        ) AS open,
+        FIRST_VALUE(price) OVER (
+            PARTITION BY source_id, strftime('%Y-%m-%dT00:00:00', timestamp) ORDER BY timestamp DESC, id DESC
+        ) AS close
+    FROM price_history
+    WHERE scrape_success = 1 AND NOT EXISTS (SELECT 1 FROM price_rollup_daily)
+)
+GROUP BY source_id, bucket_start;
+
+-- Change-only storage: a scrape that repeats the source's latest result extends that
+-- row (last_seen, seen_count) instead of adding one. Rollups and latest_prices still
+-- count the observation. RAISE(IGNORE) then drops the insert (and its AFTER triggers).
+DROP TRIGGER IF EXISTS trg_price_history_unchanged;
+CREATE TRIGGER IF NOT EXISTS trg_price_history_unchanged
+BEFORE INSERT ON price_history
+WHEN EXISTS (
+    SELECT 1 FROM latest_prices lp
+    WHERE lp.source_id = NEW.source_id
+      AND lp.price = NEW.price
+      AND lp.currency IS NEW.currency
+      AND lp.scrape_success = NEW.scrape_success
+      AND lp.error_message IS NEW.error_message
+      AND lp.timestamp <= NEW.timestamp
+)
+BEGIN
+    UPDATE price_history
+    SET last_seen = COALESCE(NEW.last_seen, NEW.timestamp),
+        seen_count = COALESCE(seen_count, 1) + COALESCE(NEW.seen_count, 1)
+    WHERE id = (SELECT price_history_id FROM latest_prices WHERE source_id = NEW.source_id);
+    UPDATE latest_prices
+    SET timestamp = NEW.timestamp,
+        last_success_at = CASE WHEN NEW.scrape_success = 1 THEN NEW.timestamp ELSE last_success_at END
+    WHERE source_id = NEW.source_id;
+    INSERT INTO price_rollup_hourly (source_id, bucket_start, open, high, low, close, count, sum_price, first_at, last_at)
+    SELECT
+        NEW.source_id, strftime('%Y-%m-%dT%H:00:00', NEW.timestamp),
+        NEW.price, NEW.price, NEW.price, NEW.price,
+        COALESCE(NEW.seen_count, 1), NEW.price * COALESCE(NEW.seen_count, 1), NEW.timestamp, NEW.timestamp
+    WHERE NEW.scrape_success = 1
+    ON CONFLICT(source_id, bucket_start) DO UPDATE SET
+        close = CASE WHEN excluded.last_at >= price_rollup_hourly.last_at THEN excluded.close ELSE price_rollup_hourly.close END,
+        last_at = MAX(excluded.last_at, price_rollup_hourly.last_at),
+        count = price_rollup_hourly.count + excluded.count,
+        sum_price = price_rollup_hourly.sum_price + excluded.sum_price;
+    INSERT INTO price_rollup_daily (source_id, bucket_start, open, high, low, close, count, sum_price, first_at, last_at)
+    SELECT
+        NEW.source_id, strftime('%Y-%m-%dT00:00:00', NEW.timestamp),
+        NEW.price, NEW.price, NEW.price, NEW.price,
+        COALESCE(NEW.seen_count, 1), NEW.price * COALESCE(NEW.seen_count, 1), NEW.timestamp, NEW.timestamp
+    WHERE NEW.scrape_success = 1
+    ON CONFLICT(source_id, bucket_start) DO UPDATE SET
+        close = CASE WHEN excluded.last_at >= price_rollup_daily.last_at THEN excluded.close ELSE price_rollup_daily.close END,
+        last_at = MAX(excluded.last_at, price_rollup_daily.last_at),
+        count = price_rollup_daily.count + excluded.count,
+        sum_price = price_rollup_daily.sum_price + excluded.sum_price;
+    SELECT RAISE(IGNORE);
+END;
+
 -- Alerts table (price drop notifications)
 CREATE TABLE IF NOT EXISTS alerts (
     id TEXT PRIMARY KEY,
     product_id TEXT NOT NULL REFERENCES products(id) ON DELETE CASCADE,
     source_id TEXT NOT NULL REFERENCES sources(id) ON DELETE CASCADE,
-    target_price REAL NOT NULL,
+    target_price REAL NOT NULL,  -- 'target' alerts only (0 for the other kinds)
     is_active INTEGER DEFAULT 1,
     is_triggered INTEGER DEFAULT 0,
     webhook_url TEXT,  -- Optional: custom webhook override (uses default if null)
     created_at TEXT DEFAULT (datetime('now')),
-    triggered_at TEXT  -- When the alert was last triggered
+    triggered_at TEXT,  -- When the alert was last triggered
+    kind TEXT NOT NULL DEFAULT 'target' CHECK (kind IN ('target', 'percent_drop', 'all_time_low', 'below_moving_average')),
+    drop_percent REAL,  -- percent_drop: minimum fall from the previous price, in %
+    window_days INTEGER  -- below_moving_average: N of the N-day moving average of daily closes
 );
 
 CREATE INDEX IF NOT EXISTS idx_alerts_source ON alerts(source_id);
 CREATE INDEX IF NOT EXISTS idx_alerts_active ON alerts(is_active);
 
+-- Rolling per-source state for the stateful alert kinds, checkpointed in the same
+-- commit as the price it has seen (see alert_state_service.py)
+CREATE TABLE IF NOT EXISTS alert_rule_state (
+    source_id TEXT PRIMARY KEY REFERENCES sources(id) ON DELETE CASCADE,
+    last_price REAL,      -- Previous successful price
+    low_price REAL,       -- All-time low
+    day TEXT,             -- Day of the latest observation (YYYY-MM-DD)
+    day_close REAL,       -- Latest price on that day
+    closes TEXT,          -- JSON array of earlier daily closes, oldest first
+    observed_at TEXT      -- Timestamp of the latest observation
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_sources_delete_alert_rule_state
+AFTER DELETE ON sources
+BEGIN
+    DELETE FROM alert_rule_state WHERE source_id = OLD.id;
+END;
+
 -- Settings table (for global config like default webhook URL)
 CREATE TABLE IF NOT EXISTS settings (
     key TEXT PRIMARY KEY,
     value TEXT NOT NULL
 );
+
+-- Page cache (conditional GET validators + last extracted price per source)
+CREATE TABLE IF NOT EXISTS source_page_cache (
+    source_id TEXT PRIMARY KEY REFERENCES sources(id) ON DELETE CASCADE,
+    etag TEXT,
+    last_modified TEXT,
+    body_digest TEXT,  -- sha256 of the last downloaded body
+    css_selector TEXT,  -- selector the cached price was extracted with
+    json_path TEXT,  -- json_path the cached price was extracted with
+    last_price REAL,
+    last_currency TEXT,  -- Currency stated in the page's structured data, if any
+    updated_at TEXT DEFAULT (datetime('now'))
+);
+
+-- Notification outbox (webhook deliveries survive restarts; retried with backoff)
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    webhook_url TEXT NOT NULL,
+    payload TEXT NOT NULL,  -- JSON body
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sent', 'failed')),
+    attempts INTEGER DEFAULT 0,
+    next_attempt_at TEXT DEFAULT (datetime('now')),
+    last_error TEXT,
+    created_at TEXT DEFAULT (datetime('now')),
+    sent_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_pending ON notification_outbox(status, next_attempt_at);
+
+-- Scrape schedule (per-source adaptive polling interval for the built-in scheduler)
+CREATE TABLE IF NOT EXISTS source_schedule (
+    source_id TEXT PRIMARY KEY REFERENCES sources(id) ON DELETE CASCADE,
+    base_interval_seconds REAL,  -- Optional per-source override of the default interval
+    interval_seconds REAL NOT NULL,  -- Current (adaptive) interval
+    next_due_at TEXT NOT NULL,
+    last_price REAL,
+    unchanged_runs INTEGER DEFAULT 0,
+    updated_at TEXT DEFAULT (datetime('now'))
+);
+
+-- Per-store politeness policy (overrides STORE_PATTERNS and the SCRAPER_RATE_* defaults; NULL = not overridden)
+CREATE TABLE IF NOT EXISTS domain_policies (
+    domain TEXT PRIMARY KEY,  -- Store domain as matched in STORE_PATTERNS (e.g. amazon.com), else the hostname
+    rate REAL,  -- Requests per second
+    burst INTEGER,  -- Requests allowed back-to-back before pacing kicks in
+    crawl_delay REAL,  -- Minimum seconds between requests
+    updated_at TEXT DEFAULT (datetime('now'))
+);
+
+-- Scrape jobs (one row per run, with per-source results and phase timings)
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+    id TEXT PRIMARY KEY,
+    trigger TEXT NOT NULL DEFAULT 'manual',  -- manual, sync, scheduler
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'completed', 'failed')),
+    total INTEGER DEFAULT 0,
+    succeeded INTEGER DEFAULT 0,
+    failed INTEGER DEFAULT 0,
+    skipped INTEGER DEFAULT 0,  -- Sources not tried because their store's circuit breaker was open
+    pages_fetched INTEGER DEFAULT 0,
+    error_message TEXT,
+    created_at TEXT DEFAULT (datetime('now')),
+    started_at TEXT,
+    finished_at TEXT,
+    elapsed_seconds REAL
+);
+
+CREATE TABLE IF NOT EXISTS scrape_job_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL REFERENCES scrape_jobs(id) ON DELETE CASCADE,
+    source_id TEXT NOT NULL,
+    host TEXT,
+    status TEXT NOT NULL,
+    price REAL,
+    error_message TEXT,
+    connect_ms REAL,  -- DNS + TCP/TLS connect (0 when a pooled connection was reused)
+    download_ms REAL,
+    parse_ms REAL,
+    db_ms REAL,
+    alert_ms REAL,
+    wait_ms REAL  -- Time spent waiting on the store's rate limit before fetching
+);
+
+CREATE INDEX IF NOT EXISTS idx_scrape_job_results_job ON scrape_job_results(job_id);
@@ -2,6 +2,8 @@
 """
 PriceTracker Scheduled Scraper
 Standalone script designed to be run via cron.
+The backend's built-in scheduler (SCHEDULER_ENABLED=true) replaces this;
+remove the cron job when enabling it so sources aren't scraped twice.
 
 Usage:
     python scrape_prices.py
@@ -55,6 +57,9 @@ def run_scraper():
         if result.get("success"):
             message = result.get("message", "Scrape job started")
             logger.info(f"✓ {message}")
+            job_id = (result.get("data") or {}).get("jobId")
+            if job_id:
+                logger.info(f"Job ID: {job_id} (progress: {API_BASE_URL}/api/scraper/jobs/{job_id})")
             logger.info("Scrape is running in the background. Check price history for results.")
             return 0
         else:
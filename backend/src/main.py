@@ -2,8 +2,13 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.routes import products_route, sources_route, scraper_route, prices_route, alerts_route, url_parser_route
+from src.routes import products_route, sources_route, scraper_route, prices_route, alerts_route, url_parser_route, bulk_route, dashboard_route
 from src.repositories.database_repository import db_repo
+from src.services.http_client_service import http_client_service
+from src.services.notification_service import notification_dispatcher
+from src.services.scheduler_service import scrape_scheduler
+from src.services.retention_service import retention_service
+from src.services.serialization_service import FastJSONResponse
 import os
 
 app = FastAPI(
@@ -11,6 +16,7 @@ app = FastAPI(
     description="Self-hosted price monitoring with global identifier tracking",
     version="0.1.0",
     redirect_slashes=False,  # Prevent 307 redirects that break Docker proxy
+    default_response_class=FastJSONResponse,
 )
 
 # CORS - allow all origins for Docker/self-hosted deployment
@@ -29,6 +35,23 @@ async def startup_event():
     schema_path = os.path.join(os.path.dirname(__file__), "schema.sql")
     if os.path.exists(schema_path):
         await db_repo.init_db(schema_path)
+    # Shared HTTP connection pool for scraping, URL parsing and webhooks
+    await http_client_service.start()
+    # Background webhook delivery (also resumes notifications pending from before a restart)
+    await notification_dispatcher.start()
+    # Built-in scrape scheduler (opt in with SCHEDULER_ENABLED=true and drop the scrape_prices.py cron job)
+    await scrape_scheduler.start()
+    # Daily price history compaction (COMPACTION_INTERVAL_SECONDS=0 disables)
+    await retention_service.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await retention_service.close()
+    await scrape_scheduler.close()
+    await notification_dispatcher.close()
+    await http_client_service.close()
+    await db_repo.close()
 
 
 @app.get("/")
@@ -49,5 +72,7 @@ app.include_router(scraper_route.router)
 app.include_router(prices_route.router)
 app.include_router(alerts_route.router)
 app.include_router(url_parser_route.router)
+app.include_router(bulk_route.router)
+app.include_router(dashboard_route.router)
 
 
@@ -1,30 +1,64 @@
-from src.repositories.database_repository import db_repo
+from src.repositories.database_repository import db_repo, WriteBatch
 from src.schemas.alert_schema import AlertCreate, AlertUpdate
+from src.services.cache_service import invalidate_after_commit
 from datetime import datetime
 from typing import List, Optional
 import uuid
 
+# An alert row as the API's camelCase JSON object
+ALERT_JSON = """
+    json_object(
+        'id', id,
+        'productId', product_id,
+        'sourceId', source_id,
+        'kind', kind,
+        'targetPrice', CASE WHEN kind = 'target' THEN target_price END,
+        'dropPercent', drop_percent,
+        'windowDays', window_days,
+        'webhookUrl', webhook_url,
+        'isActive', json(CASE WHEN is_active THEN 'true' ELSE 'false' END),
+        'isTriggered', json(CASE WHEN is_triggered THEN 'true' ELSE 'false' END),
+        'createdAt', created_at,
+        'triggeredAt', triggered_at
+    )
+"""
+
 class AlertRepository:
     async def create_alert(self, alert: AlertCreate) -> str:
         alert_id = str(uuid.uuid4())
         query = """
-            INSERT INTO alerts (id, product_id, source_id, target_price, webhook_url, is_active)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT INTO alerts
+                (id, product_id, source_id, kind, target_price, drop_percent, window_days, webhook_url, is_active)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         await db_repo.execute(query, (
             alert_id,
             alert.product_id,
             alert.source_id,
-            alert.target_price,
+            alert.kind,
+            alert.target_price if alert.kind == "target" else 0,
+            alert.drop_percent,
+            alert.window_days,
             alert.webhook_url,
             1 if alert.is_active else 0
         ))
+        invalidate_after_commit("alerts")
         return alert_id
 
     async def get_all_alerts(self) -> List[dict]:
         query = "SELECT * FROM alerts ORDER BY created_at DESC"
         return await db_repo.fetch_all(query)
 
+    async def get_alerts_json(self, product_id: Optional[str] = None, source_id: Optional[str] = None) -> List[str]:
+        """Alerts (optionally for one source, else one product), newest first, encoded as API JSON."""
+        if source_id:
+            where, values = "WHERE source_id = ?", (source_id,)
+        elif product_id:
+            where, values = "WHERE product_id = ?", (product_id,)
+        else:
+            where, values = "", ()
+        return await db_repo.fetch_values(f"SELECT {ALERT_JSON} FROM alerts {where} ORDER BY created_at DESC", values)
+
     async def get_alerts_by_product(self, product_id: str) -> List[dict]:
         query = "SELECT * FROM alerts WHERE product_id = ? ORDER BY created_at DESC"
         return await db_repo.fetch_all(query, (product_id,))
@@ -41,6 +75,16 @@ class AlertRepository:
         """
         return await db_repo.fetch_all(query, (source_id,))
 
+    async def get_active_alerts(self) -> List[dict]:
+        """Get all active, non-triggered alerts (used to build the alert index)."""
+        query = "SELECT * FROM alerts WHERE is_active = 1 AND is_triggered = 0"
+        return await db_repo.fetch_all(query)
+
+    async def has_stateful_alerts(self, source_id: str) -> bool:
+        """Whether any alert on this source (armed or not) is a kind other than 'target'."""
+        query = "SELECT 1 FROM alerts WHERE source_id = ? AND kind != 'target' LIMIT 1"
+        return await db_repo.fetch_one(query, (source_id,)) is not None
+
     async def get_alert(self, alert_id: str) -> Optional[dict]:
         query = "SELECT * FROM alerts WHERE id = ?"
         return await db_repo.fetch_one(query, (alert_id,))
@@ -57,6 +101,12 @@ class AlertRepository:
         if update.target_price is not None:
             updates.append("target_price = ?")
             params.append(update.target_price)
+        if update.drop_percent is not None:
+            updates.append("drop_percent = ?")
+            params.append(update.drop_percent)
+        if update.window_days is not None:
+            updates.append("window_days = ?")
+            params.append(update.window_days)
         if update.webhook_url is not None:
             updates.append("webhook_url = ?")
             params.append(update.webhook_url)
@@ -74,9 +124,10 @@ class AlertRepository:
         params.append(alert_id)
         query = f"UPDATE alerts SET {', '.join(updates)} WHERE id = ?"
         await db_repo.execute(query, tuple(params))
+        invalidate_after_commit("alerts")
         return True
 
-    async def trigger_alert(self, alert_id: str) -> bool:
+    async def trigger_alert(self, alert_id: str, batch: Optional[WriteBatch] = None) -> bool:
         """Mark an alert as triggered."""
         query = """
             UPDATE alerts 
@@ -84,7 +135,13 @@ class AlertRepository:
             WHERE id = ?
         """
         timestamp = datetime.now().isoformat()
-        await db_repo.execute(query, (timestamp, alert_id))
+        if batch is not None:
+            # Registered first: add() may flush (and commit) immediately
+            invalidate_after_commit("alerts", batch)
+            await batch.add(query, (timestamp, alert_id))
+        else:
+            await db_repo.execute(query, (timestamp, alert_id))
+            invalidate_after_commit("alerts")
         return True
 
     async def delete_alert(self, alert_id: str) -> bool:
@@ -93,6 +150,7 @@ class AlertRepository:
             return False
         query = "DELETE FROM alerts WHERE id = ?"
         await db_repo.execute(query, (alert_id,))
+        invalidate_after_commit("alerts")
         return True
 
     # Settings methods
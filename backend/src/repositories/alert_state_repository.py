@@ -0,0 +1,30 @@
+from src.repositories.database_repository import db_repo, WriteBatch
+from typing import Optional
+
+class AlertStateRepository:
+    async def get_state(self, source_id: str) -> Optional[dict]:
+        query = "SELECT * FROM alert_rule_state WHERE source_id = ?"
+        return await db_repo.fetch_one(query, (source_id,))
+
+    async def save_state(self, row: tuple, batch: Optional[WriteBatch] = None) -> None:
+        """Upsert a (source_id, last_price, low_price, day, day_close, closes, observed_at) row."""
+        query = """
+            INSERT INTO alert_rule_state (source_id, last_price, low_price, day, day_close, closes, observed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(source_id) DO UPDATE SET
+                last_price = excluded.last_price,
+                low_price = excluded.low_price,
+                day = excluded.day,
+                day_close = excluded.day_close,
+                closes = excluded.closes,
+                observed_at = excluded.observed_at
+        """
+        if batch is not None:
+            await batch.add(query, row)
+        else:
+            await db_repo.execute(query, row)
+
+    async def delete_state(self, source_id: str) -> None:
+        await db_repo.execute("DELETE FROM alert_rule_state WHERE source_id = ?", (source_id,))
+
+alert_state_repo = AlertStateRepository()
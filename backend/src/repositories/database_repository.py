@@ -1,48 +1,245 @@
 import aiosqlite
+import asyncio
 import os
-from typing import List, Any, Optional, Dict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import List, Any, Optional, Dict, Iterable, Tuple, Callable
 
 # Default to local path, but allow override for Docker
 DB_PATH = os.environ.get("DATABASE_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "db", "pricetracker.db"))
 
+# Read-only connections for fetch_all / fetch_one (writes use one serialized connection)
+READER_CONNECTIONS = int(os.environ.get("DB_READER_CONNECTIONS", "4"))
+
+# Applied to every connection. WAL lets readers run while the writer commits.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    f"PRAGMA cache_size = -{int(os.environ.get('DB_CACHE_SIZE_KB', '20000'))}",
+    f"PRAGMA mmap_size = {int(os.environ.get('DB_MMAP_SIZE', str(256 * 1024 * 1024)))}",
+    f"PRAGMA busy_timeout = {int(os.environ.get('DB_BUSY_TIMEOUT_MS', '5000'))}",
+)
+
+# Columns added to tables after they first shipped: (table, column, definition).
+# CREATE TABLE IF NOT EXISTS leaves existing tables alone, so init_db adds these first.
+COLUMN_MIGRATIONS = (
+    ("price_history", "last_seen", "TEXT"),
+    ("price_history", "seen_count", "INTEGER DEFAULT 1"),
+    ("alerts", "kind", "TEXT NOT NULL DEFAULT 'target' CHECK (kind IN ('target', 'percent_drop', 'all_time_low', 'below_moving_average'))"),
+    ("alerts", "drop_percent", "REAL"),
+    ("alerts", "window_days", "INTEGER"),
+    ("scrape_job_results", "wait_ms", "REAL"),
+    ("scrape_jobs", "skipped", "INTEGER DEFAULT 0"),
+    ("source_page_cache", "json_path", "TEXT"),
+    ("source_page_cache", "last_currency", "TEXT"),
+)
+
+# Set while the current task is inside DatabaseRepository.transaction()
+_in_transaction: ContextVar[bool] = ContextVar("db_in_transaction", default=False)
+# Callbacks registered with after_commit() inside the current transaction
+_commit_callbacks: ContextVar[Optional[List[Callable[[], None]]]] = ContextVar("db_commit_callbacks", default=None)
+
+class WriteBatch:
+    """
+    Buffers write statements and flushes them with executemany in one transaction.
+
+    Statements are grouped by SQL text on flush, so only buffer writes that do
+    not depend on each other's order across different statements.
+    """
+
+    def __init__(self, db: "DatabaseRepository", max_size: int = 200):
+        self._db = db
+        self.max_size = max_size
+        self._pending: List[Tuple[str, tuple]] = []
+        self._callbacks: List[Callable[[], None]] = []
+        self.commits = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def add(self, query: str, values: tuple = ()) -> None:
+        self._pending.append((query, values))
+        if len(self._pending) >= self.max_size:
+            await self.flush()
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Run `callback` once the next flush has committed."""
+        self._callbacks.append(callback)
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        # Swap the buffer out first so concurrent add() calls start a new chunk
+        pending, self._pending = self._pending, []
+        callbacks, self._callbacks = self._callbacks, []
+        grouped: Dict[str, List[tuple]] = {}
+        for query, values in pending:
+            grouped.setdefault(query, []).append(values)
+        async with self._db.transaction():
+            for query, rows in grouped.items():
+                await self._db.execute_many(query, rows)
+            for callback in callbacks:
+                self._db.after_commit(callback)
+        self.commits += 1
+
 class DatabaseRepository:
-    def __init__(self, db_path: str = DB_PATH):
+    """
+    SQLite access through one writer connection and a pool of readers.
+
+    All writes go through the single writer connection, serialized by a
+    lock. fetch_all / fetch_one borrow one of READER_CONNECTIONS read-only
+    connections, so API reads are not queued behind a long scrape commit.
+    Reads inside transaction() use the writer so they see their own writes.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, reader_count: int = READER_CONNECTIONS):
         self.db_path = db_path
+        self.reader_count = reader_count
         self._connection = None
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle_readers: Optional[asyncio.Queue] = None
+        self._connect_lock = asyncio.Lock()
+        # Serializes commits on the writer connection
+        self._write_lock = asyncio.Lock()
+
+    async def _open(self, read_only: bool = False) -> aiosqlite.Connection:
+        connection = await aiosqlite.connect(self.db_path)
+        connection.row_factory = aiosqlite.Row
+        for pragma in CONNECTION_PRAGMAS:
+            await connection.execute(pragma)
+        if read_only:
+            await connection.execute("PRAGMA query_only = 1")
+        return connection
 
     async def connect(self):
-        if not self._connection:
-            self._connection = await aiosqlite.connect(self.db_path)
-            self._connection.row_factory = aiosqlite.Row
+        if self._connection:
+            return
+        async with self._connect_lock:
+            if self._connection:
+                return
+            # Open the writer first so WAL mode is set before readers attach
+            writer = await self._open()
+            readers = [await self._open(read_only=True) for _ in range(self.reader_count)]
+            idle = asyncio.Queue()
+            for reader in readers:
+                idle.put_nowait(reader)
+            self._readers, self._idle_readers = readers, idle
+            self._connection = writer
 
     async def close(self):
         if self._connection:
+            for reader in self._readers:
+                await reader.close()
+            self._readers, self._idle_readers = [], None
             await self._connection.close()
             self._connection = None
 
+    @asynccontextmanager
+    async def _reader(self):
+        """Borrow a read connection (the writer inside a transaction or when there are no readers)."""
+        await self.connect()
+        if _in_transaction.get() or not self._readers:
+            yield self._connection
+            return
+        idle = self._idle_readers
+        reader = await idle.get()
+        try:
+            yield reader
+        finally:
+            idle.put_nowait(reader)
+
     async def execute(self, query: str, values: tuple = ()) -> aiosqlite.Cursor:
         await self.connect()
-        async with self._connection.execute(query, values) as cursor:
+        if _in_transaction.get():
+            # Part of an open unit of work; committed when it exits
+            return await self._connection.execute(query, values)
+        async with self._write_lock:
+            async with self._connection.execute(query, values) as cursor:
+                await self._connection.commit()
+                return cursor
+
+    async def execute_many(self, query: str, rows: Iterable[tuple]) -> None:
+        await self.connect()
+        if _in_transaction.get():
+            await self._connection.executemany(query, rows)
+            return
+        async with self._write_lock:
+            await self._connection.executemany(query, rows)
             await self._connection.commit()
-            return cursor
 
-    async def fetch_all(self, query: str, values: tuple = ()) -> List[dict]:
+    @asynccontextmanager
+    async def transaction(self):
+        """Unit of work: writes inside the block are committed once, or rolled back on error."""
         await self.connect()
-        async with self._connection.execute(query, values) as cursor:
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
+        if _in_transaction.get():
+            # Nested use joins the outer transaction
+            yield
+            return
+        callbacks: List[Callable[[], None]] = []
+        async with self._write_lock:
+            token = _in_transaction.set(True)
+            callbacks_token = _commit_callbacks.set(callbacks)
+            try:
+                yield
+                await self._connection.commit()
+            except BaseException:
+                await self._connection.rollback()
+                raise
+            finally:
+                _commit_callbacks.reset(callbacks_token)
+                _in_transaction.reset(token)
+        for callback in callbacks:
+            callback()
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Run `callback` once the current write is visible to readers: at the end
+        of the enclosing transaction(), or right away outside one (each
+        execute() commits before returning).
+        """
+        callbacks = _commit_callbacks.get()
+        if callbacks is not None:
+            callbacks.append(callback)
+        else:
+            callback()
+
+    def batch(self, max_size: int = 200) -> WriteBatch:
+        return WriteBatch(self, max_size)
+
+    async def fetch_all(self, query: str, values: tuple = ()) -> List[dict]:
+        async with self._reader() as connection:
+            async with connection.execute(query, values) as cursor:
+                rows = await cursor.fetchall()
+                return [dict(row) for row in rows]
 
     async def fetch_one(self, query: str, values: tuple = ()) -> Optional[dict]:
-        await self.connect()
-        async with self._connection.execute(query, values) as cursor:
-            row = await cursor.fetchone()
-            return dict(row) if row else None
+        async with self._reader() as connection:
+            async with connection.execute(query, values) as cursor:
+                row = await cursor.fetchone()
+                return dict(row) if row else None
+
+    async def fetch_values(self, query: str, values: tuple = ()) -> List[Any]:
+        """First column of every row, without building a dict per row."""
+        async with self._reader() as connection:
+            async with connection.execute(query, values) as cursor:
+                return [row[0] for row in await cursor.fetchall()]
 
     async def init_db(self, schema_path: str):
         await self.connect()
         with open(schema_path, "r") as f:
             schema = f.read()
-        await self._connection.executescript(schema)
+        async with self._write_lock:
+            await self._migrate_columns()
+            await self._connection.executescript(schema)
+
+    async def _migrate_columns(self):
+        for table, column, definition in COLUMN_MIGRATIONS:
+            async with self._connection.execute(f"PRAGMA table_info({table})") as cursor:
+                existing = {row["name"] for row in await cursor.fetchall()}
+            # No columns means the table is new; the schema creates it complete
+            if existing and column not in existing:
+                await self._connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        await self._connection.commit()
 
 # Singleton instance
 db_repo = DatabaseRepository()
@@ -0,0 +1,31 @@
+from src.repositories.database_repository import db_repo
+from datetime import datetime
+from typing import List, Optional
+
+class DomainPolicyRepository:
+    async def get_all_policies(self) -> List[dict]:
+        query = "SELECT * FROM domain_policies ORDER BY domain"
+        return await db_repo.fetch_all(query)
+
+    async def save_policy(
+        self,
+        domain: str,
+        rate: Optional[float],
+        burst: Optional[int],
+        crawl_delay: Optional[float]
+    ) -> None:
+        query = """
+            INSERT INTO domain_policies (domain, rate, burst, crawl_delay, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(domain) DO UPDATE SET
+                rate = excluded.rate,
+                burst = excluded.burst,
+                crawl_delay = excluded.crawl_delay,
+                updated_at = excluded.updated_at
+        """
+        await db_repo.execute(query, (domain, rate, burst, crawl_delay, datetime.now().isoformat()))
+
+    async def delete_policy(self, domain: str) -> None:
+        await db_repo.execute("DELETE FROM domain_policies WHERE domain = ?", (domain,))
+
+domain_policy_repo = DomainPolicyRepository()
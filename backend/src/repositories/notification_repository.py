@@ -0,0 +1,50 @@
+from src.repositories.database_repository import db_repo, WriteBatch
+from datetime import datetime
+from typing import List, Optional
+import json
+
+class NotificationRepository:
+    async def enqueue(self, webhook_url: str, payload: dict, batch: Optional[WriteBatch] = None) -> Optional[int]:
+        """Insert a pending notification; returns its id (None when buffered in `batch`)."""
+        query = """
+            INSERT INTO notification_outbox (webhook_url, payload, status, next_attempt_at)
+            VALUES (?, ?, 'pending', ?)
+        """
+        params = (webhook_url, json.dumps(payload), datetime.now().isoformat())
+        if batch is not None:
+            await batch.add(query, params)
+            return None
+        cursor = await db_repo.execute(query, params)
+        return cursor.lastrowid
+
+    async def get_due(self, limit: int = 500) -> List[dict]:
+        """Pending notifications whose next attempt is due."""
+        query = """
+            SELECT * FROM notification_outbox
+            WHERE status = 'pending' AND next_attempt_at <= ?
+            ORDER BY id LIMIT ?
+        """
+        return await db_repo.fetch_all(query, (datetime.now().isoformat(), limit))
+
+    async def mark_sent(self, ids: List[int]) -> None:
+        query = "UPDATE notification_outbox SET status = 'sent', sent_at = ? WHERE id = ?"
+        timestamp = datetime.now().isoformat()
+        await db_repo.execute_many(query, [(timestamp, notification_id) for notification_id in ids])
+
+    async def mark_retry(self, ids: List[int], next_attempt_at: str, error: str) -> None:
+        query = """
+            UPDATE notification_outbox
+            SET attempts = attempts + 1, next_attempt_at = ?, last_error = ?
+            WHERE id = ?
+        """
+        await db_repo.execute_many(query, [(next_attempt_at, error, notification_id) for notification_id in ids])
+
+    async def mark_failed(self, ids: List[int], error: str) -> None:
+        query = """
+            UPDATE notification_outbox
+            SET status = 'failed', attempts = attempts + 1, last_error = ?
+            WHERE id = ?
+        """
+        await db_repo.execute_many(query, [(error, notification_id) for notification_id in ids])
+
+notification_repo = NotificationRepository()
@@ -0,0 +1,43 @@
+from src.repositories.database_repository import db_repo, WriteBatch
+from datetime import datetime
+from typing import Optional
+
+class PageCacheRepository:
+    async def get_entry(self, source_id: str) -> Optional[dict]:
+        query = "SELECT * FROM source_page_cache WHERE source_id = ?"
+        return await db_repo.fetch_one(query, (source_id,))
+
+    async def save_entry(
+        self,
+        source_id: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        body_digest: Optional[str],
+        css_selector: Optional[str],
+        last_price: float,
+        json_path: Optional[str] = None,
+        last_currency: Optional[str] = None,
+        batch: Optional[WriteBatch] = None
+    ) -> None:
+        query = """
+            INSERT INTO source_page_cache
+                (source_id, etag, last_modified, body_digest, css_selector, json_path, last_price, last_currency, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(source_id) DO UPDATE SET
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                body_digest = excluded.body_digest,
+                css_selector = excluded.css_selector,
+                json_path = excluded.json_path,
+                last_price = excluded.last_price,
+                last_currency = excluded.last_currency,
+                updated_at = excluded.updated_at
+        """
+        timestamp = datetime.now().isoformat()
+        params = (source_id, etag, last_modified, body_digest, css_selector, json_path, last_price, last_currency, timestamp)
+        if batch is not None:
+            await batch.add(query, params)
+        else:
+            await db_repo.execute(query, params)
+
+page_cache_repo = PageCacheRepository()
@@ -1,22 +1,276 @@
-from src.repositories.database_repository import db_repo
+from src.repositories.database_repository import db_repo, WriteBatch
+from src.services.cache_service import invalidate_after_commit
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+# latest_prices columns, aliased to match a price_history row
+LATEST_COLUMNS = """
+    price_history_id AS id, source_id, price, currency, timestamp, scrape_success, error_message,
+    last_success_price, last_success_at
+"""
+
+# A price_history row as the API's camelCase JSON object, built by SQLite
+HISTORY_JSON = """
+    json_object(
+        'id', CAST(id AS TEXT),
+        'sourceId', source_id,
+        'price', price,
+        'currency', COALESCE(currency, 'USD'),
+        'fetchedAt', timestamp,
+        'success', json(CASE WHEN scrape_success THEN 'true' ELSE 'false' END),
+        'error', error_message,
+        'lastSeen', last_seen,
+        'seenCount', COALESCE(seen_count, 1)
+    )
+"""
+
+# Rows per query when streaming history; the reader is released between pages
+STREAM_PAGE_SIZE = 500
+EXPORT_PAGE_SIZE = 2000
+
+# Rollup table and bucket format (as used by the schema triggers) per resolution
+ROLLUP_TABLES = {
+    "hour": ("price_rollup_hourly", "%Y-%m-%dT%H:00:00"),
+    "day": ("price_rollup_daily", "%Y-%m-%dT00:00:00")
+}
 
 class PriceRepository:
-    async def add_price_record(self, source_id: str, price: float, success: bool = True, error: str = None) -> None:
+    async def add_price_record(
+        self,
+        source_id: str,
+        price: float,
+        success: bool = True,
+        error: str = None,
+        batch: Optional[WriteBatch] = None,
+        timestamp: Optional[str] = None,
+        currency: Optional[str] = None
+    ) -> None:
+        query = """
+            INSERT INTO price_history (source_id, price, currency, timestamp, scrape_success, error_message)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """
+        timestamp = timestamp or datetime.now().isoformat()
+        params = (source_id, price, currency or "USD", timestamp, 1 if success else 0, error)
+        if batch is not None:
+            await batch.add(query, params)
+        else:
+            await db_repo.execute(query, params)
+        if success:
+            # Successful scrapes move the rollups price stats use and may move a product's best price
+            invalidate_after_commit(f"prices:{source_id}", batch)
+            invalidate_after_commit("products", batch)
+
+    def _history_query(
+        self,
+        source_id: str,
+        before: Optional[Tuple[str, int]],
+        limit: Optional[int],
+        columns: str = "*"
+    ):
+        # Keyset pagination: walks idx_price_history_source_time backwards from the
+        # cursor, so any page costs the same no matter how far back it is
+        query = f"SELECT {columns} FROM price_history WHERE source_id = ?"
+        values: tuple = (source_id,)
+        if before is not None:
+            query += " AND (timestamp, id) < (?, ?)"
+            values += tuple(before)
+        query += " ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            values += (limit,)
+        return query, values
+
+    async def get_history_by_source(
+        self,
+        source_id: str,
+        limit: int = 100,
+        before: Optional[Tuple[str, int]] = None
+    ) -> List[dict]:
+        """Newest-first history, starting after the (timestamp, id) cursor `before`."""
+        return await db_repo.fetch_all(*self._history_query(source_id, before, limit))
+
+    async def get_history_json(
+        self,
+        source_id: str,
+        limit: int = 100,
+        before: Optional[Tuple[str, int]] = None
+    ) -> List[str]:
+        """get_history_by_source with each row already encoded as API JSON (see HISTORY_JSON)."""
+        return await db_repo.fetch_values(*self._history_query(source_id, before, limit, HISTORY_JSON))
+
+    async def iter_history_json(
+        self,
+        source_id: str,
+        before: Optional[Tuple[str, int]] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Like get_history_json, but streamed from the cursor (no limit by default).
+        Each page is a separate keyset query, so no reader connection or read
+        transaction is held while the client consumes the stream.
+        """
+        columns = f"timestamp, id, {HISTORY_JSON} AS row_json"
+        while limit is None or limit > 0:
+            page_size = STREAM_PAGE_SIZE if limit is None else min(STREAM_PAGE_SIZE, limit)
+            rows = await db_repo.fetch_all(*self._history_query(source_id, before, page_size, columns))
+            for row in rows:
+                yield row["row_json"]
+            if len(rows) < page_size:
+                return
+            before = (rows[-1]["timestamp"], rows[-1]["id"])
+            if limit is not None:
+                limit -= len(rows)
+
+    async def get_history_range(self, source_id: str, start: Optional[str], end: Optional[str]) -> List[dict]:
+        """Successful raw scrapes whose run [timestamp, last_seen] overlaps [start, end], oldest first."""
+        query = """
+            SELECT * FROM price_history
+            WHERE source_id = ? AND scrape_success = 1
+              AND COALESCE(last_seen, timestamp) >= COALESCE(?, '') AND timestamp <= COALESCE(?, '9999')
+            ORDER BY timestamp, id
+        """
+        return await db_repo.fetch_all(query, (source_id, start, end))
+
+    async def get_rollups(
+        self,
+        source_id: str,
+        resolution: str,
+        start: Optional[str],
+        end: Optional[str]
+    ) -> List[dict]:
+        """OHLC buckets overlapping [start, end], oldest first."""
+        table, bucket_format = ROLLUP_TABLES[resolution]
+        query = f"""
+            SELECT * FROM {table}
+            WHERE source_id = ?
+              AND bucket_start >= COALESCE(strftime('{bucket_format}', ?), '')
+              AND bucket_start <= COALESCE(?, '9999')
+            ORDER BY bucket_start
+        """
+        return await db_repo.fetch_all(query, (source_id, start, end))
+
+    async def get_daily_closes(self, since: str) -> List[dict]:
+        """(source_id, bucket_start, close) for every source's daily buckets since `since`."""
         query = """
-            INSERT INTO price_history (source_id, price, timestamp, scrape_success, error_message)
-            VALUES (?, ?, ?, ?, ?)
+            SELECT source_id, bucket_start, close FROM price_rollup_daily
+            WHERE bucket_start >= ?
+            ORDER BY source_id, bucket_start
         """
-        timestamp = datetime.now().isoformat()
-        await db_repo.execute(query, (source_id, price, timestamp, 1 if success else 0, error))
+        return await db_repo.fetch_all(query, (since,))
+
+    async def get_daily_closes_before(self, source_id: str, day: str, limit: int) -> List[float]:
+        """The last `limit` daily closes before `day` (YYYY-MM-DD), oldest first."""
+        query = """
+            SELECT close FROM price_rollup_daily
+            WHERE source_id = ? AND bucket_start < ?
+            ORDER BY bucket_start DESC LIMIT ?
+        """
+        rows = await db_repo.fetch_values(query, (source_id, f"{day}T00:00:00", limit))
+        rows.reverse()
+        return rows
+
+    async def get_all_time_low(self, source_id: str) -> Optional[float]:
+        """Lowest successful price ever recorded (daily rollups are never pruned)."""
+        query = "SELECT MIN(low) FROM price_rollup_daily WHERE source_id = ?"
+        return (await db_repo.fetch_values(query, (source_id,)))[0]
 
-    async def get_history_by_source(self, source_id: str, limit: int = 100) -> List[dict]:
-        query = "SELECT * FROM price_history WHERE source_id = ? ORDER BY timestamp DESC LIMIT ?"
-        return await db_repo.fetch_all(query, (source_id, limit))
+    async def get_first_timestamp(self, source_id: str) -> Optional[str]:
+        """Start of the oldest daily bucket (a cheap lower bound for the source's history)."""
+        row = await db_repo.fetch_one(
+            "SELECT MIN(bucket_start) AS first_at FROM price_rollup_daily WHERE source_id = ?",
+            (source_id,)
+        )
+        return row['first_at'] if row else None
+
+    async def iter_all_history(self, source_id: Optional[str] = None) -> AsyncIterator[dict]:
+        """Stream history per source, oldest first (for export), one keyset page per query."""
+        after: Optional[Tuple[str, str, int]] = None
+        while True:
+            query = "SELECT * FROM price_history WHERE 1 = 1"
+            values: tuple = ()
+            if source_id is not None:
+                query += " AND source_id = ?"
+                values += (source_id,)
+            if after is not None:
+                query += " AND (source_id, timestamp, id) > (?, ?, ?)"
+                values += after
+            query += " ORDER BY source_id, timestamp, id LIMIT ?"
+            rows = await db_repo.fetch_all(query, values + (EXPORT_PAGE_SIZE,))
+            for row in rows:
+                yield row
+            if len(rows) < EXPORT_PAGE_SIZE:
+                return
+            after = (rows[-1]["source_id"], rows[-1]["timestamp"], rows[-1]["id"])
+
+    async def get_history_runs(self, source_id: str, start: str, end: str) -> List[dict]:
+        """(price, timestamp, until) of the rows whose run [timestamp, last_seen] overlaps [start, end]."""
+        query = """
+            SELECT price, timestamp, COALESCE(last_seen, timestamp) AS until FROM price_history
+            WHERE source_id = ? AND COALESCE(last_seen, timestamp) >= ? AND timestamp <= ?
+        """
+        return await db_repo.fetch_all(query, (source_id, start, end))
+
+    async def add_price_records(self, rows: List[tuple]) -> None:
+        """Insert imported (source_id, price, currency, timestamp, scrape_success, error_message, last_seen, seen_count) rows."""
+        query = """
+            INSERT INTO price_history
+                (source_id, price, currency, timestamp, scrape_success, error_message, last_seen, seen_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        await db_repo.execute_many(query, rows)
+        for source_id in {row[0] for row in rows if row[4]}:
+            # Imported rows can land on any day, so cached stats series are reloaded in full
+            invalidate_after_commit(f"prices:{source_id}")
+            invalidate_after_commit(f"price_rollups:{source_id}")
+        invalidate_after_commit("products")
 
     async def get_latest_price(self, source_id: str) -> Optional[dict]:
-        query = "SELECT * FROM price_history WHERE source_id = ? ORDER BY timestamp DESC LIMIT 1"
+        query = f"SELECT {LATEST_COLUMNS} FROM latest_prices WHERE source_id = ?"
         return await db_repo.fetch_one(query, (source_id,))
 
+    async def get_latest_prices(self, source_ids: Optional[List[str]] = None) -> Dict[str, dict]:
+        """Latest scrape for every source (or the given ones), keyed by source_id."""
+        query = f"SELECT {LATEST_COLUMNS} FROM latest_prices"
+        values: tuple = ()
+        if source_ids is not None:
+            if not source_ids:
+                return {}
+            query += f" WHERE source_id IN ({', '.join('?' * len(source_ids))})"
+            values = tuple(source_ids)
+        rows = await db_repo.fetch_all(query, values)
+        return {row['source_id']: row for row in rows}
+
+    async def _delete_in_chunks(self, table: str, where: str, values: tuple, chunk_size: int) -> int:
+        """Delete matching rows one chunk per commit, so reads and scrape writes can interleave."""
+        query = f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {where} LIMIT {int(chunk_size)})"
+        deleted = 0
+        while True:
+            cursor = await db_repo.execute(query, values)
+            deleted += cursor.rowcount
+            if cursor.rowcount < chunk_size:
+                return deleted
+
+    async def prune_raw(self, before: str, chunk_size: int = 5000) -> int:
+        """Delete successful raw rows last seen before `before` (the rollups already hold them)."""
+        return await self._delete_in_chunks(
+            "price_history",
+            """scrape_success = 1 AND COALESCE(last_seen, timestamp) < ?
+               AND id NOT IN (SELECT price_history_id FROM latest_prices)""",
+            (before,), chunk_size
+        )
+
+    async def prune_errors(self, before: str, chunk_size: int = 5000) -> int:
+        """Delete failed-scrape rows last seen before `before`."""
+        return await self._delete_in_chunks(
+            "price_history",
+            """scrape_success = 0 AND COALESCE(last_seen, timestamp) < ?
+               AND id NOT IN (SELECT price_history_id FROM latest_prices)""",
+            (before,), chunk_size
+        )
+
+    async def prune_rollups(self, resolution: str, before: str, chunk_size: int = 5000) -> int:
+        """Delete rollup buckets that ended before `before`."""
+        table, _ = ROLLUP_TABLES[resolution]
+        return await self._delete_in_chunks(table, "last_at < ?", (before,), chunk_size)
+
 price_repo = PriceRepository()
@@ -1,13 +1,63 @@
 import uuid
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from src.repositories.database_repository import db_repo
 from src.schemas.product_schema import ProductCreate
+from src.services.cache_service import invalidate_after_commit
+
+# A best_prices_by_currency row (b) and its source (s) as the API's camelCase JSON object
+BEST_PRICE_JSON = """
+    json_object(
+        'productId', b.product_id,
+        'sourceId', b.source_id,
+        'storeName', s.store_name,
+        'url', s.url,
+        'price', b.price,
+        'currency', b.currency,
+        'fetchedAt', b.price_at
+    )
+"""
+
+# A product row (p) as the API's camelCase JSON object, with its cheapest
+# store per currency (empty until one of its sources has a price)
+PRODUCT_JSON = f"""
+    json_object(
+        'id', p.id,
+        'name', p.name,
+        'identifierType', p.identifier_type,
+        'identifierValue', p.identifier_value,
+        'createdAt', p.created_at,
+        'bestPrices', (
+            SELECT json_group_array(json(best)) FROM (
+                SELECT {BEST_PRICE_JSON} AS best
+                FROM best_prices_by_currency b
+                JOIN sources s ON s.id = b.source_id
+                WHERE b.product_id = p.id
+                ORDER BY b.currency
+            )
+        )
+    )
+"""
 
 class ProductRepository:
     async def get_all_products(self) -> List[dict]:
         query = "SELECT * FROM products"
         return await db_repo.fetch_all(query)
 
+    async def get_products_json(self) -> List[str]:
+        """All products with their bestPrices, each encoded as API JSON by SQLite."""
+        return await db_repo.fetch_values(f"SELECT {PRODUCT_JSON} FROM products p")
+
+    async def get_best_prices_json(self, product_id: str) -> List[str]:
+        """Cheapest current price per currency across the product's active sources, with the holding source, as API JSON."""
+        query = f"""
+            SELECT {BEST_PRICE_JSON}
+            FROM best_prices_by_currency b
+            JOIN sources s ON s.id = b.source_id
+            WHERE b.product_id = ?
+            ORDER BY b.currency
+        """
+        return await db_repo.fetch_values(query, (product_id,))
+
     async def get_product_by_id(self, product_id: str) -> Optional[dict]:
         query = "SELECT * FROM products WHERE id = ?"
         return await db_repo.fetch_one(query, (product_id,))
@@ -19,11 +69,22 @@ class ProductRepository:
             VALUES (?, ?, ?, ?)
         """
         await db_repo.execute(query, (product_id, product.name, product.identifier_type, product.identifier_value))
+        invalidate_after_commit("products")
         return product_id
 
+    async def create_products(self, rows: Iterable[tuple]) -> None:
+        """Insert many (id, name, identifier_type, identifier_value) rows with one executemany."""
+        query = """
+            INSERT INTO products (id, name, identifier_type, identifier_value)
+            VALUES (?, ?, ?, ?)
+        """
+        await db_repo.execute_many(query, rows)
+        invalidate_after_commit("products")
+
     async def delete_product(self, product_id: str) -> bool:
         query = "DELETE FROM products WHERE id = ?"
         cursor = await db_repo.execute(query, (product_id,))
+        invalidate_after_commit("products")
         return cursor.rowcount > 0
 
 product_repo = ProductRepository()
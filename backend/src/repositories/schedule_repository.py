@@ -0,0 +1,42 @@
+from src.repositories.database_repository import db_repo
+from datetime import datetime
+from typing import List, Optional
+
+class ScheduleRepository:
+    async def get_all_schedules(self) -> List[dict]:
+        query = "SELECT * FROM source_schedule"
+        return await db_repo.fetch_all(query)
+
+    async def get_schedule(self, source_id: str) -> Optional[dict]:
+        query = "SELECT * FROM source_schedule WHERE source_id = ?"
+        return await db_repo.fetch_one(query, (source_id,))
+
+    async def save_schedules(self, schedules: List[dict]) -> None:
+        """Upsert schedule rows in one transaction."""
+        query = """
+            INSERT INTO source_schedule
+                (source_id, base_interval_seconds, interval_seconds, next_due_at, last_price, unchanged_runs, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(source_id) DO UPDATE SET
+                base_interval_seconds = excluded.base_interval_seconds,
+                interval_seconds = excluded.interval_seconds,
+                next_due_at = excluded.next_due_at,
+                last_price = excluded.last_price,
+                unchanged_runs = excluded.unchanged_runs,
+                updated_at = excluded.updated_at
+        """
+        timestamp = datetime.now().isoformat()
+        await db_repo.execute_many(query, [
+            (
+                s["source_id"],
+                s.get("base_interval_seconds"),
+                s["interval_seconds"],
+                s["next_due_at"],
+                s.get("last_price"),
+                s.get("unchanged_runs", 0),
+                timestamp
+            )
+            for s in schedules
+        ])
+
+schedule_repo = ScheduleRepository()
@@ -0,0 +1,92 @@
+from src.repositories.database_repository import db_repo, WriteBatch
+from datetime import datetime
+from typing import List, Optional
+import uuid
+
+# Phase timing columns on scrape_job_results
+PHASES = ("wait_ms", "connect_ms", "download_ms", "parse_ms", "db_ms", "alert_ms")
+
+class ScrapeJobRepository:
+    async def create_job(self, trigger: str) -> str:
+        job_id = str(uuid.uuid4())
+        query = "INSERT INTO scrape_jobs (id, trigger, status) VALUES (?, ?, 'pending')"
+        await db_repo.execute(query, (job_id, trigger))
+        return job_id
+
+    async def start_job(self, job_id: str, total: int) -> None:
+        query = "UPDATE scrape_jobs SET status = 'running', total = ?, started_at = ? WHERE id = ?"
+        await db_repo.execute(query, (total, datetime.now().isoformat(), job_id))
+
+    async def finish_job(
+        self,
+        job_id: str,
+        status: str,
+        succeeded: int,
+        failed: int,
+        pages_fetched: int,
+        elapsed_seconds: float,
+        error: Optional[str] = None,
+        skipped: int = 0
+    ) -> None:
+        query = """
+            UPDATE scrape_jobs
+            SET status = ?, succeeded = ?, failed = ?, skipped = ?, pages_fetched = ?,
+                elapsed_seconds = ?, error_message = ?, finished_at = ?
+            WHERE id = ?
+        """
+        await db_repo.execute(query, (
+            status, succeeded, failed, skipped, pages_fetched, elapsed_seconds, error, datetime.now().isoformat(), job_id
+        ))
+
+    async def add_result(
+        self,
+        job_id: str,
+        source_id: str,
+        host: str,
+        status: str,
+        price: Optional[float],
+        error: Optional[str],
+        timings: dict,
+        batch: Optional[WriteBatch] = None
+    ) -> None:
+        query = f"""
+            INSERT INTO scrape_job_results (job_id, source_id, host, status, price, error_message, {', '.join(PHASES)})
+            VALUES (?, ?, ?, ?, ?, ?, {', '.join('?' for _ in PHASES)})
+        """
+        params = (job_id, source_id, host, status, price, error) + tuple(round(timings.get(p, 0.0), 2) for p in PHASES)
+        if batch is not None:
+            await batch.add(query, params)
+        else:
+            await db_repo.execute(query, params)
+
+    async def get_job(self, job_id: str) -> Optional[dict]:
+        query = "SELECT * FROM scrape_jobs WHERE id = ?"
+        return await db_repo.fetch_one(query, (job_id,))
+
+    async def get_recent_jobs(self, limit: int = 20) -> List[dict]:
+        query = "SELECT * FROM scrape_jobs ORDER BY created_at DESC, rowid DESC LIMIT ?"
+        return await db_repo.fetch_all(query, (limit,))
+
+    async def get_results(self, job_id: str) -> List[dict]:
+        query = "SELECT * FROM scrape_job_results WHERE job_id = ? ORDER BY id"
+        return await db_repo.fetch_all(query, (job_id,))
+
+    async def get_phase_totals_by_host(self, job_id: str) -> List[dict]:
+        """Summed phase timings per store host, slowest host first."""
+        sums = ", ".join(f"SUM({p}) AS {p}" for p in PHASES)
+        query = f"""
+            SELECT host, COUNT(*) AS sources, {sums}
+            FROM scrape_job_results WHERE job_id = ?
+            GROUP BY host
+            ORDER BY ({' + '.join(f'SUM({p})' for p in PHASES)}) DESC
+        """
+        return await db_repo.fetch_all(query, (job_id,))
+
+    async def prune_jobs(self, keep: int) -> None:
+        """Delete all but the newest `keep` jobs and their results."""
+        old_jobs = "SELECT id FROM scrape_jobs ORDER BY created_at DESC, rowid DESC LIMIT -1 OFFSET ?"
+        async with db_repo.transaction():
+            await db_repo.execute(f"DELETE FROM scrape_job_results WHERE job_id IN ({old_jobs})", (keep,))
+            await db_repo.execute(f"DELETE FROM scrape_jobs WHERE id IN ({old_jobs})", (keep,))
+
+scrape_job_repo = ScrapeJobRepository()
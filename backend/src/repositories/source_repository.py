@@ -1,13 +1,49 @@
 import uuid
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from src.repositories.database_repository import db_repo
 from src.schemas.source_schema import SourceCreate
+from src.services.cache_service import invalidate_after_commit
+
+# A source row as the API's camelCase JSON object (same shape as SourceResponse)
+SOURCE_JSON = """
+    json_object(
+        'productId', product_id,
+        'storeName', store_name,
+        'url', url,
+        'cssSelector', css_selector,
+        'jsonPath', json_path,
+        'isActive', json(CASE WHEN is_active THEN 'true' ELSE 'false' END),
+        'id', id,
+        'createdAt', created_at
+    )
+"""
 
 class SourceRepository:
     async def get_all_sources(self) -> List[dict]:
         query = "SELECT * FROM sources"
         return await db_repo.fetch_all(query)
 
+    async def get_sources_json(self, product_id: Optional[str] = None) -> List[str]:
+        """All sources (or one product's), each encoded as API JSON by SQLite."""
+        if product_id:
+            return await db_repo.fetch_values(f"SELECT {SOURCE_JSON} FROM sources WHERE product_id = ?", (product_id,))
+        return await db_repo.fetch_values(f"SELECT {SOURCE_JSON} FROM sources")
+
+    async def get_all_sources_with_latest(self) -> List[dict]:
+        """Every source with its latest_prices row (latest_* columns, NULL if never scraped)."""
+        query = """
+            SELECT s.*,
+                   lp.price AS latest_price,
+                   lp.timestamp AS latest_at,
+                   lp.scrape_success AS latest_success,
+                   lp.error_message AS latest_error,
+                   lp.last_success_price AS latest_success_price,
+                   lp.last_success_at AS latest_success_at
+            FROM sources s
+            LEFT JOIN latest_prices lp ON lp.source_id = s.id
+        """
+        return await db_repo.fetch_all(query)
+
     async def get_sources_by_product(self, product_id: str) -> List[dict]:
         query = "SELECT * FROM sources WHERE product_id = ?"
         return await db_repo.fetch_all(query, (product_id,))
@@ -31,11 +67,23 @@ class SourceRepository:
             source.json_path, 
             1 if source.is_active else 0
         ))
+        invalidate_after_commit("sources")
         return source_id
 
+    async def create_sources(self, rows: Iterable[tuple]) -> None:
+        """Insert many (id, product_id, store_name, url, css_selector, json_path, is_active) rows."""
+        query = """
+            INSERT INTO sources (id, product_id, store_name, url, css_selector, json_path, is_active)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """
+        await db_repo.execute_many(query, rows)
+        invalidate_after_commit("sources")
+
     async def delete_source(self, source_id: str) -> bool:
         query = "DELETE FROM sources WHERE id = ?"
         cursor = await db_repo.execute(query, (source_id,))
+        invalidate_after_commit("sources")
+        invalidate_after_commit("products")  # Its product's best price is re-picked
         return cursor.rowcount > 0
 
 source_repo = SourceRepository()
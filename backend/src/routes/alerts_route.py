@@ -1,36 +1,20 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from src.services.alert_service import alert_service
+from src.services.cache_service import response_cache
+from src.services.serialization_service import json_rows_body
 from src.schemas.alert_schema import AlertCreate, AlertUpdate, AlertResponse
 from typing import Optional
 
 router = APIRouter(prefix="/api/alerts", tags=["alerts"])
 
 @router.get("/")
-async def list_alerts(productId: Optional[str] = None, sourceId: Optional[str] = None):
+async def list_alerts(request: Request, productId: Optional[str] = None, sourceId: Optional[str] = None):
     """List all alerts, optionally filtered by product or source."""
-    if sourceId:
-        alerts = await alert_service.get_alerts_by_source(sourceId)
-    elif productId:
-        alerts = await alert_service.get_alerts_by_product(productId)
-    else:
-        alerts = await alert_service.get_all_alerts()
-    
-    # Convert to camelCase response
-    response_data = [
-        {
-            "id": a.get("id"),
-            "productId": a.get("product_id"),
-            "sourceId": a.get("source_id"),
-            "targetPrice": a.get("target_price"),
-            "webhookUrl": a.get("webhook_url"),
-            "isActive": bool(a.get("is_active", True)),
-            "isTriggered": bool(a.get("is_triggered", False)),
-            "createdAt": a.get("created_at"),
-            "triggeredAt": a.get("triggered_at")
-        }
-        for a in alerts
-    ]
-    return {"success": True, "data": response_data}
+    async def build():
+        # Rows come back as camelCase JSON straight from SQLite
+        return json_rows_body(await alert_service.get_alerts_json(productId, sourceId))
+    # Cached until an alert is created, updated, triggered or deleted; honours If-None-Match
+    return await response_cache.cached_json(request, "alerts", (productId, sourceId), build)
 
 @router.post("/")
 async def create_alert(alert: AlertCreate):
@@ -49,7 +33,10 @@ async def get_alert(alert_id: str):
         "id": alert.get("id"),
         "productId": alert.get("product_id"),
         "sourceId": alert.get("source_id"),
-        "targetPrice": alert.get("target_price"),
+        "kind": alert.get("kind", "target"),
+        "targetPrice": alert.get("target_price") if alert.get("kind", "target") == "target" else None,
+        "dropPercent": alert.get("drop_percent"),
+        "windowDays": alert.get("window_days"),
         "webhookUrl": alert.get("webhook_url"),
         "isActive": bool(alert.get("is_active", True)),
         "isTriggered": bool(alert.get("is_triggered", False)),
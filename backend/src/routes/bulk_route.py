@@ -0,0 +1,53 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from src.services.bulk_service import bulk_service, BulkImportError, CATALOG_FORMATS
+
+router = APIRouter(prefix="/api/bulk", tags=["bulk"])
+
+def _check_format(format: str) -> None:
+    if format not in CATALOG_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(CATALOG_FORMATS)}")
+
+@router.post("/catalog")
+async def import_catalog(request: Request, format: str = "csv", dryRun: bool = False):
+    """Import products and sources from a CSV or JSON-lines body (optionally gzipped)."""
+    _check_format(format)
+    try:
+        summary = await bulk_service.import_catalog(await request.body(), format, dry_run=dryRun)
+    except BulkImportError as e:
+        raise HTTPException(status_code=400, detail={"message": str(e), "errors": e.errors})
+    except (UnicodeDecodeError, OSError):
+        raise HTTPException(status_code=400, detail="Body must be UTF-8 text (optionally gzipped)")
+    return {"success": True, "data": {**summary, "dryRun": dryRun}}
+
+@router.get("/catalog")
+async def export_catalog(format: str = "csv"):
+    _check_format(format)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        bulk_service.export_catalog(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="catalog.{format}"'}
+    )
+
+@router.get("/history")
+async def export_history(sourceId: Optional[str] = None):
+    """Full price history as gzip-compressed CSV, streamed."""
+    return StreamingResponse(
+        bulk_service.export_history(sourceId),
+        media_type="application/gzip",
+        headers={"Content-Disposition": 'attachment; filename="price_history.csv.gz"'}
+    )
+
+@router.post("/history")
+async def import_history(request: Request):
+    """Import a history CSV produced by GET /api/bulk/history (gzipped or plain)."""
+    try:
+        summary = await bulk_service.import_history(await request.body())
+    except BulkImportError as e:
+        raise HTTPException(status_code=400, detail={"message": str(e), "errors": e.errors})
+    except (UnicodeDecodeError, OSError):
+        raise HTTPException(status_code=400, detail="Body must be CSV text (optionally gzipped)")
+    return {"success": True, "data": summary}
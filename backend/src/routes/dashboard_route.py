@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Query
+from src.services.dashboard_service import dashboard_service, DEFAULT_SPARKLINE_DAYS, MAX_SPARKLINE_DAYS
+
+router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+
+def _alert_to_camel(a: dict) -> dict:
+    return {
+        "id": a.get("id"),
+        "productId": a.get("product_id"),
+        "sourceId": a.get("source_id"),
+        "kind": a.get("kind", "target"),
+        "targetPrice": a.get("target_price") if a.get("kind", "target") == "target" else None,
+        "dropPercent": a.get("drop_percent"),
+        "windowDays": a.get("window_days"),
+        "webhookUrl": a.get("webhook_url"),
+        "isActive": bool(a.get("is_active", True)),
+        "isTriggered": bool(a.get("is_triggered", False)),
+        "createdAt": a.get("created_at"),
+        "triggeredAt": a.get("triggered_at")
+    }
+
+def _source_to_camel(s: dict) -> dict:
+    alerts = s["alerts"]
+    armed = [a for a in alerts if a["is_active"] and not a["is_triggered"]]
+    active_targets = [a["target_price"] for a in armed if a.get("kind", "target") == "target"]
+    latest = None
+    if s["latest_at"] is not None:
+        latest = {
+            "price": s["latest_price"],
+            "fetchedAt": s["latest_at"],
+            "success": bool(s["latest_success"]),
+            "error": s["latest_error"],
+            "lastSuccessPrice": s["latest_success_price"],
+            "lastSuccessAt": s["latest_success_at"]
+        }
+    return {
+        "id": s["id"],
+        "productId": s["product_id"],
+        "storeName": s["store_name"],
+        "url": s["url"],
+        "cssSelector": s["css_selector"],
+        "jsonPath": s["json_path"],
+        "isActive": bool(s["is_active"]),
+        "latestPrice": latest,
+        "alertState": {
+            "active": len(armed),
+            "triggered": sum(1 for a in alerts if a["is_triggered"]),
+            "lowestTarget": min(active_targets) if active_targets else None
+        },
+        "alerts": [_alert_to_camel(a) for a in alerts],
+        # Daily closing prices, oldest first
+        "sparkline": s["sparkline"]
+    }
+
+@router.get("")
+async def get_dashboard(sparklineDays: int = Query(DEFAULT_SPARKLINE_DAYS, ge=1, le=MAX_SPARKLINE_DAYS)):
+    """Products with their sources, latest prices, alert state and sparklines in one response."""
+    products = await dashboard_service.get_dashboard(sparklineDays)
+    data = [
+        {
+            "id": p["id"],
+            "name": p["name"],
+            "identifierType": p["identifier_type"],
+            "identifierValue": p["identifier_value"],
+            "createdAt": p.get("created_at"),
+            "sources": [_source_to_camel(s) for s in p["sources"]]
+        }
+        for p in products
+    ]
+    return {"success": True, "data": data}
@@ -1,24 +1,89 @@
-from fastapi import APIRouter
-from src.services.price_service import price_service
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from src.services.price_service import price_service, decode_cursor, RESOLUTIONS
+from src.services.serialization_service import JSONRowsResponse
+from src.services.stats_service import stats_service
 
 router = APIRouter(prefix="/api/prices", tags=["prices"])
 
-@router.get("/{source_id}")
-async def get_price_history(source_id: str):
-    data = await price_service.get_history(source_id)
-    
+def _record_to_camel(record: dict) -> dict:
     # Convert snake_case to camelCase for frontend
-    camel_case_data = [
-        {
-            "id": str(record.get("id", "")),
-            "sourceId": record.get("source_id", ""),
-            "price": record.get("price", 0),
-            "currency": record.get("currency", "USD"),
-            "fetchedAt": record.get("timestamp", ""),
-            "success": bool(record.get("scrape_success", True)),
-            "error": record.get("error_message")
-        }
-        for record in data
-    ]
-    
-    return {"success": True, "data": camel_case_data}
+    return {
+        "id": str(record.get("id", "")),
+        "sourceId": record.get("source_id", ""),
+        "price": record.get("price", 0),
+        "currency": record.get("currency", "USD"),
+        "fetchedAt": record.get("timestamp", ""),
+        "success": bool(record.get("scrape_success", True)),
+        "error": record.get("error_message"),
+        "lastSeen": record.get("last_seen"),
+        "seenCount": record.get("seen_count") or 1
+    }
+
+def _bucket_to_camel(bucket: dict) -> dict:
+    # price/fetchedAt mirror a raw record (bucket close) so charts can plot either shape
+    return {
+        "sourceId": bucket["source_id"],
+        "fetchedAt": bucket["bucket_start"],
+        "price": bucket["close"],
+        "open": bucket["open"],
+        "high": bucket["high"],
+        "low": bucket["low"],
+        "close": bucket["close"],
+        "avg": round(bucket["sum_price"] / bucket["count"], 2),
+        "count": bucket["count"],
+        "firstAt": bucket["first_at"],
+        "lastAt": bucket["last_at"]
+    }
+
+async def _ndjson_lines(rows):
+    async for row in rows:
+        yield row + "\n"
+
+@router.get("/{source_id}/stats")
+async def get_price_stats(source_id: str, days: Optional[int] = Query(None, ge=1)):
+    """Min/max/mean/median/percentiles, volatility and drop from peak over the last `days` days (default: all)."""
+    stats = await stats_service.get_source_stats(source_id, days)
+    return {"success": True, "data": {"sourceId": source_id, "days": days, **stats}}
+
+@router.get("/{source_id}")
+async def get_price_history(
+    source_id: str,
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    resolution: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    format: str = "json"
+):
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be json or ndjson")
+
+    if from_ is not None or to is not None or resolution is not None:
+        if format == "ndjson" or cursor is not None:
+            raise HTTPException(status_code=400, detail="from/to/resolution cannot be combined with cursor or format=ndjson")
+        resolution = resolution or "auto"
+        if resolution not in RESOLUTIONS:
+            raise HTTPException(status_code=400, detail=f"resolution must be one of: {', '.join(RESOLUTIONS)}")
+        resolution, data = await price_service.get_series(source_id, from_, to, resolution)
+        if resolution != "raw":
+            return {"success": True, "resolution": resolution, "data": [_bucket_to_camel(b) for b in data]}
+        return {"success": True, "resolution": resolution, "data": [_record_to_camel(r) for r in data]}
+
+    try:
+        decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if format == "ndjson":
+        # Whole history (or `limit` rows) newest first, one JSON object per line, streamed from the DB cursor
+        rows = price_service.stream_history(source_id, cursor, limit)
+        return StreamingResponse(_ndjson_lines(rows), media_type="application/x-ndjson")
+
+    # One page, newest first; pass nextCursor back as ?cursor= for the next page
+    # Rows arrive already encoded by SQLite and are joined into the body as-is
+    rows, next_cursor = await price_service.get_history(source_id, limit or 100, cursor)
+    return JSONRowsResponse(rows, nextCursor=next_cursor)
@@ -1,14 +1,35 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 from src.schemas.product_schema import ProductCreate, ProductResponse
 from src.services.product_service import product_service
-from typing import List
+from src.services.cache_service import response_cache
+from src.services.serialization_service import json_rows_body, JSONRowsResponse
+from src.services.stats_service import stats_service
+from typing import List, Optional
 
 router = APIRouter(prefix="/api/products", tags=["products"])
 
 @router.get("/", response_model=dict)
-async def list_products():
-    products = await product_service.get_all_products()
-    return {"success": True, "data": products}
+async def list_products(request: Request):
+    async def build():
+        # Rows come back as camelCase JSON, bestPrices included, straight from SQLite
+        return json_rows_body(await product_service.get_products_json())
+    # Cached until a product is created or deleted or a price lands; honours If-None-Match
+    return await response_cache.cached_json(request, "products", None, build)
+
+@router.get("/{product_id}/best", response_model=dict)
+async def get_best_price(product_id: str):
+    """Cheapest current price per currency across the product's active sources, and which source holds it."""
+    if not await product_service.get_product(product_id):
+        raise HTTPException(status_code=404, detail="Product not found")
+    return JSONRowsResponse(await product_service.get_best_prices_json(product_id))
+
+@router.get("/{product_id}/stats", response_model=dict)
+async def get_product_stats(product_id: str, days: Optional[int] = Query(None, ge=1)):
+    """Price stats across all of a product's sources (cheapest store per day), plus per-source stats."""
+    if not await product_service.get_product(product_id):
+        raise HTTPException(status_code=404, detail="Product not found")
+    stats, sources = await stats_service.get_product_stats(product_id, days)
+    return {"success": True, "data": {"productId": product_id, "days": days, **stats, "sources": sources}}
 
 @router.post("/", response_model=dict)
 async def create_product(product: ProductCreate):
@@ -1,19 +1,61 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from src.services.scraper_service import scraper_service
+from src.services.scheduler_service import scrape_scheduler
+from src.services.scrape_job_service import scrape_job_service
+from src.services.rate_limit_service import rate_limiter
+from src.services.circuit_breaker_service import circuit_breaker
+from datetime import datetime
+from typing import Optional
 
 router = APIRouter(prefix="/api/scraper", tags=["scraper"])
 
 @router.post("/run", response_model=dict)
-async def run_scraper(background_tasks: BackgroundTasks):
-    """Trigger a full scrape job in the background."""
-    background_tasks.add_task(scraper_service.scrape_all_active)
-    return {"success": True, "message": "Scrape job started in background"}
+async def run_scraper(
+    background_tasks: BackgroundTasks,
+    maxConcurrency: Optional[int] = None,
+    perHostConcurrency: Optional[int] = None
+):
+    """Trigger a full scrape job in the background. Poll /api/scraper/jobs/{jobId} for progress."""
+    job_id = await scrape_job_service.create_job("manual")
+    background_tasks.add_task(
+        scraper_service.scrape_all_active,
+        max_concurrency=maxConcurrency,
+        per_host_concurrency=perHostConcurrency,
+        job_id=job_id
+    )
+    return {"success": True, "message": "Scrape job started in background", "data": {"jobId": job_id}}
 
 @router.post("/run-sync", response_model=dict)
-async def run_scraper_sync():
+async def run_scraper_sync(maxConcurrency: Optional[int] = None, perHostConcurrency: Optional[int] = None):
     """Trigger a full scrape job synchronously (waits for completion)."""
-    results = await scraper_service.scrape_all_active()
-    return {"success": True, "data": results}
+    results = await scraper_service.scrape_all_active(
+        max_concurrency=maxConcurrency,
+        per_host_concurrency=perHostConcurrency,
+        trigger="sync"
+    )
+    return {"success": True, "data": _run_results_to_camel(results)}
+
+def _run_results_to_camel(results: dict) -> dict:
+    details = []
+    for d in results["details"]:
+        detail = {"id": d["id"], "status": d["status"]}
+        if "price" in d:
+            detail["price"] = d["price"]
+        if "error" in d:
+            detail["error"] = d["error"]
+        if "retry_at" in d:
+            # ISO time, like retryAt on /api/scraper/breakers
+            detail["retryAt"] = datetime.fromtimestamp(d["retry_at"]).isoformat()
+        details.append(detail)
+    return {
+        "jobId": results["job_id"],
+        "success": results["success"],
+        "failed": results["failed"],
+        "skipped": results["skipped"],
+        "pagesFetched": results["pages_fetched"],
+        "elapsedSeconds": results["elapsed_seconds"],
+        "details": details
+    }
 
 @router.post("/test/{source_id}", response_model=dict)
 async def test_scrape_source(source_id: str):
@@ -23,3 +65,149 @@ async def test_scrape_source(source_id: str):
         return {"success": True, "data": {"price": price}}
     except Exception as e:
         return {"success": False, "error": str(e)}
+
+def _job_to_camel(job: dict) -> dict:
+    return {
+        "id": job.get("id"),
+        "trigger": job.get("trigger"),
+        "status": job.get("status"),
+        "total": job.get("total", 0),
+        "completed": job.get("completed", 0),
+        "succeeded": job.get("succeeded", 0),
+        "failed": job.get("failed", 0),
+        "skipped": job.get("skipped") or 0,
+        "pagesFetched": job.get("pages_fetched", 0),
+        "error": job.get("error_message"),
+        "createdAt": job.get("created_at"),
+        "startedAt": job.get("started_at"),
+        "finishedAt": job.get("finished_at"),
+        "elapsedSeconds": job.get("elapsed_seconds")
+    }
+
+def _timings_to_camel(row: dict) -> dict:
+    return {
+        "waitMs": row.get("wait_ms") or 0,
+        "connectMs": row.get("connect_ms") or 0,
+        "downloadMs": row.get("download_ms") or 0,
+        "parseMs": row.get("parse_ms") or 0,
+        "dbMs": row.get("db_ms") or 0,
+        "alertMs": row.get("alert_ms") or 0
+    }
+
+@router.get("/jobs", response_model=dict)
+async def list_jobs(limit: int = 20):
+    """List recent scrape jobs, newest first."""
+    jobs = await scrape_job_service.get_recent_jobs(limit)
+    return {"success": True, "data": [_job_to_camel(job) for job in jobs]}
+
+@router.get("/jobs/{job_id}", response_model=dict)
+async def get_job(job_id: str):
+    """Get a scrape job's progress, phase timing breakdown and per-source results."""
+    job = await scrape_job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    response_data = _job_to_camel(job)
+    response_data["phaseTotals"] = _timings_to_camel(job["phase_totals"])
+    response_data["byHost"] = [
+        {"host": h.get("host"), "sources": h.get("sources"), **_timings_to_camel(h)}
+        for h in job["by_host"]
+    ]
+    response_data["results"] = [
+        {
+            "sourceId": r.get("source_id"),
+            "host": r.get("host"),
+            "status": r.get("status"),
+            "price": r.get("price"),
+            "error": r.get("error_message"),
+            "timings": _timings_to_camel(r)
+        }
+        for r in job["results"]
+    ]
+    return {"success": True, "data": response_data}
+
+@router.get("/schedule", response_model=dict)
+async def get_schedule():
+    """List each source's scrape interval and next due time."""
+    schedules = await scrape_scheduler.get_schedules()
+    response_data = [
+        {
+            "sourceId": s.get("source_id"),
+            "baseIntervalSeconds": s.get("base_interval_seconds"),
+            "intervalSeconds": s.get("interval_seconds"),
+            "nextDueAt": s.get("next_due_at"),
+            "lastPrice": s.get("last_price"),
+            "unchangedRuns": s.get("unchanged_runs", 0)
+        }
+        for s in schedules
+    ]
+    return {"success": True, "data": {"running": scrape_scheduler.running, "schedules": response_data}}
+
+@router.put("/schedule/{source_id}", response_model=dict)
+async def set_source_interval(source_id: str, body: dict):
+    """Set a source's base scrape interval in seconds (null restores the default)."""
+    interval = body.get("intervalSeconds")
+    if interval is not None and (not isinstance(interval, (int, float)) or interval < 60):
+        raise HTTPException(status_code=400, detail="intervalSeconds must be at least 60")
+    success = await scrape_scheduler.set_interval(source_id, interval)
+    if not success:
+        raise HTTPException(status_code=404, detail="Source not found")
+    return {"success": True}
+
+@router.get("/domains", response_model=dict)
+async def get_domains():
+    """List per-store rate limit policies and each store's current pace."""
+    domains = await rate_limiter.get_domains()
+    response_data = [
+        {
+            "domain": d["domain"],
+            "origin": d["origin"],
+            "rate": d["rate"],
+            "burst": d["burst"],
+            "crawlDelay": d["crawl_delay"],
+            "robotsCrawlDelay": d["robots_crawl_delay"],
+            "currentRate": d["current_rate"],
+            "throttled": d["throttled"],
+            "pausedSeconds": d["paused_seconds"]
+        }
+        for d in domains
+    ]
+    return {"success": True, "data": response_data}
+
+@router.put("/domains/{domain}", response_model=dict)
+async def set_domain_policy(domain: str, body: dict):
+    """Override a store's rate (req/s), burst and crawlDelay (seconds); all null restores the defaults."""
+    rate = body.get("rate")
+    burst = body.get("burst")
+    crawl_delay = body.get("crawlDelay")
+    if rate is not None and (not isinstance(rate, (int, float)) or rate <= 0):
+        raise HTTPException(status_code=400, detail="rate must be greater than 0")
+    if burst is not None and (not isinstance(burst, int) or burst < 1):
+        raise HTTPException(status_code=400, detail="burst must be a whole number of at least 1")
+    if crawl_delay is not None and (not isinstance(crawl_delay, (int, float)) or crawl_delay < 0):
+        raise HTTPException(status_code=400, detail="crawlDelay must be 0 or more")
+    await rate_limiter.set_policy(domain, rate, burst, crawl_delay)
+    return {"success": True}
+
+@router.get("/breakers", response_model=dict)
+async def get_breakers():
+    """List per-host circuit breakers (hosts that failed recently), worst first."""
+    response_data = [
+        {
+            "host": b["host"],
+            "state": b["state"],
+            "consecutiveFailures": b["consecutive_failures"],
+            "trips": b["trips"],
+            "retryAt": b["retry_at"],
+            "lastError": b["last_error"],
+            "lastFailureAt": b["last_failure_at"]
+        }
+        for b in circuit_breaker.get_breakers()
+    ]
+    return {"success": True, "data": response_data}
+
+@router.post("/breakers/{host}/reset", response_model=dict)
+async def reset_breaker(host: str):
+    """Close a host's circuit breaker so its sources are scraped on the next run."""
+    if not circuit_breaker.reset(host.lower()):
+        raise HTTPException(status_code=404, detail="No breaker for this host")
+    return {"success": True}
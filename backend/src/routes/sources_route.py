@@ -1,23 +1,19 @@
-from fastapi import APIRouter, HTTPException
-from src.schemas.source_schema import SourceCreate, SourceResponse
+from fastapi import APIRouter, HTTPException, Request
+from src.schemas.source_schema import SourceCreate
 from src.services.source_service import source_service
+from src.services.cache_service import response_cache
+from src.services.serialization_service import json_rows_body
 from typing import List, Optional
 
 router = APIRouter(prefix="/api/sources", tags=["sources"])
 
 @router.get("/", response_model=dict)
-async def list_sources(productId: Optional[str] = None):
-    if productId:
-        sources = await source_service.get_sources_by_product(productId)
-    else:
-        sources = await source_service.get_all_sources()
-    
-    # Convert to SourceResponse and serialize with camelCase aliases
-    response_data = [
-        SourceResponse(**source).model_dump(by_alias=True) 
-        for source in sources
-    ]
-    return {"success": True, "data": response_data}
+async def list_sources(request: Request, productId: Optional[str] = None):
+    async def build():
+        # Rows come back as camelCase JSON (SourceResponse's shape) straight from SQLite
+        return json_rows_body(await source_service.get_sources_json(productId))
+    # Cached until a source is created or deleted; honours If-None-Match
+    return await response_cache.cached_json(request, "sources", productId, build)
 
 @router.post("/", response_model=dict)
 async def create_source(source: SourceCreate):
@@ -1,20 +1,41 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+from typing import Literal, Optional
+
+# target: price <= target_price
+# percent_drop: price fell at least drop_percent % from the previous price
+# all_time_low: price is below every earlier price
+# below_moving_average: price is below the window_days-day moving average of daily closes
+AlertKind = Literal["target", "percent_drop", "all_time_low", "below_moving_average"]
+
+MAX_WINDOW_DAYS = 365
 
 class AlertBase(BaseModel):
     product_id: str = Field(..., alias="productId")
     source_id: str = Field(..., alias="sourceId")
-    target_price: float = Field(..., alias="targetPrice")
+    kind: AlertKind = "target"
+    target_price: Optional[float] = Field(None, alias="targetPrice")
+    drop_percent: Optional[float] = Field(None, alias="dropPercent", gt=0, lt=100)
+    window_days: Optional[int] = Field(None, alias="windowDays", ge=2, le=MAX_WINDOW_DAYS)
     webhook_url: Optional[str] = Field(None, alias="webhookUrl")
     is_active: bool = Field(True, alias="isActive")
 
     model_config = ConfigDict(populate_by_name=True)
 
 class AlertCreate(AlertBase):
-    pass
+    @model_validator(mode="after")
+    def check_kind_fields(self):
+        if self.kind == "target" and self.target_price is None:
+            raise ValueError("targetPrice is required for target alerts")
+        if self.kind == "percent_drop" and self.drop_percent is None:
+            raise ValueError("dropPercent is required for percent_drop alerts")
+        if self.kind == "below_moving_average" and self.window_days is None:
+            raise ValueError("windowDays is required for below_moving_average alerts")
+        return self
 
 class AlertUpdate(BaseModel):
     target_price: Optional[float] = Field(None, alias="targetPrice")
+    drop_percent: Optional[float] = Field(None, alias="dropPercent", gt=0, lt=100)
+    window_days: Optional[int] = Field(None, alias="windowDays", ge=2, le=MAX_WINDOW_DAYS)
     webhook_url: Optional[str] = Field(None, alias="webhookUrl")
     is_active: Optional[bool] = Field(None, alias="isActive")
 
@@ -1,18 +1,25 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
 from typing import Optional
+from src.services.extraction_service import compile_json_path
 
 class SourceBase(BaseModel):
     product_id: str = Field(..., alias="productId")
     store_name: str = Field(..., alias="storeName")
     url: str
     css_selector: Optional[str] = Field(None, alias="cssSelector")
+    # JSONPath into the page's ld+json / embedded JSON, e.g. "$..offers.price" (tried before cssSelector)
     json_path: Optional[str] = Field(None, alias="jsonPath")
     is_active: bool = Field(True, alias="isActive")
 
     model_config = ConfigDict(populate_by_name=True)
 
 class SourceCreate(SourceBase):
-    pass
+    @field_validator("json_path")
+    @classmethod
+    def check_json_path(cls, value: Optional[str]) -> Optional[str]:
+        if value:
+            compile_json_path(value)
+        return value or None
 
 class SourceResponse(SourceBase):
     id: str
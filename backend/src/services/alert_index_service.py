@@ -0,0 +1,86 @@
+"""Alert Index Service - In-memory index of armed alerts for fast price checks."""
+
+from bisect import bisect_left
+from typing import Dict, List, Optional
+import asyncio
+from src.repositories.alert_repository import alert_repo
+
+
+class _SourceAlerts:
+    """Armed alerts for one source: target alerts sorted by target_price, plus the stateful kinds."""
+
+    def __init__(self):
+        self.targets: List[float] = []
+        self.alerts: List[dict] = []
+        self.rules: List[dict] = []
+
+    def add(self, alert: dict) -> None:
+        if alert.get("kind", "target") != "target":
+            self.rules.append(alert)
+            return
+        target = alert.get("target_price", 0)
+        position = bisect_left(self.targets, target)
+        self.targets.insert(position, target)
+        self.alerts.insert(position, alert)
+
+    def remove(self, alert_id: str) -> None:
+        self.rules = [alert for alert in self.rules if alert.get("id") != alert_id]
+        for position, alert in enumerate(self.alerts):
+            if alert.get("id") == alert_id:
+                del self.targets[position]
+                del self.alerts[position]
+                return
+
+
+class AlertIndex:
+    """
+    Active, untriggered alerts grouped by source_id.
+
+    Loaded lazily with one query and kept warm. AlertService invalidates it
+    whenever alerts are created, updated or deleted, and removes alerts
+    from it as they trigger.
+    """
+
+    def __init__(self):
+        self._by_source: Optional[Dict[str, _SourceAlerts]] = None
+        self._generation = 0
+        self._load_lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._by_source = None
+        self._generation += 1
+
+    async def _ensure_loaded(self) -> Dict[str, _SourceAlerts]:
+        if self._by_source is not None:
+            return self._by_source
+        async with self._load_lock:
+            if self._by_source is None:
+                generation = self._generation
+                index: Dict[str, _SourceAlerts] = {}
+                for alert in await alert_repo.get_active_alerts():
+                    index.setdefault(alert["source_id"], _SourceAlerts()).add(alert)
+                # Only publish if nothing was invalidated while we were loading
+                if generation == self._generation:
+                    self._by_source = index
+                return index
+        return self._by_source
+
+    async def triggered_for(self, source_id: str, price: float) -> List[dict]:
+        """Alerts for this source whose target_price is at or above `price`."""
+        entry = (await self._ensure_loaded()).get(source_id)
+        if not entry:
+            return []
+        return entry.alerts[bisect_left(entry.targets, price):]
+
+    async def rules_for(self, source_id: str) -> List[dict]:
+        """Armed percent_drop / all_time_low / below_moving_average alerts for this source."""
+        entry = (await self._ensure_loaded()).get(source_id)
+        return list(entry.rules) if entry else []
+
+    def discard(self, source_id: str, alert_id: str) -> None:
+        """Drop an alert that has just triggered."""
+        if self._by_source is not None and source_id in self._by_source:
+            self._by_source[source_id].remove(alert_id)
+
+
+alert_index = AlertIndex()
@@ -1,9 +1,12 @@
 from src.repositories.alert_repository import alert_repo
+from src.repositories.database_repository import WriteBatch
 from src.schemas.alert_schema import AlertCreate, AlertUpdate, AlertResponse
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional
 import logging
-import aiohttp
-import json
+from src.services.notification_service import notification_dispatcher
+from src.services.alert_index_service import alert_index
+from src.services.alert_state_service import alert_state, RollingState
 
 logger = logging.getLogger(__name__)
 
@@ -11,12 +14,22 @@ logger = logging.getLogger(__name__)
 DEFAULT_WEBHOOK_KEY = "default_webhook_url"
 
 class AlertService:
+    def __init__(self):
+        # Settings rarely change, so cache them until set_* is called
+        self._settings_cache: Dict[str, Optional[str]] = {}
+
     async def create_alert(self, alert: AlertCreate) -> str:
-        return await alert_repo.create_alert(alert)
+        alert_id = await alert_repo.create_alert(alert)
+        alert_index.invalidate()
+        alert_state.forget(alert.source_id)
+        return alert_id
 
     async def get_all_alerts(self) -> List[dict]:
         return await alert_repo.get_all_alerts()
 
+    async def get_alerts_json(self, product_id: Optional[str] = None, source_id: Optional[str] = None) -> List[str]:
+        return await alert_repo.get_alerts_json(product_id, source_id)
+
     async def get_alerts_by_product(self, product_id: str) -> List[dict]:
         return await alert_repo.get_alerts_by_product(product_id)
 
@@ -27,16 +40,36 @@ class AlertService:
         return await alert_repo.get_alert(alert_id)
 
     async def update_alert(self, alert_id: str, update: AlertUpdate) -> bool:
-        return await alert_repo.update_alert(alert_id, update)
+        existing = await alert_repo.get_alert(alert_id)
+        if not existing:
+            return False
+        updated = await alert_repo.update_alert(alert_id, update)
+        alert_index.invalidate()
+        alert_state.forget(existing["source_id"])
+        return updated
 
     async def delete_alert(self, alert_id: str) -> bool:
-        return await alert_repo.delete_alert(alert_id)
+        existing = await alert_repo.get_alert(alert_id)
+        if not existing:
+            return False
+        deleted = await alert_repo.delete_alert(alert_id)
+        alert_index.invalidate()
+        source_id = existing["source_id"]
+        if await alert_repo.has_stateful_alerts(source_id):
+            alert_state.forget(source_id)
+        else:
+            # Its last stateful rule is gone; a new one rebuilds from history
+            await alert_state.discard(source_id)
+        return deleted
 
     async def get_default_webhook(self) -> Optional[str]:
-        return await alert_repo.get_setting(DEFAULT_WEBHOOK_KEY)
+        if DEFAULT_WEBHOOK_KEY not in self._settings_cache:
+            self._settings_cache[DEFAULT_WEBHOOK_KEY] = await alert_repo.get_setting(DEFAULT_WEBHOOK_KEY)
+        return self._settings_cache[DEFAULT_WEBHOOK_KEY]
 
     async def set_default_webhook(self, url: str) -> None:
         await alert_repo.set_setting(DEFAULT_WEBHOOK_KEY, url)
+        self._settings_cache[DEFAULT_WEBHOOK_KEY] = url
 
     async def check_price_against_alerts(
         self, 
@@ -44,16 +77,23 @@ class AlertService:
         current_price: float,
         product_name: str = "Product",
         store_name: str = "Store",
-        product_url: str = None
+        product_url: str = None,
+        batch: Optional[WriteBatch] = None,
+        observed_at: Optional[str] = None
     ) -> List[dict]:
         """
         Check if current price triggers any alerts for this source.
-        Returns list of triggered alerts.
+        Returns list of triggered alerts. With a batch, the triggered-state
+        updates and outbox rows are buffered instead of committed one by one,
+        and webhooks are only sent once the batch has committed.
+
+        Call this before the price itself is recorded: the stateful kinds
+        compare against the source's earlier prices, then fold this one in.
         """
         triggered_alerts = []
         
-        # Get active, non-triggered alerts for this source
-        alerts = await alert_repo.get_active_alerts_for_source(source_id)
+        # Active, non-triggered alerts with target_price >= current_price (from the index)
+        alerts = await alert_index.triggered_for(source_id, current_price)
         
         for alert in alerts:
             target_price = alert.get("target_price", 0)
@@ -64,70 +104,118 @@ class AlertService:
                 logger.info(f"Alert {alert_id} triggered! Price ${current_price} <= target ${target_price}")
                 
                 # Mark as triggered
-                await alert_repo.trigger_alert(alert_id)
+                await alert_repo.trigger_alert(alert_id, batch=batch)
+                alert_index.discard(source_id, alert_id)
                 
                 # Send notification
                 webhook_url = alert.get("webhook_url") or await self.get_default_webhook()
                 
                 if webhook_url:
-                    await self.send_notification(
-                        webhook_url=webhook_url,
-                        product_name=product_name,
-                        store_name=store_name,
-                        current_price=current_price,
-                        target_price=target_price,
-                        product_url=product_url
+                    # Queued for the background dispatcher so a slow webhook can't stall scraping
+                    await notification_dispatcher.enqueue(
+                        webhook_url,
+                        self._build_payload(product_name, store_name, current_price, target_price, product_url),
+                        batch=batch
                     )
                 else:
                     logger.warning(f"Alert {alert_id} triggered but no webhook configured")
                 
                 triggered_alerts.append(alert)
-        
+
+        rules = await alert_index.rules_for(source_id)
+        if rules:
+            observed_at = observed_at or datetime.now().isoformat()
+            capacity = max(alert.get("window_days") or 0 for alert in rules)
+            state = await alert_state.get(source_id, capacity)
+            for alert in rules:
+                message = self._rule_message(alert, state, current_price, observed_at, product_name, store_name)
+                if message is None:
+                    continue
+                alert_id = alert.get("id")
+                logger.info(f"Alert {alert_id} triggered! {message}")
+                await alert_repo.trigger_alert(alert_id, batch=batch)
+                alert_index.discard(source_id, alert_id)
+                webhook_url = alert.get("webhook_url") or await self.get_default_webhook()
+                if webhook_url:
+                    await notification_dispatcher.enqueue(webhook_url, self._payload(message, product_url), batch=batch)
+                else:
+                    logger.warning(f"Alert {alert_id} triggered but no webhook configured")
+                triggered_alerts.append(alert)
+            await alert_state.observe(source_id, state, current_price, observed_at, batch=batch)
+
         return triggered_alerts
 
-    async def send_notification(
+    def _rule_message(
+        self,
+        alert: dict,
+        state: RollingState,
+        price: float,
+        observed_at: str,
+        product_name: str,
+        store_name: str
+    ) -> Optional[str]:
+        """Notification text if `price` fires this stateful alert, else None."""
+        kind = alert.get("kind")
+        if kind == "percent_drop":
+            last = state.last_price
+            if last and last > 0:
+                drop = (last - price) / last * 100
+                if drop >= (alert.get("drop_percent") or 0):
+                    return f"{product_name} dropped {drop:.1f}% to ${price:.2f} at {store_name} (was ${last:.2f})"
+        elif kind == "all_time_low":
+            if state.low_price is not None and price < state.low_price:
+                return f"{product_name} hit an all-time low of ${price:.2f} at {store_name} (previous low ${state.low_price:.2f})"
+        elif kind == "below_moving_average":
+            days = alert.get("window_days") or 0
+            average = state.moving_average(days, observed_at[:10]) if days else None
+            if average is not None and price < average:
+                return f"{product_name} is ${price:.2f} at {store_name}, below its {days}-day average of ${average:.2f}"
+        return None
+
+    def _build_payload(
         self,
-        webhook_url: str,
         product_name: str,
         store_name: str,
         current_price: float,
         target_price: float,
         product_url: str = None
-    ) -> bool:
-        """
-        Send notification via webhook (designed for Ntfy.sh but works with others).
-        """
+    ) -> dict:
+        return self._payload(
+            f"{product_name} dropped to ${current_price:.2f} at {store_name} (target: ${target_price:.2f})",
+            product_url
+        )
+
+    def _payload(self, message: str, product_url: str = None) -> dict:
         # Ntfy.sh-compatible payload
         payload = {
             "title": "🎉 Price Drop Alert!",
-            "message": f"{product_name} dropped to ${current_price:.2f} at {store_name} (target: ${target_price:.2f})",
+            "message": message,
             "priority": 4,  # High priority
             "tags": ["moneybag", "chart_with_downwards_trend"]
         }
         
         if product_url:
             payload["click"] = product_url
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    webhook_url,
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status in (200, 201, 204):
-                        logger.info(f"Notification sent successfully to {webhook_url}")
-                        return True
-                    else:
-                        text = await response.text()
-                        logger.error(f"Webhook failed with status {response.status}: {text}")
-                        return False
-        except aiohttp.ClientError as e:
-            logger.error(f"Failed to send notification: {e}")
-            return False
-        except Exception as e:
-            logger.error(f"Unexpected error sending notification: {e}")
+        return payload
+
+    async def send_notification(
+        self,
+        webhook_url: str,
+        product_name: str,
+        store_name: str,
+        current_price: float,
+        target_price: float,
+        product_url: str = None
+    ) -> bool:
+        """
+        Send notification via webhook immediately, bypassing the dispatcher queue
+        (designed for Ntfy.sh but works with others).
+        """
+        payload = self._build_payload(product_name, store_name, current_price, target_price, product_url)
+        error = await notification_dispatcher.post(webhook_url, payload)
+        if error:
+            logger.error(error)
             return False
+        return True
 
 alert_service = AlertService()
@@ -0,0 +1,136 @@
+"""Alert State Service - Rolling per-source price state for the stateful alert kinds."""
+
+import json
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+from src.repositories.alert_state_repository import alert_state_repo
+from src.repositories.database_repository import WriteBatch
+from src.repositories.price_repository import price_repo
+
+
+class RollingState:
+    """
+    What percent_drop, all_time_low and below_moving_average need to know
+    about a source's past: the previous price, the running minimum, and a
+    ring buffer of the most recent daily closes (`capacity` days, enough
+    for the longest moving-average window among the source's alerts).
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        last_price: Optional[float] = None,
+        low_price: Optional[float] = None,
+        day: Optional[str] = None,
+        day_close: Optional[float] = None,
+        closes: Iterable[float] = (),
+        observed_at: Optional[str] = None
+    ):
+        self.capacity = capacity
+        self.last_price = last_price
+        self.low_price = low_price
+        self.day = day
+        self.day_close = day_close
+        self.closes = deque(closes, maxlen=capacity)
+        self.observed_at = observed_at
+
+    def moving_average(self, days: int, day: str) -> Optional[float]:
+        """Mean of the last `days` daily closes before `day`, or None without enough history."""
+        closes = list(self.closes)
+        if self.day is not None and self.day != day:
+            closes.append(self.day_close)  # Latest observed day is complete once a new day starts
+        if len(closes) < days:
+            return None
+        return sum(closes[-days:]) / days
+
+    def observe(self, price: float, timestamp: str) -> None:
+        day = timestamp[:10]
+        if self.day is not None and day != self.day:
+            self.closes.append(self.day_close)
+        self.day = day
+        self.day_close = price
+        self.last_price = price
+        self.low_price = price if self.low_price is None else min(self.low_price, price)
+        self.observed_at = timestamp
+
+    def to_row(self, source_id: str) -> tuple:
+        return (
+            source_id, self.last_price, self.low_price, self.day, self.day_close,
+            json.dumps(list(self.closes)), self.observed_at
+        )
+
+
+class AlertStateService:
+    """
+    Rolling state per source, kept in memory so evaluating a scrape costs the
+    same however long the source's history is.
+
+    Each observation is checkpointed to alert_rule_state in the same write
+    batch as the price itself. A checkpoint is trusted on load only if it saw
+    the source's latest successful price (observed_at == latest_prices
+    .last_success_at); otherwise, e.g. after the source's rules had all
+    triggered and stopped observing, the state is rebuilt from latest_prices
+    and the daily rollups.
+    """
+
+    def __init__(self):
+        self._states: Dict[str, RollingState] = {}
+
+    def forget(self, source_id: str) -> None:
+        """Drop one source's in-memory state (call when its alerts change; it reloads on demand)."""
+        self._states.pop(source_id, None)
+
+    async def discard(self, source_id: str) -> None:
+        """Drop a source's state and its checkpoint, once it has no stateful rules left."""
+        self._states.pop(source_id, None)
+        await alert_state_repo.delete_state(source_id)
+
+    async def get(self, source_id: str, capacity: int) -> RollingState:
+        state = self._states.get(source_id)
+        if state is None or state.capacity < capacity:
+            state = await self._load(source_id, capacity)
+            self._states[source_id] = state
+        return state
+
+    async def _load(self, source_id: str, capacity: int) -> RollingState:
+        latest = await price_repo.get_latest_price(source_id)
+        last_success_at = latest["last_success_at"] if latest else None
+        if last_success_at is None:
+            return RollingState(capacity)
+
+        row = await alert_state_repo.get_state(source_id)
+        if row is not None and row["observed_at"] == last_success_at:
+            closes = json.loads(row["closes"] or "[]")
+            if len(closes) >= capacity or row["day"] is None:
+                return RollingState(
+                    capacity, row["last_price"], row["low_price"], row["day"], row["day_close"],
+                    closes[-capacity:] if capacity else (), row["observed_at"]
+                )
+
+        day = last_success_at[:10]
+        closes = await price_repo.get_daily_closes_before(source_id, day, capacity) if capacity else []
+        return RollingState(
+            capacity,
+            last_price=latest["last_success_price"],
+            low_price=await price_repo.get_all_time_low(source_id),
+            day=day,
+            day_close=latest["last_success_price"],
+            closes=closes,
+            observed_at=last_success_at
+        )
+
+    async def observe(
+        self,
+        source_id: str,
+        state: RollingState,
+        price: float,
+        timestamp: str,
+        batch: Optional[WriteBatch] = None
+    ) -> None:
+        """Fold a new successful price into the state and checkpoint it."""
+        state.observe(price, timestamp)
+        await alert_state_repo.save_state(state.to_row(source_id), batch=batch)
+
+
+alert_state = AlertStateService()
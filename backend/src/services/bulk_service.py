@@ -0,0 +1,360 @@
+"""Bulk Service - Catalog import/export and price history transfer."""
+
+import bisect
+import csv
+import gzip
+import io
+import itertools
+import json
+import logging
+import uuid
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from src.repositories.database_repository import db_repo
+from src.repositories.price_repository import price_repo
+from src.repositories.product_repository import product_repo
+from src.repositories.source_repository import source_repo
+from src.services.scheduler_service import scrape_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Same values as the products.identifier_type CHECK constraint
+IDENTIFIER_TYPES = ("SKU", "EAN", "UPC", "ASIN", "MPN")
+
+CATALOG_FORMATS = ("csv", "jsonl")
+
+# Flat catalog layout: one row per source, product columns repeated.
+# A row with an empty url is a product without sources.
+CATALOG_COLUMNS = (
+    "productId", "name", "identifierType", "identifierValue",
+    "sourceId", "storeName", "url", "cssSelector", "jsonPath", "isActive"
+)
+
+HISTORY_COLUMNS = (
+    "sourceId", "price", "currency", "fetchedAt", "lastSeen", "seenCount", "success", "error"
+)
+
+# Rows per executemany when importing history, and bytes buffered before compressing on export
+HISTORY_IMPORT_CHUNK = 5000
+EXPORT_FLUSH_BYTES = 64 * 1024
+
+# Validation errors reported back per import
+MAX_REPORTED_ERRORS = 100
+
+
+class BulkImportError(ValueError):
+    """Import rejected; `errors` lists what was wrong, by line."""
+
+    def __init__(self, errors: List[str]):
+        super().__init__(f"{len(errors)} invalid record(s)")
+        self.errors = errors[:MAX_REPORTED_ERRORS]
+
+
+def _decode(data: bytes) -> str:
+    """Request bodies may be gzipped (e.g. straight from an export)."""
+    if data[:2] == b"\x1f\x8b":
+        try:
+            data = gzip.decompress(data)
+        except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+            # Truncated or corrupt upload
+            raise BulkImportError([f"body: invalid gzip data ({e})"])
+    return data.decode("utf-8-sig")
+
+
+def _as_bool(value, default: bool = True) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes")
+
+
+def _blank_to_none(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+class BulkService:
+    """
+    Moves whole catalogs and histories in and out in one request.
+
+    Imports are validated up front and written in a single transaction with
+    executemany, so a batch either lands completely or not at all. Exports
+    stream from a database cursor, so their size does not affect memory.
+    """
+
+    # --- Catalog import -------------------------------------------------
+
+    def parse_catalog(self, data: bytes, format: str) -> List[dict]:
+        """Parse CSV or JSON-lines into product records with nested sources."""
+        text = _decode(data)
+        products: Dict[Tuple[str, str], dict] = {}
+        errors: List[str] = []
+
+        if format == "jsonl":
+            entries = []
+            for line_no, line in enumerate(text.splitlines(), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    entries.append((line_no, json.loads(line)))
+                except json.JSONDecodeError as e:
+                    errors.append(f"line {line_no}: invalid JSON ({e.msg})")
+            rows = []
+            for line_no, entry in entries:
+                if not isinstance(entry, dict):
+                    errors.append(f"line {line_no}: expected a JSON object")
+                    continue
+                sources = entry.get("sources") or [{}]
+                if not isinstance(sources, list) or not all(isinstance(source, dict) for source in sources):
+                    errors.append(f"line {line_no}: sources must be a list of objects")
+                    continue
+                rows.extend((line_no, {**entry, **source, "sources": None}) for source in sources)
+        else:
+            reader = csv.DictReader(io.StringIO(text))
+            # Header is line 1
+            rows = [(line_no, row) for line_no, row in enumerate(reader, start=2)]
+
+        for line_no, row in rows:
+            name = _blank_to_none(row.get("name"))
+            identifier_type = (_blank_to_none(row.get("identifierType")) or "").upper()
+            identifier_value = _blank_to_none(row.get("identifierValue"))
+            if not name:
+                errors.append(f"line {line_no}: name is required")
+                continue
+            if identifier_type not in IDENTIFIER_TYPES:
+                errors.append(f"line {line_no}: identifierType must be one of {', '.join(IDENTIFIER_TYPES)}")
+                continue
+            if not identifier_value:
+                errors.append(f"line {line_no}: identifierValue is required")
+                continue
+
+            key = (identifier_type, identifier_value)
+            product = products.setdefault(key, {
+                "id": _blank_to_none(row.get("productId")),
+                "name": name,
+                "identifier_type": identifier_type,
+                "identifier_value": identifier_value,
+                "sources": []
+            })
+
+            url = _blank_to_none(row.get("url"))
+            if url is None:
+                continue
+            if urlparse(url).scheme not in ("http", "https"):
+                errors.append(f"line {line_no}: url must start with http:// or https://")
+                continue
+            store_name = _blank_to_none(row.get("storeName"))
+            if not store_name:
+                errors.append(f"line {line_no}: storeName is required for a source")
+                continue
+            product["sources"].append({
+                "id": _blank_to_none(row.get("sourceId")),
+                "store_name": store_name,
+                "url": url,
+                "css_selector": _blank_to_none(row.get("cssSelector")),
+                "json_path": _blank_to_none(row.get("jsonPath")),
+                "is_active": _as_bool(row.get("isActive"))
+            })
+
+        if errors:
+            raise BulkImportError(errors)
+        return list(products.values())
+
+    async def import_catalog(self, data: bytes, format: str, dry_run: bool = False) -> dict:
+        """
+        Validate and import a catalog.
+
+        Products already present (same identifier) are reused, and sources
+        already present for a product (same url) are skipped, so re-running
+        an import is harmless. Supplied ids are kept when they are free.
+        """
+        products = self.parse_catalog(data, format)
+        summary = {"productsCreated": 0, "productsExisting": 0, "sourcesCreated": 0, "sourcesExisting": 0}
+
+        async with db_repo.transaction():
+            existing_products = await product_repo.get_all_products()
+            by_identifier = {(p["identifier_type"], p["identifier_value"]): p["id"] for p in existing_products}
+            product_ids = {p["id"] for p in existing_products}
+            existing_sources = await source_repo.get_all_sources()
+            source_keys = {(s["product_id"], s["url"]) for s in existing_sources}
+            source_ids = {s["id"] for s in existing_sources}
+
+            product_rows, source_rows = [], []
+            for product in products:
+                product_id = by_identifier.get((product["identifier_type"], product["identifier_value"]))
+                if product_id is not None:
+                    summary["productsExisting"] += 1
+                else:
+                    product_id = product["id"] if product["id"] and product["id"] not in product_ids else str(uuid.uuid4())
+                    product_ids.add(product_id)
+                    product_rows.append((product_id, product["name"], product["identifier_type"], product["identifier_value"]))
+                    summary["productsCreated"] += 1
+
+                for source in product["sources"]:
+                    if (product_id, source["url"]) in source_keys:
+                        summary["sourcesExisting"] += 1
+                        continue
+                    source_id = source["id"] if source["id"] and source["id"] not in source_ids else str(uuid.uuid4())
+                    source_ids.add(source_id)
+                    source_keys.add((product_id, source["url"]))
+                    source_rows.append((
+                        source_id, product_id, source["store_name"], source["url"],
+                        source["css_selector"], source["json_path"], 1 if source["is_active"] else 0
+                    ))
+                    summary["sourcesCreated"] += 1
+
+            if dry_run:
+                return summary
+            await product_repo.create_products(product_rows)
+            await source_repo.create_sources(source_rows)
+
+        if source_rows:
+            scrape_scheduler.wake()
+        logger.info(f"Imported {summary['productsCreated']} products and {summary['sourcesCreated']} sources")
+        return summary
+
+    # --- Catalog export -------------------------------------------------
+
+    async def export_catalog(self, format: str) -> AsyncIterator[str]:
+        """Catalog in the import format (ids included, so it round-trips)."""
+        products = await product_repo.get_all_products()
+        sources_by_product: Dict[str, List[dict]] = {}
+        for source in await source_repo.get_all_sources():
+            sources_by_product.setdefault(source["product_id"], []).append(source)
+
+        if format == "jsonl":
+            for product in products:
+                yield json.dumps({
+                    "productId": product["id"],
+                    "name": product["name"],
+                    "identifierType": product["identifier_type"],
+                    "identifierValue": product["identifier_value"],
+                    "sources": [
+                        {
+                            "sourceId": s["id"],
+                            "storeName": s["store_name"],
+                            "url": s["url"],
+                            "cssSelector": s["css_selector"],
+                            "jsonPath": s["json_path"],
+                            "isActive": bool(s["is_active"])
+                        }
+                        for s in sources_by_product.get(product["id"], [])
+                    ]
+                }) + "\n"
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CATALOG_COLUMNS)
+        for product in products:
+            head = (product["id"], product["name"], product["identifier_type"], product["identifier_value"])
+            sources = sources_by_product.get(product["id"]) or [None]
+            for s in sources:
+                if s is None:
+                    writer.writerow(head + ("",) * 6)
+                else:
+                    writer.writerow(head + (
+                        s["id"], s["store_name"], s["url"], s["css_selector"] or "",
+                        s["json_path"] or "", "true" if s["is_active"] else "false"
+                    ))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    # --- Price history --------------------------------------------------
+
+    async def export_history(self, source_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Gzip-compressed CSV of price history, streamed as it is read."""
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(HISTORY_COLUMNS)
+        async for row in price_repo.iter_all_history(source_id):
+            writer.writerow((
+                row["source_id"], row["price"], row["currency"] or "", row["timestamp"],
+                row["last_seen"] or "", row["seen_count"] or 1,
+                1 if row["scrape_success"] else 0, row["error_message"] or ""
+            ))
+            if buffer.tell() >= EXPORT_FLUSH_BYTES:
+                chunk = compressor.compress(buffer.getvalue().encode())
+                buffer.seek(0)
+                buffer.truncate()
+                if chunk:
+                    yield chunk
+        yield compressor.compress(buffer.getvalue().encode()) + compressor.flush()
+
+    async def import_history(self, data: bytes) -> dict:
+        """Load an exported history CSV (gzipped or plain) in one transaction."""
+        reader = csv.DictReader(io.StringIO(_decode(data)))
+        known_sources = {s["id"] for s in await source_repo.get_all_sources()}
+        rows, errors = [], []
+        for line_no, row in enumerate(reader, start=2):
+            source_id = _blank_to_none(row.get("sourceId"))
+            if source_id not in known_sources:
+                errors.append(f"line {line_no}: unknown sourceId {source_id!r} (import the catalog first)")
+                continue
+            try:
+                fetched_at = datetime.fromisoformat(row["fetchedAt"]).isoformat()
+                last_seen = _blank_to_none(row.get("lastSeen"))
+                rows.append((
+                    source_id,
+                    float(row["price"]),
+                    _blank_to_none(row.get("currency")) or "USD",
+                    fetched_at,
+                    1 if _as_bool(row.get("success")) else 0,
+                    _blank_to_none(row.get("error")),
+                    datetime.fromisoformat(last_seen).isoformat() if last_seen else None,
+                    int(row.get("seenCount") or 1)
+                ))
+            except (KeyError, TypeError, ValueError) as e:
+                errors.append(f"line {line_no}: {e}")
+        if errors:
+            raise BulkImportError(errors)
+
+        # Oldest first per source, so latest_prices and the change-only trigger see them in order
+        rows.sort(key=lambda r: (r[0], r[3]))
+        skipped = 0
+        async with db_repo.transaction():
+            for start in range(0, len(rows), HISTORY_IMPORT_CHUNK):
+                chunk = await self._new_history_rows(rows[start:start + HISTORY_IMPORT_CHUNK])
+                skipped += min(HISTORY_IMPORT_CHUNK, len(rows) - start) - len(chunk)
+                if chunk:
+                    await price_repo.add_price_records(chunk)
+        logger.info(f"Imported {len(rows) - skipped} price history rows ({skipped} already present)")
+        return {"rowsImported": len(rows) - skipped, "rowsSkipped": skipped}
+
+    async def _new_history_rows(self, rows: List[tuple]) -> List[tuple]:
+        """
+        Drop rows already in the history, so importing the same export twice
+        is a no-op. A row is present if one with its (source_id, timestamp,
+        price) exists, or if an existing run of that price covers its
+        timestamp (the change-only trigger folds repeats into their run).
+        """
+        fresh = []
+        for source_id, group in itertools.groupby(rows, key=lambda r: r[0]):
+            source_rows = list(group)
+            runs = sorted(
+                await price_repo.get_history_runs(source_id, source_rows[0][3], source_rows[-1][3]),
+                key=lambda run: run["timestamp"]
+            )
+            starts = [run["timestamp"] for run in runs]
+            present = {(run["timestamp"], run["price"]) for run in runs}
+            for row in source_rows:
+                if (row[3], row[1]) in present:
+                    continue
+                # Runs don't overlap, so only the latest one starting by this timestamp can cover it
+                i = bisect.bisect_right(starts, row[3]) - 1
+                if i >= 0 and runs[i]["price"] == row[1] and row[3] <= runs[i]["until"]:
+                    continue
+                present.add((row[3], row[1]))
+                fresh.append(row)
+        return fresh
+
+
+bulk_service = BulkService()
@@ -0,0 +1,119 @@
+"""Cache Service - In-process read-through cache for rarely-changing list responses."""
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from src.repositories.database_repository import db_repo
+from src.services.serialization_service import dumps
+
+# Cache settings (overridable for Docker)
+MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+TTL_SECONDS = float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "300"))
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    Serialized JSON responses keyed by (namespace, version, key).
+
+    Repositories call invalidate(namespace) after committing a write, which
+    bumps the namespace version. A response built from a read that started
+    before the bump is stored under the old version, so it is never served.
+    Entries are evicted least-recently-used beyond MAX_ENTRIES and expire
+    after TTL_SECONDS as a backstop for writes made outside the repositories.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl_seconds: float = TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._versions: Dict[str, int] = {}
+        self._entries: "OrderedDict[Tuple[str, int, Hashable], CachedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, namespace: str) -> int:
+        """Current version of `namespace`; other caches can key on it to share invalidation."""
+        return self._versions.get(namespace, 0)
+
+    def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+        stale = [k for k in self._entries if k[0] in namespaces]
+        for k in stale:
+            del self._entries[k]
+
+    def clear(self) -> None:
+        self.invalidate(*self._versions)
+        self._entries.clear()
+
+    async def get_or_build(
+        self,
+        namespace: str,
+        key: Hashable,
+        build: Callable[[], Awaitable[Any]]
+    ) -> CachedResponse:
+        """
+        Return the cached response, or build, serialize and store it. `build`
+        may return the encoded body itself (bytes) instead of a payload.
+        """
+        cache_key = (namespace, self._versions.get(namespace, 0), key)
+        entry = self._entries.get(cache_key)
+        now = time.monotonic()
+        if entry is not None and entry.expires_at > now:
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        payload = await build()
+        body = payload if isinstance(payload, bytes) else dumps(payload)
+        entry = CachedResponse(
+            body=body,
+            etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            expires_at=now + self.ttl_seconds
+        )
+        self._entries[cache_key] = entry
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def respond(self, request: Request, entry: CachedResponse) -> Response:
+        """200 with the cached body, or 304 when the client already has this version."""
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        # Proxies that compress responses (e.g. nginx gzip) weaken ETags to W/"..."
+        tags = {tag.strip().removeprefix("W/") for tag in (if_none_match or "").split(",")}
+        if entry.etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    async def cached_json(
+        self,
+        request: Request,
+        namespace: str,
+        key: Hashable,
+        build: Callable[[], Awaitable[Any]]
+    ) -> Response:
+        return self.respond(request, await self.get_or_build(namespace, key, build))
+
+
+response_cache = ResponseCache()
+
+
+def invalidate_after_commit(namespace: str, batch: Optional[Any] = None) -> None:
+    """Invalidate `namespace` once the current write (or `batch` flush) commits."""
+    target = batch if batch is not None else db_repo
+    target.after_commit(lambda: response_cache.invalidate(namespace))
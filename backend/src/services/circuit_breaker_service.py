@@ -0,0 +1,137 @@
+"""Circuit Breaker Service - Stops scraping stores that are down or blocking us."""
+
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Breaker settings (overridable for Docker); 0 failures disables the breaker
+FAILURE_THRESHOLD = int(os.environ.get("SCRAPER_BREAKER_THRESHOLD", "5"))
+COOLDOWN_SECONDS = float(os.environ.get("SCRAPER_BREAKER_COOLDOWN", "60"))
+MAX_COOLDOWN_SECONDS = float(os.environ.get("SCRAPER_BREAKER_MAX_COOLDOWN", "3600"))
+# A half-open probe that never reports back (e.g. cancelled) frees the slot after this long
+PROBE_TIMEOUT_SECONDS = 120.0
+
+# Responses that mean the store itself is refusing or failing, not just this page
+FAILURE_STATUSES = (403, 429)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised in place of scraping a source whose store's breaker is open."""
+
+    def __init__(self, host: str, retry_at: float):
+        self.host = host
+        self.retry_at = retry_at
+        super().__init__(f"Skipped: {host} is failing; next attempt after {datetime.fromtimestamp(retry_at).isoformat(timespec='seconds')}")
+
+
+class _Breaker:
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0  # Consecutive
+        self.trips = 0  # Consecutive times opened; sets the cooldown
+        self.open_until = 0.0
+        self.probe_started = 0.0
+        self.last_error: Optional[str] = None
+        self.last_failure_at: Optional[float] = None
+
+
+class CircuitBreakerService:
+    """
+    A circuit breaker per store, keyed like the rate limiter (see
+    RateLimitService.domain_for).
+
+    After SCRAPER_BREAKER_THRESHOLD consecutive failures (connection errors,
+    timeouts, 5xx, 403 or 429) the breaker opens and full runs skip the
+    host's sources without requesting them or recording failed prices. Once
+    the cooldown passes, one probe request is let through (half-open): success
+    closes the breaker, failure re-opens it with the cooldown doubled, up to
+    SCRAPER_BREAKER_MAX_COOLDOWN. State is kept in memory only.
+    """
+
+    def __init__(self):
+        self._breakers: Dict[str, _Breaker] = {}
+
+    def allow(self, host: str) -> bool:
+        """Whether a request to `host` may go ahead; claims the probe when half-opening."""
+        breaker = self._breakers.get(host)
+        if breaker is None or breaker.state == CLOSED:
+            return True
+        now = time.time()
+        if breaker.state == OPEN and now >= breaker.open_until:
+            breaker.state = HALF_OPEN
+            breaker.probe_started = now
+            return True
+        if breaker.state == HALF_OPEN and now - breaker.probe_started >= PROBE_TIMEOUT_SECONDS:
+            breaker.probe_started = now
+            return True
+        return False
+
+    def retry_at(self, host: str) -> float:
+        """When `host` will next be tried (now if its breaker is closed)."""
+        breaker = self._breakers.get(host)
+        if breaker is None or breaker.state == CLOSED:
+            return time.time()
+        if breaker.state == HALF_OPEN:
+            return breaker.probe_started + PROBE_TIMEOUT_SECONDS
+        return breaker.open_until
+
+    def record_success(self, host: str) -> None:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            return
+        if breaker.state != CLOSED:
+            logger.info("%s is answering again; closing its circuit", host)
+        breaker.state = CLOSED
+        breaker.failures = 0
+        breaker.trips = 0
+
+    def record_failure(self, host: str, error: str) -> None:
+        if FAILURE_THRESHOLD <= 0:
+            return
+        breaker = self._breakers.setdefault(host, _Breaker())
+        now = time.time()
+        breaker.failures += 1
+        breaker.last_error = error
+        breaker.last_failure_at = now
+        if breaker.state == HALF_OPEN or (breaker.state == CLOSED and breaker.failures >= FAILURE_THRESHOLD):
+            breaker.trips += 1
+            cooldown = min(MAX_COOLDOWN_SECONDS, COOLDOWN_SECONDS * 2 ** (breaker.trips - 1))
+            breaker.state = OPEN
+            breaker.open_until = now + cooldown
+            logger.warning("%s failed %d times in a row (%s); pausing it for %.0fs", host, breaker.failures, error, cooldown)
+
+    def record_response(self, host: str, status_code: int) -> None:
+        if status_code >= 500 or status_code in FAILURE_STATUSES:
+            self.record_failure(host, f"HTTP {status_code}")
+        else:
+            self.record_success(host)
+
+    def reset(self, host: str) -> bool:
+        """Close a host's breaker by hand. False if it has none."""
+        return self._breakers.pop(host, None) is not None
+
+    def get_breakers(self) -> List[dict]:
+        """Every host that has failed recently, worst first."""
+        return [
+            {
+                "host": host,
+                "state": b.state,
+                "consecutive_failures": b.failures,
+                "trips": b.trips,
+                "retry_at": datetime.fromtimestamp(self.retry_at(host)).isoformat() if b.state != CLOSED else None,
+                "last_error": b.last_error,
+                "last_failure_at": datetime.fromtimestamp(b.last_failure_at).isoformat() if b.last_failure_at else None
+            }
+            for host, b in sorted(self._breakers.items(), key=lambda item: (-item[1].trips, -item[1].failures, item[0]))
+        ]
+
+
+circuit_breaker = CircuitBreakerService()
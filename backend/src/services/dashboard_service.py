@@ -0,0 +1,53 @@
+"""Dashboard Service - Everything the dashboard shows, in a few set-based queries."""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from src.repositories.alert_repository import alert_repo
+from src.repositories.price_repository import price_repo
+from src.repositories.product_repository import product_repo
+from src.repositories.source_repository import source_repo
+
+DEFAULT_SPARKLINE_DAYS = 30
+MAX_SPARKLINE_DAYS = 365
+
+
+class DashboardService:
+    """
+    Builds the dashboard payload from four queries run concurrently on the
+    reader pool: products, sources joined to latest_prices, alerts, and the
+    daily rollup closes for the sparkline window. Everything is then grouped
+    in memory, so the cost does not grow with one query per source.
+    """
+
+    async def get_dashboard(self, sparkline_days: int = DEFAULT_SPARKLINE_DAYS) -> List[dict]:
+        sparkline_days = max(1, min(sparkline_days, MAX_SPARKLINE_DAYS))
+        since = (datetime.now() - timedelta(days=sparkline_days)).strftime("%Y-%m-%dT00:00:00")
+        products, sources, alerts, closes = await asyncio.gather(
+            product_repo.get_all_products(),
+            source_repo.get_all_sources_with_latest(),
+            alert_repo.get_all_alerts(),
+            price_repo.get_daily_closes(since)
+        )
+
+        sparklines: Dict[str, List[float]] = {}
+        for row in closes:
+            sparklines.setdefault(row["source_id"], []).append(row["close"])
+
+        alerts_by_source: Dict[str, List[dict]] = {}
+        for alert in alerts:
+            alerts_by_source.setdefault(alert["source_id"], []).append(alert)
+
+        sources_by_product: Dict[str, List[dict]] = {}
+        for source in sources:
+            source["alerts"] = alerts_by_source.get(source["id"], [])
+            source["sparkline"] = sparklines.get(source["id"], [])
+            sources_by_product.setdefault(source["product_id"], []).append(source)
+
+        for product in products:
+            product["sources"] = sources_by_product.get(product["id"], [])
+        return products
+
+
+dashboard_service = DashboardService()
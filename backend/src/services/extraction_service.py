@@ -0,0 +1,301 @@
+"""Extraction Service - Fast price extraction from product page HTML."""
+
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+
+from src.services.serialization_service import loads
+
+logger = logging.getLogger(__name__)
+
+# Parser backend: "lxml" (fast, C-based) or "html.parser" (pure Python fallback)
+PARSER_BACKEND = os.environ.get("SCRAPER_PARSER", "lxml")
+
+# Leftmost compound of a selector, e.g. "div.a-price" or '[itemprop="price"]'
+_COMPOUND_RE = re.compile(
+    r'^(?P<tag>[a-zA-Z][\w-]*)?'
+    r'(?P<rest>(?:#[\w-]+|\.[\w-]+|\[[\w-]+(?:=(?:"[^"]*"|\'[^\']*\'|[\w-]+))?\])*)'
+    r'(?=\s|>|$)'
+)
+_PART_RE = re.compile(r'#([\w-]+)|\.([\w-]+)|\[([\w-]+)(?:=(?:"([^"]*)"|\'([^\']*)\'|([\w-]+)))?\]')
+
+# Elements with no closing tag: an anchor on one of these is complete at its '>'
+_VOID_TAGS = frozenset({
+    b"area", b"base", b"br", b"col", b"embed", b"hr", b"img", b"input",
+    b"link", b"meta", b"param", b"source", b"track", b"wbr"
+})
+_TAG_NAME_RE = re.compile(rb'<([A-Za-z][\w:-]*)')
+# An attribute value ends at its closing quote, whitespace, or the end of the tag
+_VALUE_END = rb'(?=["\'\s/>])'
+
+# Structured data: <script type="application/ld+json"> blocks and embedded
+# page state in <script type="application/json"> (e.g. Next.js __NEXT_DATA__)
+_JSON_SCRIPT_RE = re.compile(rb'<script\b[^>]*?\btype\s*=\s*["\']?application/(?:ld\+)?json\b[^>]*>', re.IGNORECASE)
+_SCRIPT_CLOSE_RE = re.compile(rb'</script\s*>', re.IGNORECASE)
+# json_path steps: ..name, .name, .*, [n], [*], ['name'] / ["name"]
+_PATH_STEP_RE = re.compile(r'(\.\.|\.)?(?:([\w@$-]+)|\*|\[(?:(-?\d+)|\*|"([^"]*)"|\'([^\']*)\')\])')
+_CURRENCY_KEYS = ("priceCurrency", "currency", "currencyCode")
+
+
+def _resolve_parser() -> str:
+    if PARSER_BACKEND == "lxml":
+        try:
+            import lxml  # noqa: F401 - optional dependency
+            return "lxml"
+        except ImportError:
+            logger.warning("lxml is not installed; falling back to html.parser")
+    return "html.parser"
+
+
+@lru_cache(maxsize=512)
+def compile_selector(selector: str) -> soupsieve.SoupSieve:
+    """Compile a CSS selector once and reuse it for every page."""
+    return soupsieve.compile(selector)
+
+
+def _attribute_anchor(name: str, value: Optional[str], in_list: bool = False) -> bytes:
+    """Regex for an attribute inside a start tag: name="value" (quotes optional), or a bare name."""
+    pattern = rb'\s(?i:' + re.escape(name.encode()) + rb')'
+    if value is None:
+        return pattern + rb'(?=[\s=/>])'
+    # class="a-price a-text-price" holds the class anywhere in its list
+    prefix = rb'(?:[^"\'>]*\s)?' if in_list else b''
+    return pattern + rb'\s*=\s*["\']?' + prefix + re.escape(value.encode()) + _VALUE_END
+
+
+@lru_cache(maxsize=512)
+def selector_plan(selector: str) -> Tuple[Optional[SoupStrainer], Optional["re.Pattern[bytes]"]]:
+    """
+    Work out how to narrow parsing for a selector.
+
+    Returns a SoupStrainer that keeps only subtrees rooted at the selector's
+    leftmost compound (so the full selector can still match inside them),
+    plus a byte pattern that finds where that subtree starts in the raw page:
+    the id, attribute or class in attribute form (class="... name"), so a
+    bare class name in a <style> or script doesn't match. Either is None
+    when the selector is too complex to narrow safely (selector lists,
+    sibling combinators, pseudo-classes, bare tag names).
+    """
+    selector = selector.strip()
+    if any(token in selector for token in (",", "+", "~", ":")):
+        return None, None
+
+    match = _COMPOUND_RE.match(selector)
+    if not match or not match.group("rest"):
+        return None, None
+
+    attrs = {}
+    anchors = []
+    for part in _PART_RE.finditer(match.group("rest")):
+        id_, class_, attr, dq, sq, bare = part.groups()
+        value = dq if dq is not None else sq if sq is not None else bare
+        if id_ and "id" not in attrs:
+            attrs["id"] = id_
+            anchors.append((0, _attribute_anchor("id", id_)))
+        elif class_ and "class" not in attrs:
+            # Only one class fits in a strainer; the full selector checks the rest
+            attrs["class"] = class_
+            anchors.append((2, _attribute_anchor("class", class_, in_list=True)))
+        elif attr and attr not in attrs:
+            attrs[attr] = value if value is not None else True
+            anchors.append((1, _attribute_anchor(attr, value)))
+
+    # Prefer the most specific anchor: id, then attribute, then class name
+    anchor = re.compile(min(anchors)[1]) if anchors else None
+    return SoupStrainer(match.group("tag"), attrs=attrs), anchor
+
+
+def element_end(body: bytes, position: int) -> Optional[int]:
+    """
+    Offset just past the element whose start tag contains `position`, or
+    None if it isn't closed within `body` (or `position` isn't in a tag).
+    Nested elements with the same tag name are balanced.
+    """
+    start = body.rfind(b"<", 0, position)
+    name = _TAG_NAME_RE.match(body, start) if start != -1 else None
+    if name is None or body.find(b">", start, position) != -1:
+        return None
+    tag = name.group(1).lower()
+    tag_close = body.find(b">", position)
+    if tag_close == -1:
+        return None
+    if tag in _VOID_TAGS or body[tag_close - 1:tag_close] == b"/":
+        return tag_close + 1
+
+    depth = 1
+    for found in re.compile(rb'<(/?)' + re.escape(tag) + rb'(?=[\s/>])', re.IGNORECASE).finditer(body, tag_close + 1):
+        depth += -1 if found.group(1) else 1
+        if depth == 0:
+            end = body.find(b">", found.end())
+            return end + 1 if end != -1 else None
+    return None
+
+
+@lru_cache(maxsize=512)
+def compile_json_path(path: str) -> Tuple[Tuple[bool, Any], ...]:
+    """
+    Parse a JSONPath subset into (recursive, key) steps; key is a str, an
+    int index, or None for a wildcard. Supported: $, .name, ..name, .*,
+    [n], [*] and ['name'], e.g. "$..offers.price" or "$.props.pageProps.product.price.current".
+    """
+    path = path.strip()
+    if path.startswith("$"):
+        path = path[1:]
+    steps = []
+    position = 0
+    while position < len(path):
+        match = _PATH_STEP_RE.match(path, position)
+        if not match or match.end() == position:
+            raise ValueError(f"Invalid json_path at '{path[position:]}'")
+        dots, name, index, dq, sq = match.groups()
+        if dots is None and position > 0 and not match.group(0).startswith("["):
+            raise ValueError(f"Invalid json_path at '{path[position:]}'")
+        key: Any = name if name is not None else dq if dq is not None else sq
+        if index is not None:
+            key = int(index)
+        steps.append((dots == "..", key))
+        position = match.end()
+    return tuple(steps)
+
+
+def _descendants(node: Any) -> Iterator[Any]:
+    yield node
+    children = node.values() if isinstance(node, dict) else node if isinstance(node, list) else ()
+    for child in children:
+        yield from _descendants(child)
+
+
+def _step(node: Any, key: Any) -> Iterator[Tuple[Any, Any]]:
+    """Children of `node` for one step, as (value, parent) pairs."""
+    if isinstance(node, dict):
+        if key is None:
+            for value in node.values():
+                yield value, node
+        elif isinstance(key, str) and key in node:
+            yield node[key], node
+    elif isinstance(node, list):
+        if isinstance(key, int):
+            if -len(node) <= key < len(node):
+                yield node[key], node
+        else:
+            # Names and wildcards apply to each element, since ld+json uses an
+            # object or an array for the same property (e.g. "offers")
+            for item in node:
+                if key is None:
+                    yield item, node
+                else:
+                    yield from _step(item, key)
+
+
+def evaluate_json_path(document: Any, steps: Tuple[Tuple[bool, Any], ...]) -> Iterator[Tuple[Any, Any]]:
+    """Every (value, parent) that `steps` (from compile_json_path) selects in `document`."""
+    nodes: Iterable[Tuple[Any, Any]] = ((document, None),)
+    for recursive, key in steps:
+        nodes = _apply(nodes, recursive, key)
+    return iter(nodes)
+
+
+def _apply(nodes: Iterable[Tuple[Any, Any]], recursive: bool, key: Any) -> Iterator[Tuple[Any, Any]]:
+    for node, _ in nodes:
+        for start in (_descendants(node) if recursive else (node,)):
+            yield from _step(start, key)
+
+
+class StructuredData:
+    """
+    The JSON blocks of one page, found by a regex scan over the raw bytes
+    (no HTML tree is built) and parsed on demand, so a price found in the
+    first block never pays for parsing the rest.
+    """
+
+    def __init__(self, body: bytes):
+        self._body = body
+        self._matches = _JSON_SCRIPT_RE.finditer(body) if b"application/" in body else iter(())
+        self._blocks: List[Any] = []
+
+    def blocks(self) -> Iterator[Any]:
+        yield from self._blocks
+        for match in self._matches:
+            close = _SCRIPT_CLOSE_RE.search(self._body, match.end())
+            if close is None:
+                break
+            raw = self._body[match.end():close.start()].strip()
+            # Some stores wrap the JSON in an HTML comment or CDATA section
+            for prefix, suffix in ((b"<!--", b"-->"), (b"<![CDATA[", b"]]>")):
+                if raw.startswith(prefix) and raw.endswith(suffix):
+                    raw = raw[len(prefix):-len(suffix)].strip()
+            try:
+                block = loads(raw)
+            except ValueError:
+                continue
+            self._blocks.append(block)
+            yield block
+
+    def find(self, path: str) -> Optional[Tuple[Any, Optional[str]]]:
+        """
+        First scalar value `path` selects in any block, with the currency
+        stated next to it (e.g. an offer's priceCurrency), or None.
+        """
+        steps = compile_json_path(path)
+        for block in self.blocks():
+            for value, parent in evaluate_json_path(block, steps):
+                if isinstance(value, (dict, list)) or value is None or isinstance(value, bool):
+                    continue
+                currency = None
+                if isinstance(parent, dict):
+                    currency = next((parent[k] for k in _CURRENCY_KEYS if isinstance(parent.get(k), str)), None)
+                return value, currency
+        return None
+
+
+class ExtractionService:
+    """Finds the price element for a CSS selector, or the price in a page's structured data, as cheaply as possible."""
+
+    def __init__(self):
+        self.parser = _resolve_parser()
+
+    def structured_data(self, body: bytes) -> StructuredData:
+        """JSON-LD / embedded JSON blocks of a raw page, for json_path lookups."""
+        return StructuredData(body)
+
+    def anchor_for(self, selector: Optional[str]) -> Optional["re.Pattern[bytes]"]:
+        """Byte pattern whose first match marks the start tag of the price subtree."""
+        if not selector:
+            return None
+        return selector_plan(selector)[1]
+
+    def extract_text(self, html: str, selector: str) -> Optional[str]:
+        """Return the text of the first element matching `selector`, or None."""
+        compiled = compile_selector(selector)
+        strainer, _ = selector_plan(selector)
+
+        if strainer is not None:
+            soup = BeautifulSoup(html, self.parser, parse_only=strainer)
+            element = compiled.select_one(soup)
+            if element is not None:
+                return element.get_text()
+
+        # Full-document parse: complex selectors, or the narrowed parse missed
+        soup = BeautifulSoup(html, self.parser)
+        element = compiled.select_one(soup)
+        return element.get_text() if element is not None else None
+
+    def extract_texts(self, html: str, selectors: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Extract several selectors from one page, building the full tree at most once."""
+        unique = list(dict.fromkeys(selectors))
+        if len(unique) == 1:
+            return {unique[0]: self.extract_text(html, unique[0])}
+        soup = BeautifulSoup(html, self.parser)
+        results = {}
+        for selector in unique:
+            element = compile_selector(selector).select_one(soup)
+            results[selector] = element.get_text() if element is not None else None
+        return results
+
+
+extraction_service = ExtractionService()
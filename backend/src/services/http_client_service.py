@@ -0,0 +1,66 @@
+"""HTTP Client Service - One pooled, long-lived HTTP client shared by the app."""
+
+import httpx
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Pool settings (overridable for Docker)
+MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.environ.get("HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
+DEFAULT_TIMEOUT = float(os.environ.get("HTTP_DEFAULT_TIMEOUT", "30"))
+
+
+class HttpClientService:
+    """
+    Owns the app-wide httpx.AsyncClient.
+
+    Started from the FastAPI startup hook and closed on shutdown so that
+    scraping, URL parsing and webhooks reuse warm TCP/TLS connections.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _http2_available(self) -> bool:
+        if not HTTP2_ENABLED:
+            return False
+        try:
+            import h2  # noqa: F401 - optional dependency (pip install httpx[http2])
+            return True
+        except ImportError:
+            logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed; using HTTP/1.1")
+            return False
+
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+        limits = httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        )
+        self._client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=DEFAULT_TIMEOUT,
+            limits=limits,
+            http2=self._http2_available(),
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_client(self) -> httpx.AsyncClient:
+        """Return the shared client, starting it lazily (e.g. for scripts outside the app)."""
+        if self._client is None:
+            await self.start()
+        return self._client
+
+
+http_client_service = HttpClientService()
@@ -0,0 +1,219 @@
+"""Notification Service - Background webhook dispatcher backed by a persisted outbox."""
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+import httpx
+
+from src.repositories.database_repository import db_repo, WriteBatch
+from src.repositories.notification_repository import notification_repo
+from src.services.http_client_service import http_client_service
+
+logger = logging.getLogger(__name__)
+
+# Dispatcher settings (overridable for Docker)
+QUEUE_SIZE = int(os.environ.get("NOTIFY_QUEUE_SIZE", "1000"))
+COALESCE_SECONDS = float(os.environ.get("NOTIFY_COALESCE_SECONDS", "2"))
+PER_ENDPOINT_CONCURRENCY = int(os.environ.get("NOTIFY_PER_ENDPOINT_CONCURRENCY", "2"))
+MAX_ATTEMPTS = int(os.environ.get("NOTIFY_MAX_ATTEMPTS", "5"))
+RETRY_BASE_SECONDS = float(os.environ.get("NOTIFY_RETRY_BASE_SECONDS", "5"))
+SWEEP_SECONDS = float(os.environ.get("NOTIFY_SWEEP_SECONDS", "30"))
+
+
+class NotificationDispatcher:
+    """
+    Delivers webhook notifications off the scrape path.
+
+    Every notification is written to the notification_outbox table first,
+    then handed to a bounded in-memory queue. A background worker collects
+    queued items for COALESCE_SECONDS, merges everything bound for the same
+    webhook into one digest, and posts it with a per-endpoint concurrency
+    limit. Failures are retried with exponential backoff. Pending rows left
+    over from a restart (or dropped because the queue was full) are picked
+    up by a periodic sweep of the outbox.
+
+    Nothing is handed to the worker before its outbox row has committed, so
+    a notification written through a scrape run's write batch is only sent
+    if the rest of that batch (e.g. the alert marked triggered) commits too.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._deliveries: Set[asyncio.Task] = set()
+        self._endpoint_limits: Dict[str, asyncio.Semaphore] = {}
+        # Outbox ids currently queued or being delivered (so the sweep skips them)
+        self._in_flight: Set[int] = set()
+        self._sweep_task: Optional[asyncio.Task] = None
+        self._sweep_requested = False
+
+    async def start(self) -> None:
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._worker = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the worker. Undelivered notifications stay pending in the outbox."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        for task in list(self._deliveries):
+            task.cancel()
+        sweep = [self._sweep_task] if self._sweep_task is not None else []
+        for task in sweep:
+            task.cancel()
+        await asyncio.gather(self._worker, *self._deliveries, *sweep, return_exceptions=True)
+        self._worker = None
+        self._queue = None
+        self._deliveries.clear()
+        self._in_flight.clear()
+
+    async def enqueue(self, webhook_url: str, payload: dict, batch: Optional[WriteBatch] = None) -> Optional[int]:
+        """
+        Persist a notification and schedule it for delivery once it commits.
+
+        With a batch, the outbox row is buffered with the caller's other
+        writes and picked up from the outbox right after the batch flushes;
+        the id is then not known yet and None is returned.
+        """
+        if batch is not None:
+            await notification_repo.enqueue(webhook_url, payload, batch=batch)
+            batch.after_commit(self._request_sweep)
+            return None
+        notification_id = await notification_repo.enqueue(webhook_url, payload)
+        item = {"id": notification_id, "webhook_url": webhook_url, "payload": payload, "attempts": 0}
+        db_repo.after_commit(lambda: self._offer(item))
+        return notification_id
+
+    def _request_sweep(self) -> None:
+        """Offer newly committed outbox rows now instead of at the next periodic sweep."""
+        if self._queue is None:
+            return  # Not running; the sweep after startup delivers them
+        self._sweep_requested = True
+        if self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self._sweep_while_requested())
+
+    async def _sweep_while_requested(self) -> None:
+        try:
+            # Commits landing during a sweep ask for another one
+            while self._sweep_requested and self._queue is not None:
+                self._sweep_requested = False
+                await self._sweep()
+        except Exception as e:
+            logger.error(f"Notification sweep error: {e}")
+        finally:
+            self._sweep_task = None
+
+    def _offer(self, item: dict) -> None:
+        if self._queue is None:
+            return  # Not running; the outbox sweep delivers it after startup
+        try:
+            self._queue.put_nowait(item)
+            self._in_flight.add(item["id"])
+        except asyncio.QueueFull:
+            logger.warning(f"Notification queue full; notification {item['id']} left for the outbox sweep")
+
+    async def _sweep(self) -> None:
+        for row in await notification_repo.get_due():
+            if row["id"] in self._in_flight:
+                continue
+            self._offer({
+                "id": row["id"],
+                "webhook_url": row["webhook_url"],
+                "payload": json.loads(row["payload"]),
+                "attempts": row["attempts"] or 0
+            })
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._sweep()
+                try:
+                    first = await asyncio.wait_for(self._queue.get(), timeout=SWEEP_SECONDS)
+                except asyncio.TimeoutError:
+                    continue
+
+                # Give the rest of a scrape run a moment to add to the same digest
+                items = [first]
+                deadline = asyncio.get_running_loop().time() + COALESCE_SECONDS
+                while True:
+                    remaining = deadline - asyncio.get_running_loop().time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        items.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                    except asyncio.TimeoutError:
+                        break
+
+                groups: Dict[str, List[dict]] = {}
+                for item in items:
+                    groups.setdefault(item["webhook_url"], []).append(item)
+                for webhook_url, group in groups.items():
+                    task = asyncio.create_task(self._deliver(webhook_url, group))
+                    self._deliveries.add(task)
+                    task.add_done_callback(self._deliveries.discard)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Notification dispatcher error: {e}")
+                await asyncio.sleep(1)
+
+    def _digest(self, group: List[dict]) -> dict:
+        if len(group) == 1:
+            return group[0]["payload"]
+        payloads = [item["payload"] for item in group]
+        return {
+            "title": f"🎉 {len(payloads)} Price Drop Alerts!",
+            "message": "\n".join(p.get("message", "") for p in payloads),
+            "priority": max(p.get("priority", 3) for p in payloads),
+            "tags": payloads[0].get("tags", [])
+        }
+
+    async def _deliver(self, webhook_url: str, group: List[dict]) -> None:
+        ids = [item["id"] for item in group]
+        limit = self._endpoint_limits.setdefault(webhook_url, asyncio.Semaphore(PER_ENDPOINT_CONCURRENCY))
+        try:
+            async with limit:
+                error = await self.post(webhook_url, self._digest(group))
+            if error is None:
+                await notification_repo.mark_sent(ids)
+                return
+
+            attempts = max(item["attempts"] for item in group) + 1
+            if attempts >= MAX_ATTEMPTS:
+                logger.error(f"Giving up on notifications {ids} to {webhook_url} after {attempts} attempts: {error}")
+                await notification_repo.mark_failed(ids, error)
+            else:
+                delay = RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+                next_attempt_at = (datetime.now() + timedelta(seconds=delay)).isoformat()
+                logger.warning(f"Notification to {webhook_url} failed ({error}); retrying in {delay:g}s")
+                await notification_repo.mark_retry(ids, next_attempt_at, error)
+        finally:
+            self._in_flight.difference_update(ids)
+
+    async def post(self, webhook_url: str, payload: dict) -> Optional[str]:
+        """POST a payload to a webhook. Returns None on success, else an error message."""
+        try:
+            client = await http_client_service.get_client()
+            response = await client.post(
+                webhook_url,
+                json=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=10.0
+            )
+            if response.status_code in (200, 201, 204):
+                logger.info(f"Notification sent successfully to {webhook_url}")
+                return None
+            return f"Webhook failed with status {response.status_code}: {response.text}"
+        except httpx.HTTPError as e:
+            return f"Failed to send notification: {e}"
+        except Exception as e:
+            return f"Unexpected error sending notification: {e}"
+
+
+notification_dispatcher = NotificationDispatcher()
@@ -1,9 +1,129 @@
-from src.repositories.price_repository import price_repo
+import base64
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional, Tuple
+
+from src.repositories.price_repository import price_repo, ROLLUP_TABLES
+from src.services.serialization_service import loads
+from src.services.retention_service import RAW_RETENTION_DAYS, HOURLY_RETENTION_DAYS, retention_cutoff
+
+# Longest range served at each resolution when resolution="auto"
+RAW_MAX_SPAN = timedelta(days=2)
+HOURLY_MAX_SPAN = timedelta(days=45)
+
+RESOLUTIONS = ("auto", "raw") + tuple(ROLLUP_TABLES)
+
+MAX_PAGE_SIZE = 1000
+
+
+def _to_local(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored timestamps are naive local time; convert aware inputs (e.g. ...Z) to match."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def encode_cursor(record: dict) -> str:
+    """Opaque page cursor for the row after which the next page starts."""
+    key = f"{record['timestamp']}|{record['id']}"
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, int]]:
+    if not cursor:
+        return None
+    try:
+        timestamp, record_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return timestamp, int(record_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
 
 class PriceService:
-    async def get_history(self, source_id: str):
-        history = await price_repo.get_history_by_source(source_id)
-        # Convert rows (dict) to list of dicts if needed
-        return [dict(row) for row in history]
+    async def get_history(
+        self,
+        source_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[str], Optional[str]]:
+        """
+        One page of history, newest first, as JSON-encoded rows.
+        Returns (rows, cursor for the next page or None).
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        history = await price_repo.get_history_json(source_id, limit, decode_cursor(cursor))
+        next_cursor = None
+        if len(history) == limit:
+            last = loads(history[-1])
+            next_cursor = encode_cursor({"timestamp": last["fetchedAt"], "id": last["id"]})
+        return history, next_cursor
+
+    def stream_history(
+        self,
+        source_id: str,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """All history from the cursor back (or `limit` rows), newest first, as JSON-encoded rows."""
+        return price_repo.iter_history_json(source_id, decode_cursor(cursor), limit)
+
+    async def pick_resolution(self, source_id: str, start: Optional[datetime], end: Optional[datetime]) -> str:
+        """Coarsest granularity that still resolves the requested range and still holds its start."""
+        if start is None:
+            first_at = await price_repo.get_first_timestamp(source_id)
+            if first_at is None:
+                return "raw"
+            start = datetime.fromisoformat(first_at)
+        span = (end or datetime.now()) - start
+        raw_cutoff = retention_cutoff(RAW_RETENTION_DAYS)
+        hourly_cutoff = retention_cutoff(HOURLY_RETENTION_DAYS)
+        if span <= RAW_MAX_SPAN and (raw_cutoff is None or start >= raw_cutoff):
+            return "raw"
+        if span <= HOURLY_MAX_SPAN and (hourly_cutoff is None or start >= hourly_cutoff):
+            return "hour"
+        return "day"
+
+    async def get_series(
+        self,
+        source_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        resolution: str = "auto"
+    ) -> Tuple[str, List[dict]]:
+        """
+        Price series for a date range, oldest first.
+
+        Returns (resolution, rows). Raw rows are points from successful
+        scrapes; hour/day rows are OHLC buckets from the rollup tables.
+        """
+        start, end = _to_local(start), _to_local(end)
+        if resolution == "auto":
+            resolution = await self.pick_resolution(source_id, start, end)
+
+        start_iso = start.isoformat() if start else None
+        end_iso = end.isoformat() if end else None
+        if resolution == "raw":
+            runs = await price_repo.get_history_range(source_id, start_iso, end_iso)
+            return resolution, self._run_points(runs, start_iso, end_iso)
+        return resolution, await price_repo.get_rollups(source_id, resolution, start_iso, end_iso)
+
+    def _run_points(self, runs: List[dict], start: Optional[str], end: Optional[str]) -> List[dict]:
+        """
+        Expand change-only rows into chart points.
+
+        A row covers every scrape from `timestamp` to `last_seen` at one price,
+        so it becomes a point at each end, clamped to the requested range.
+        The end point gets its own id ("<row id>:last") so clients keying
+        points on id don't see duplicates.
+        """
+        points = []
+        for run in runs:
+            first_at = max(run["timestamp"], start) if start else run["timestamp"]
+            last_at = run["last_seen"] or run["timestamp"]
+            if end:
+                last_at = min(last_at, end)
+            points.append({**run, "timestamp": first_at})
+            if last_at > first_at:
+                points.append({**run, "id": f"{run['id']}:last", "timestamp": last_at})
+        return points
 
 price_service = PriceService()
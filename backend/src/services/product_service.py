@@ -10,6 +10,12 @@ class ProductService:
     async def get_all_products(self) -> List[dict]:
         return await product_repo.get_all_products()
 
+    async def get_products_json(self) -> List[str]:
+        return await product_repo.get_products_json()
+
+    async def get_best_prices_json(self, product_id: str) -> List[str]:
+        return await product_repo.get_best_prices_json(product_id)
+
     async def get_product(self, product_id: str) -> dict:
         return await product_repo.get_product_by_id(product_id)
 
@@ -0,0 +1,301 @@
+"""Rate Limit Service - Per-store request pacing and politeness for the scraper."""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from src.repositories.domain_policy_repository import domain_policy_repo
+from src.services.http_client_service import http_client_service
+from src.services.url_parser_service import url_parser_service
+
+logger = logging.getLogger(__name__)
+
+# Politeness settings (overridable for Docker)
+USER_AGENT = os.environ.get(
+    "SCRAPER_USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+DEFAULT_RATE = float(os.environ.get("SCRAPER_RATE_PER_SECOND", "1"))
+DEFAULT_BURST = int(os.environ.get("SCRAPER_RATE_BURST", "2"))
+RESPECT_ROBOTS = os.environ.get("SCRAPER_RESPECT_CRAWL_DELAY", "true").lower() in ("1", "true", "yes")
+ROBOTS_TTL = float(os.environ.get("SCRAPER_ROBOTS_TTL", "86400"))
+MAX_RETRY_AFTER = float(os.environ.get("SCRAPER_MAX_RETRY_AFTER", "120"))
+
+# Adaptive slow-down: each 429/503 halves a store's rate, each success wins back a tenth of it
+BACKOFF_FACTOR = 0.5
+RECOVERY_STEP = 0.1
+MIN_FACTOR = 1 / 32
+THROTTLE_STATUSES = (429, 503)
+
+_CRAWL_DELAY_RE = re.compile(r"(\s*crawl-delay\s*:\s*)([^\s#]+)", re.IGNORECASE)
+
+
+@dataclass
+class DomainPolicy:
+    rate: float
+    burst: int
+    crawl_delay: Optional[float]
+    origin: str  # db, store or default
+
+
+class TokenBucket:
+    """
+    Token bucket in its GCRA form: instead of counting tokens it tracks the
+    theoretical arrival time (TAT) of the next request. Each request is
+    handed a start time at least `interval` after the previous one, with up
+    to `burst` requests allowed back to back. Reservations are plain
+    arithmetic, so concurrent scrapes need no lock and are served in the
+    order they asked.
+    """
+
+    def __init__(self, interval: float, burst: int):
+        self.interval = interval
+        self.burst = burst
+        self.tat = 0.0
+        self.blocked_until = 0.0
+
+    def reserve(self, now: float) -> float:
+        """Take the next slot, returning how many seconds to wait for it."""
+        tolerance = (self.burst - 1) * self.interval
+        start = max(now, self.tat - tolerance, self.blocked_until)
+        self.tat = max(self.tat, start) + self.interval
+        return start - now
+
+    def block(self, until: float) -> None:
+        """Hold every request until `until`, then resume at the base pace (no burst)."""
+        self.blocked_until = max(self.blocked_until, until)
+        self.tat = max(self.tat, until + (self.burst - 1) * self.interval)
+
+
+class _DomainState:
+    def __init__(self, policy: DomainPolicy):
+        self.policy = policy
+        self.factor = 1.0
+        self.robots_delay: Optional[float] = None
+        self.robots_checked_at: Optional[float] = None
+        self.robots_fetch: Optional[asyncio.Task] = None
+        self.throttled = 0
+        self.bucket = TokenBucket(self.interval(), self.burst())
+
+    def interval(self) -> float:
+        interval = 1 / (self.policy.rate * self.factor)
+        for delay in (self.policy.crawl_delay, self.robots_delay):
+            if delay:
+                interval = max(interval, delay)
+        return interval
+
+    def burst(self) -> int:
+        # A crawl-delay asks for a gap between every request
+        if self.policy.crawl_delay or self.robots_delay:
+            return 1
+        return max(1, self.policy.burst)
+
+    def retune(self) -> None:
+        self.bucket.interval = self.interval()
+        self.bucket.burst = self.burst()
+
+
+def _robots_lines(text: str) -> List[str]:
+    """
+    robots.txt lines with Crawl-delay values in milliseconds: RobotFileParser
+    only accepts whole seconds and silently drops values like 0.5.
+    """
+    lines = []
+    for line in text.splitlines():
+        match = _CRAWL_DELAY_RE.match(line)
+        if match:
+            try:
+                line = f"{match.group(1)}{round(float(match.group(2)) * 1000)}"
+            except ValueError:
+                pass
+        lines.append(line)
+    return lines
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given as delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimitService:
+    """
+    Paces scraper requests per store so parallel runs stay under each
+    store's tolerance instead of getting throttled or blocked.
+
+    Every store domain (the STORE_PATTERNS entry a URL matches, else its
+    hostname) gets a token bucket. Its rate and burst come from, in order:
+    a domain_policies row, the store's optional 'rate' / 'burst' /
+    'crawl_delay' keys in STORE_PATTERNS, and the SCRAPER_RATE_* defaults.
+    The Crawl-delay (or Request-rate) in the site's robots.txt is honoured
+    too, re-read every SCRAPER_ROBOTS_TTL seconds. A 429 or 503 halves the
+    store's rate and pauses it for any Retry-After given; successes bring
+    the rate back gradually.
+    """
+
+    def __init__(self):
+        self._domains: Dict[str, _DomainState] = {}
+        self._db_policies: Optional[Dict[str, dict]] = None
+
+    def domain_for(self, url: str) -> str:
+        hostname = (urlparse(url).hostname or "").lower()
+        if hostname.startswith("www."):
+            hostname = hostname[4:]
+        for domain in url_parser_service.STORE_PATTERNS:
+            if hostname == domain or hostname.endswith("." + domain):
+                return domain
+        return hostname
+
+    async def _policies(self) -> Dict[str, dict]:
+        if self._db_policies is None:
+            self._db_policies = {row["domain"]: row for row in await domain_policy_repo.get_all_policies()}
+        return self._db_policies
+
+    async def _resolve_policy(self, domain: str) -> DomainPolicy:
+        store = url_parser_service.STORE_PATTERNS.get(domain, {})
+        row = (await self._policies()).get(domain, {})
+        origin = "db" if row else "store" if any(k in store for k in ("rate", "burst", "crawl_delay")) else "default"
+
+        def pick(key: str, default):
+            if row.get(key) is not None:
+                return row[key]
+            return store.get(key, default)
+
+        return DomainPolicy(
+            rate=float(pick("rate", DEFAULT_RATE)),
+            burst=int(pick("burst", DEFAULT_BURST)),
+            crawl_delay=pick("crawl_delay", None),
+            origin=origin
+        )
+
+    async def _state(self, domain: str) -> _DomainState:
+        state = self._domains.get(domain)
+        if state is None:
+            state = _DomainState(await self._resolve_policy(domain))
+            self._domains.setdefault(domain, state)
+        return self._domains[domain]
+
+    async def _refresh_robots(self, url: str, state: _DomainState) -> None:
+        now = time.monotonic()
+        if state.robots_fetch is None and (state.robots_checked_at is None or now - state.robots_checked_at >= ROBOTS_TTL):
+            state.robots_checked_at = now
+            state.robots_fetch = asyncio.create_task(self._fetch_robots(url, state))
+        # Concurrent scrapes of the store share one fetch and wait for it, so none takes a
+        # slot before its Crawl-delay is known
+        if state.robots_fetch is not None:
+            await asyncio.shield(state.robots_fetch)
+
+    async def _fetch_robots(self, url: str, state: _DomainState) -> None:
+        parsed = urlparse(url)
+        delay = None
+        try:
+            client = await http_client_service.get_client()
+            response = await client.get(
+                f"{parsed.scheme}://{parsed.netloc}/robots.txt", headers={"User-Agent": USER_AGENT}, timeout=10.0
+            )
+            if response.status_code == 200:
+                robots = RobotFileParser()
+                robots.parse(_robots_lines(response.text))
+                delay = robots.crawl_delay(USER_AGENT)
+                delay = delay / 1000 if delay is not None else None
+                request_rate = robots.request_rate(USER_AGENT)
+                if request_rate and request_rate.requests:
+                    delay = max(delay or 0, request_rate.seconds / request_rate.requests)
+        except Exception as e:
+            logger.info("Could not read robots.txt for %s: %s", parsed.netloc, e)
+        finally:
+            state.robots_fetch = None
+        state.robots_delay = float(delay) if delay else None
+        state.retune()
+
+    async def acquire(self, url: str) -> float:
+        """Wait for the store's next request slot; returns the seconds waited."""
+        domain = self.domain_for(url)
+        state = await self._state(domain)
+        if RESPECT_ROBOTS:
+            await self._refresh_robots(url, state)
+        started = time.monotonic()
+        delay = state.bucket.reserve(started)
+        while delay > 0:
+            await asyncio.sleep(delay)
+            # A 429 seen while we slept pushes the slot back
+            delay = state.bucket.blocked_until - time.monotonic()
+        return time.monotonic() - started
+
+    def record_response(self, url: str, status_code: int, retry_after: Optional[str] = None) -> None:
+        """Adapt the store's pace to a response status."""
+        state = self._domains.get(self.domain_for(url))
+        if state is None:
+            return
+        if status_code in THROTTLE_STATUSES:
+            state.throttled += 1
+            state.factor = max(MIN_FACTOR, state.factor * BACKOFF_FACTOR)
+            state.retune()
+            wait = _retry_after_seconds(retry_after)
+            state.bucket.block(time.monotonic() + min(wait if wait is not None else state.interval(), MAX_RETRY_AFTER))
+            logger.warning("%s answered %s; slowing to %.3f req/s", self.domain_for(url), status_code, 1 / state.interval())
+        elif status_code < 400 and state.factor < 1.0:
+            state.factor = min(1.0, state.factor + RECOVERY_STEP)
+            state.retune()
+
+    async def set_policy(
+        self,
+        domain: str,
+        rate: Optional[float],
+        burst: Optional[int],
+        crawl_delay: Optional[float]
+    ) -> None:
+        """Store a domain's policy override (all None removes it) and apply it at once."""
+        domain = domain.lower()
+        if rate is None and burst is None and crawl_delay is None:
+            await domain_policy_repo.delete_policy(domain)
+        else:
+            await domain_policy_repo.save_policy(domain, rate, burst, crawl_delay)
+        self._db_policies = None
+        state = self._domains.get(domain)
+        if state is not None:
+            state.policy = await self._resolve_policy(domain)
+            state.retune()
+
+    async def get_domains(self) -> List[dict]:
+        """Every store with a configured policy or scraped by this process, with its live pace."""
+        domains = set(self._domains) | set(await self._policies())
+        domains |= {d for d, store in url_parser_service.STORE_PATTERNS.items() if "rate" in store or "crawl_delay" in store}
+        now = time.monotonic()
+        result = []
+        for domain in sorted(domains):
+            state = self._domains.get(domain)
+            policy = state.policy if state is not None else await self._resolve_policy(domain)
+            result.append({
+                "domain": domain,
+                "origin": policy.origin,
+                "rate": policy.rate,
+                "burst": policy.burst,
+                "crawl_delay": policy.crawl_delay,
+                "robots_crawl_delay": state.robots_delay if state else None,
+                "current_rate": round(1 / state.interval(), 4) if state else None,
+                "throttled": state.throttled if state else 0,
+                "paused_seconds": round(max(0.0, state.bucket.blocked_until - now), 1) if state else 0.0
+            })
+        return result
+
+
+rate_limiter = RateLimitService()
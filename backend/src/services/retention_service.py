@@ -0,0 +1,88 @@
+"""Retention Service - Background compaction of old price history."""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from src.repositories.database_repository import db_repo
+from src.repositories.price_repository import price_repo
+
+logger = logging.getLogger(__name__)
+
+# Retention tiers in days (overridable for Docker); 0 keeps a tier forever
+RAW_RETENTION_DAYS = float(os.environ.get("PRICE_RAW_RETENTION_DAYS", "90"))
+ERROR_RETENTION_DAYS = float(os.environ.get("PRICE_ERROR_RETENTION_DAYS", "7"))
+HOURLY_RETENTION_DAYS = float(os.environ.get("PRICE_HOURLY_RETENTION_DAYS", "365"))
+# Seconds between compaction runs; 0 disables the background job
+COMPACTION_INTERVAL = float(os.environ.get("COMPACTION_INTERVAL_SECONDS", "86400"))
+# First run waits this long so it does not compete with startup traffic
+STARTUP_DELAY_SECONDS = 300
+
+
+def retention_cutoff(days: float) -> Optional[datetime]:
+    """Oldest timestamp a tier still holds, or None when it is kept forever."""
+    return datetime.now() - timedelta(days=days) if days > 0 else None
+
+
+class RetentionService:
+    """
+    Keeps price history small as it ages.
+
+    Raw rows are already rolled up into hourly and daily buckets when they
+    are written, so compaction only deletes what has aged out: raw rows
+    after RAW_RETENTION_DAYS, failed-scrape rows after ERROR_RETENTION_DAYS
+    and hourly buckets after HOURLY_RETENTION_DAYS. Daily buckets and each
+    source's latest row are always kept.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if COMPACTION_INTERVAL <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def compact(self) -> Dict[str, int]:
+        """Apply the retention policy once. Returns rows deleted per tier."""
+        deleted = {"raw": 0, "errors": 0, "hourly": 0}
+        tiers = (
+            ("raw", RAW_RETENTION_DAYS, price_repo.prune_raw),
+            ("errors", ERROR_RETENTION_DAYS, price_repo.prune_errors),
+        )
+        for name, days, prune in tiers:
+            cutoff = retention_cutoff(days)
+            if cutoff is not None:
+                deleted[name] = await prune(cutoff.isoformat())
+
+        cutoff = retention_cutoff(HOURLY_RETENTION_DAYS)
+        if cutoff is not None:
+            deleted["hourly"] = await price_repo.prune_rollups("hour", cutoff.isoformat())
+
+        # Refresh query planner statistics after large deletes
+        await db_repo.execute("PRAGMA optimize")
+        logger.info(f"Compaction removed {deleted['raw']} raw, {deleted['errors']} error and {deleted['hourly']} hourly rows")
+        return deleted
+
+    async def _run(self) -> None:
+        await asyncio.sleep(STARTUP_DELAY_SECONDS)
+        while True:
+            try:
+                await self.compact()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Compaction error: {e}")
+            await asyncio.sleep(COMPACTION_INTERVAL)
+
+
+retention_service = RetentionService()
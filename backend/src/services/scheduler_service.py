@@ -0,0 +1,224 @@
+"""Scheduler Service - In-process scrape scheduler with adaptive per-source intervals."""
+
+import asyncio
+import heapq
+import logging
+import os
+import random
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from src.repositories.schedule_repository import schedule_repo
+from src.repositories.source_repository import source_repo
+from src.services.scraper_service import scraper_service
+
+logger = logging.getLogger(__name__)
+
+# Scheduler settings (overridable for Docker); intervals are in seconds
+# Off by default so deployments still running scrape_prices.py from cron don't scrape twice
+SCHEDULER_ENABLED = os.environ.get("SCHEDULER_ENABLED", "false").lower() in ("1", "true", "yes")
+DEFAULT_INTERVAL = float(os.environ.get("SCHEDULER_DEFAULT_INTERVAL", str(6 * 3600)))
+MIN_INTERVAL = float(os.environ.get("SCHEDULER_MIN_INTERVAL", "3600"))
+MAX_INTERVAL = float(os.environ.get("SCHEDULER_MAX_INTERVAL", str(3 * 86400)))
+JITTER = float(os.environ.get("SCHEDULER_JITTER", "0.1"))
+MAX_BATCH = int(os.environ.get("SCHEDULER_MAX_BATCH", "50"))
+REFRESH_SECONDS = float(os.environ.get("SCHEDULER_REFRESH_SECONDS", "60"))
+# Unchanged scrapes in a row before a source counts as stable and starts slowing down
+STABLE_RUNS = int(os.environ.get("SCHEDULER_STABLE_RUNS", "3"))
+
+# Adaptive cadence: a price change halves the interval, each unchanged run past STABLE_RUNS stretches it
+SPEEDUP_FACTOR = 0.5
+SLOWDOWN_FACTOR = 1.25
+
+
+def _to_iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+def _to_timestamp(iso: str) -> float:
+    return datetime.fromisoformat(iso).timestamp()
+
+
+class ScrapeScheduler:
+    """
+    Scrapes each source when it is due instead of all sources at once.
+
+    Keeps a min-heap of (next_due, source_id). Due sources are scraped in
+    batches through ScraperService.scrape_sources. Each source's interval
+    then adapts: halved when the price moved, and stretched by 25% for every
+    unchanged run once it has been unchanged STABLE_RUNS times in a row,
+    clamped to [MIN_INTERVAL, MAX_INTERVAL]. A source pinned with
+    set_interval keeps its base interval as-is. Intervals are jittered by
+    +/-JITTER so runs spread across the day. Sources skipped because their store's
+    circuit breaker is open are retried once it half-opens. Schedules
+    persist in source_schedule.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._heap: List[Tuple[float, str]] = []
+        self._schedules: Dict[str, dict] = {}
+        self._sources: Dict[str, dict] = {}
+        self._last_sync = 0.0
+        self._synced_once = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        if not SCHEDULER_ENABLED or self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def wake(self) -> None:
+        """Re-read sources and schedules now (call after sources change)."""
+        self._last_sync = 0.0
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _jittered(self, interval: float) -> float:
+        return interval * (1 + random.uniform(-JITTER, JITTER))
+
+    async def _sync(self) -> None:
+        """Load active sources, create schedules for new ones and rebuild the heap."""
+        sources = {s['id']: s for s in await source_repo.get_all_sources() if s['is_active']}
+        stored = {row['source_id']: row for row in await schedule_repo.get_all_schedules()}
+        now = time.time()
+
+        schedules: Dict[str, dict] = {}
+        created = []
+        for source_id in sources:
+            row = stored.get(source_id)
+            if row is None:
+                # On first start, spread existing sources over one interval; later additions run now
+                delay = random.uniform(0, DEFAULT_INTERVAL) if not self._synced_once else 0
+                row = {
+                    "source_id": source_id,
+                    "base_interval_seconds": None,
+                    "interval_seconds": DEFAULT_INTERVAL,
+                    "next_due_at": _to_iso(now + delay),
+                    "last_price": None,
+                    "unchanged_runs": 0
+                }
+                created.append(row)
+            schedules[source_id] = dict(row)
+        if created:
+            await schedule_repo.save_schedules(created)
+
+        self._sources = sources
+        self._schedules = schedules
+        self._heap = [(_to_timestamp(row["next_due_at"]), source_id) for source_id, row in schedules.items()]
+        heapq.heapify(self._heap)
+        self._last_sync = now
+        self._synced_once = True
+
+    def _pop_due(self, now: float) -> List[str]:
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < MAX_BATCH:
+            _, source_id = heapq.heappop(self._heap)
+            if source_id in self._schedules:
+                due.append(source_id)
+        return due
+
+    async def _run_due(self, source_ids: List[str]) -> None:
+        results = await scraper_service.scrape_sources(
+            [self._sources[source_id] for source_id in source_ids],
+            trigger="scheduler"
+        )
+        now = time.time()
+        updated = []
+        for detail in results["details"]:
+            row = self._schedules.get(detail["id"])
+            if row is None:
+                continue
+            if detail["status"] == "skipped":
+                # Store's circuit breaker is open: retry when it lets a probe through, interval unchanged
+                due_at = max(now, detail["retry_at"]) + random.uniform(0, JITTER * MIN_INTERVAL)
+                row["next_due_at"] = _to_iso(due_at)
+                heapq.heappush(self._heap, (due_at, detail["id"]))
+                updated.append(row)
+                continue
+            interval = row["interval_seconds"]
+            if detail["status"] == "success":
+                price = detail["price"]
+                if row["last_price"] is None:
+                    pass  # First observation: nothing to compare yet
+                elif price != row["last_price"]:
+                    interval *= SPEEDUP_FACTOR
+                    row["unchanged_runs"] = 0
+                else:
+                    row["unchanged_runs"] = (row["unchanged_runs"] or 0) + 1
+                    if row["unchanged_runs"] > STABLE_RUNS:
+                        interval *= SLOWDOWN_FACTOR
+                row["last_price"] = price
+            if row.get("base_interval_seconds"):
+                # Pinned: the API allows intervals below MIN_INTERVAL, so no adapting or clamping
+                row["interval_seconds"] = row["base_interval_seconds"]
+            else:
+                row["interval_seconds"] = min(MAX_INTERVAL, max(MIN_INTERVAL, interval))
+            due_at = now + self._jittered(row["interval_seconds"])
+            row["next_due_at"] = _to_iso(due_at)
+            heapq.heappush(self._heap, (due_at, detail["id"]))
+            updated.append(row)
+        await schedule_repo.save_schedules(updated)
+        logger.info(
+            f"Scheduled scrape: {results['success']} ok, {results['failed']} failed, "
+            f"{results['skipped']} skipped in {results['elapsed_seconds']}s"
+        )
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                now = time.time()
+                if now - self._last_sync >= REFRESH_SECONDS:
+                    await self._sync()
+
+                due = self._pop_due(now)
+                if due:
+                    await self._run_due(due)
+                    continue
+
+                next_due = self._heap[0][0] if self._heap else float("inf")
+                timeout = max(0.0, min(next_due, self._last_sync + REFRESH_SECONDS) - time.time())
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Scheduler error: {e}")
+                await asyncio.sleep(5)
+
+    async def set_interval(self, source_id: str, interval_seconds: Optional[float]) -> bool:
+        """Set (or with None, clear) a source's base interval. Resets its adaptive interval."""
+        row = await schedule_repo.get_schedule(source_id)
+        if row is None:
+            if await source_repo.get_source_by_id(source_id) is None:
+                return False
+            row = {"source_id": source_id, "last_price": None, "unchanged_runs": 0}
+        interval = interval_seconds or DEFAULT_INTERVAL
+        row["base_interval_seconds"] = interval_seconds
+        row["interval_seconds"] = interval
+        row["next_due_at"] = _to_iso(time.time() + self._jittered(interval))
+        await schedule_repo.save_schedules([row])
+        self.wake()
+        return True
+
+    async def get_schedules(self) -> List[dict]:
+        return await schedule_repo.get_all_schedules()
+
+
+scrape_scheduler = ScrapeScheduler()
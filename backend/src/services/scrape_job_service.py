@@ -0,0 +1,110 @@
+"""Scrape Job Service - Tracks scrape runs, their progress and per-phase timings."""
+
+import os
+from typing import Any, Dict, List, Optional
+
+from src.repositories.database_repository import WriteBatch
+from src.repositories.scrape_job_repository import scrape_job_repo, PHASES
+from src.services.circuit_breaker_service import CircuitOpenError
+
+# Finished jobs kept in the database
+JOBS_TO_KEEP = int(os.environ.get("SCRAPE_JOBS_KEEP", "200"))
+
+
+class ScrapeJobService:
+    """
+    Persists a scrape_jobs row per run and a result row per source.
+
+    Progress counters of running jobs are also held in memory, because
+    per-source result rows are written through the run's write batch and
+    only become visible when it flushes.
+    """
+
+    def __init__(self):
+        self._live: Dict[str, Dict[str, int]] = {}
+
+    async def create_job(self, trigger: str = "manual") -> str:
+        job_id = await scrape_job_repo.create_job(trigger)
+        await scrape_job_repo.prune_jobs(JOBS_TO_KEEP)
+        return job_id
+
+    async def start_job(self, job_id: str, total: int) -> None:
+        await scrape_job_repo.start_job(job_id, total)
+        self._live[job_id] = {"total": total, "completed": 0, "succeeded": 0, "failed": 0, "skipped": 0}
+
+    async def record_result(
+        self,
+        job_id: str,
+        source_id: str,
+        host: str,
+        outcome: Any,
+        timings: Dict[str, float],
+        batch: Optional[WriteBatch] = None
+    ) -> None:
+        failed = isinstance(outcome, Exception)
+        status = "skipped" if isinstance(outcome, CircuitOpenError) else "failed" if failed else "success"
+        progress = self._live.get(job_id)
+        if progress is not None:
+            progress["completed"] += 1
+            progress["succeeded" if status == "success" else status] += 1
+        await scrape_job_repo.add_result(
+            job_id,
+            source_id,
+            host,
+            status=status,
+            price=None if failed else outcome,
+            error=str(outcome) if failed else None,
+            timings=timings,
+            batch=batch
+        )
+
+    async def finish_job(self, job_id: str, results: Dict[str, Any]) -> None:
+        self._live.pop(job_id, None)
+        await scrape_job_repo.finish_job(
+            job_id,
+            status="completed",
+            succeeded=results["success"],
+            failed=results["failed"],
+            pages_fetched=results.get("pages_fetched", 0),
+            elapsed_seconds=results.get("elapsed_seconds", 0.0),
+            skipped=results.get("skipped", 0)
+        )
+
+    async def fail_job(self, job_id: str, error: str) -> None:
+        progress = self._live.pop(job_id, {})
+        await scrape_job_repo.finish_job(
+            job_id,
+            status="failed",
+            succeeded=progress.get("succeeded", 0),
+            failed=progress.get("failed", 0),
+            pages_fetched=0,
+            elapsed_seconds=0.0,
+            error=error,
+            skipped=progress.get("skipped", 0)
+        )
+
+    async def get_job(self, job_id: str) -> Optional[dict]:
+        """Job record with progress, phase totals, per-host breakdown and per-source results."""
+        job = await scrape_job_repo.get_job(job_id)
+        if not job:
+            return None
+        job["completed"] = job["succeeded"] + job["failed"] + (job["skipped"] or 0)
+        progress = self._live.get(job_id)
+        if progress is not None:
+            job.update(progress)
+        results = await scrape_job_repo.get_results(job_id)
+        job["phase_totals"] = {p: round(sum(r[p] or 0.0 for r in results), 2) for p in PHASES}
+        job["by_host"] = await scrape_job_repo.get_phase_totals_by_host(job_id)
+        job["results"] = results
+        return job
+
+    async def get_recent_jobs(self, limit: int = 20) -> List[dict]:
+        jobs = await scrape_job_repo.get_recent_jobs(limit)
+        for job in jobs:
+            job["completed"] = job["succeeded"] + job["failed"] + (job["skipped"] or 0)
+            if job["id"] in self._live:
+                job.update(self._live[job["id"]])
+        return jobs
+
+
+scrape_job_service = ScrapeJobService()
@@ -1,10 +1,32 @@
-import httpx
+import asyncio
+import hashlib
+import os
 import re
-from bs4 import BeautifulSoup
+import time
+import httpx
+from datetime import datetime
+from src.repositories.database_repository import db_repo, WriteBatch
 from src.repositories.source_repository import source_repo
 from src.repositories.price_repository import price_repo
+from src.repositories.page_cache_repository import page_cache_repo
 from src.services.alert_service import alert_service
-from typing import Dict, Any
+from src.services.http_client_service import http_client_service
+from src.services.extraction_service import extraction_service, element_end
+from src.services.url_parser_service import url_parser_service
+from src.services.rate_limit_service import rate_limiter, USER_AGENT
+from src.services.circuit_breaker_service import circuit_breaker, CircuitOpenError
+from src.services.scrape_job_service import scrape_job_service
+from typing import Dict, Any, List, Optional, Tuple
+
+# Concurrency limits for full scrape runs (overridable for Docker)
+MAX_CONCURRENCY = int(os.environ.get("SCRAPER_MAX_CONCURRENCY", "16"))
+PER_HOST_CONCURRENCY = int(os.environ.get("SCRAPER_PER_HOST_CONCURRENCY", "2"))
+# Early cut-off: stop downloading this many bytes after the price anchor is seen (0 = off)
+EARLY_CUTOFF_BYTES = int(os.environ.get("SCRAPER_EARLY_CUTOFF_BYTES", "0"))
+# Bytes of the previous chunk rescanned for an anchor split across chunks
+ANCHOR_OVERLAP_BYTES = 512
+# Buffered result writes per commit during full runs
+WRITE_BATCH_SIZE = int(os.environ.get("SCRAPER_WRITE_BATCH_SIZE", "200"))
 
 class ScraperService:
     def _clean_price(self, text: str) -> float:
@@ -28,65 +50,443 @@ class ScraperService:
                 pass
         raise ValueError(f"Could not extract price from '{text}'")
 
+    def _host_key(self, url: str) -> str:
+        """
+        Store key used for per-store concurrency, the circuit breaker and job
+        results: the rate limiter's domain, so all three agree on what a
+        store is.
+        """
+        return rate_limiter.domain_for(url)
+
     async def scrape_source(self, source_id: str) -> float:
+        """Scrape one source now, unless its store's circuit breaker is open (CircuitOpenError)."""
         source = await source_repo.get_source_by_id(source_id)
         if not source:
             raise ValueError("Source not found")
-        
-        url = source['url']
-        selector = source['css_selector']
-        
+        host = self._host_key(source['url'])
+        if not circuit_breaker.allow(host):
+            raise CircuitOpenError(host, circuit_breaker.retry_at(host))
+        return await self._scrape(source)
+
+    def _extract_prices(
+        self,
+        body: bytes,
+        encoding: Optional[str],
+        sources: List[dict],
+        currencies: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Apply each source's json_path and/or selector to one page.
+
+        A json_path is looked up in the page's JSON-LD / embedded JSON,
+        which is found by scanning the raw bytes, so no HTML tree is built;
+        the source's selector is only used when that finds no price.
+        Returns {source_id: price or ValueError}, so one bad selector
+        doesn't fail the other sources sharing the page. Currencies stated
+        in the structured data are put in `currencies`.
+        """
+        results: Dict[str, Any] = {}
+        path_errors: Dict[str, str] = {}
+        css_sources = []
+        structured = None
+        for source in sources:
+            json_path = source.get('json_path')
+            if json_path:
+                structured = structured or extraction_service.structured_data(body)
+                try:
+                    found = structured.find(json_path)
+                    if found is None:
+                        raise ValueError(f"No value found for json_path: {json_path}")
+                    value, currency = found
+                    results[source['id']] = float(value) if isinstance(value, (int, float)) else self._clean_price(str(value))
+                    if currency and currencies is not None and re.fullmatch(r'[A-Za-z]{3}', currency.strip()):
+                        currencies[source['id']] = currency.strip().upper()
+                    continue
+                except ValueError as e:
+                    path_errors[source['id']] = str(e)
+            css_sources.append(source)
+        if not css_sources:
+            return results
+
+        selectors = [source['css_selector'] for source in css_sources if source['css_selector']]
+        html = body.decode(encoding or "utf-8", errors="replace") if selectors else ""
+        texts = extraction_service.extract_texts(html, selectors) if selectors else {}
+        for source in css_sources:
+            selector = source['css_selector']
+            try:
+                if not selector:
+                    raise ValueError(path_errors.get(source['id'], "No CSS selector defined"))
+                price_text = texts.get(selector)
+                if price_text is None:
+                    raise ValueError(f"Element not found for selector: {selector}")
+                results[source['id']] = self._clean_price(price_text)
+            except ValueError as e:
+                results[source['id']] = e
+        return results
+
+    async def _download(
+        self,
+        url: str,
+        headers: dict,
+        anchor: Optional["re.Pattern[bytes]"] = None,
+        timings: Optional[Dict[str, float]] = None,
+        paced: bool = True
+    ) -> Tuple[httpx.Response, bytes, bool]:
+        """
+        GET a page, returning (response, body, truncated).
+
+        With an anchor and EARLY_CUTOFF_BYTES set, the body is streamed and
+        reading stops EARLY_CUTOFF_BYTES after the anchor first matches, as
+        long as the anchored element has closed by then; otherwise the whole
+        page is read.
+        Unless `paced` is False (the caller already waited), the request
+        waits for the store's rate limit first; the response status is fed
+        back to the limiter either way, and the outcome to the host's
+        circuit breaker. wait_ms / connect_ms / download_ms are added to
+        `timings` if given.
+        """
+        if paced:
+            waited = await rate_limiter.acquire(url)
+            if timings is not None:
+                timings["wait_ms"] = timings.get("wait_ms", 0.0) + waited * 1000
+        client = await http_client_service.get_client()
+        events: Dict[str, float] = {}
+
+        async def trace(event_name: str, info: dict) -> None:
+            events.setdefault(event_name, time.perf_counter())
+
+        started = time.perf_counter()
+        try:
+            response, body, truncated = await self._read(client, url, headers, anchor, {"trace": trace})
+        except httpx.TransportError as e:
+            circuit_breaker.record_failure(self._host_key(url), f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            if timings is not None:
+                # httpcore resolves DNS inside connect_tcp; no connect events means a reused connection
+                connect_started = events.get("connection.connect_tcp.started")
+                connect_done = events.get("connection.start_tls.complete") or events.get("connection.connect_tcp.complete")
+                connect_ms = (connect_done - connect_started) * 1000 if connect_started and connect_done else 0.0
+                total_ms = (time.perf_counter() - started) * 1000
+                timings["connect_ms"] = timings.get("connect_ms", 0.0) + connect_ms
+                timings["download_ms"] = timings.get("download_ms", 0.0) + total_ms - connect_ms
+        rate_limiter.record_response(url, response.status_code, response.headers.get("Retry-After"))
+        circuit_breaker.record_response(self._host_key(url), response.status_code)
+        return response, body, truncated
+
+    async def _read(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: dict,
+        anchor: Optional["re.Pattern[bytes]"],
+        extensions: dict
+    ) -> Tuple[httpx.Response, bytes, bool]:
+        if not anchor or EARLY_CUTOFF_BYTES <= 0:
+            response = await client.get(url, headers=headers, timeout=30.0, extensions=extensions)
+            return response, response.content, False
+
+        async with client.stream("GET", url, headers=headers, timeout=30.0, extensions=extensions) as response:
+            if response.status_code != 200:
+                await response.aread()
+                return response, response.content, False
+            body = bytearray()
+            anchor_at = None
+            stop_at = None
+            async for chunk in response.aiter_bytes():
+                # Only rescan the new chunk plus enough overlap to catch a split anchor
+                scan_from = max(0, len(body) - ANCHOR_OVERLAP_BYTES)
+                body.extend(chunk)
+                if anchor is not None and anchor_at is None:
+                    found = anchor.search(body, scan_from)
+                    if found is not None:
+                        anchor_at = found.start()
+                        stop_at = anchor_at + EARLY_CUTOFF_BYTES
+                if stop_at is not None and len(body) >= stop_at:
+                    if element_end(bytes(body), anchor_at) is not None:
+                        return response, bytes(body), True
+                    # The element isn't closed inside the window (or the match was not
+                    # a real start tag), so a cut here could truncate the price: read it all
+                    anchor = None
+                    stop_at = None
+            return response, bytes(body), False
+
+    async def _fetch_prices(
+        self,
+        sources: List[dict],
+        batch: Optional[WriteBatch] = None,
+        timings: Optional[Dict[str, float]] = None,
+        paced: bool = True,
+        currencies: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Download the page shared by `sources` once and extract every source's price.
+
+        Returns {source_id: price or exception}. Download errors are raised,
+        since they apply to every source on the page. Stored ETag /
+        Last-Modified validators are sent when every source has a cached
+        price; a 304, or a body identical to the last one, reuses the cached
+        prices without parsing. Phase times (ms) are added to `timings`.
+        `paced=False` means the caller already waited for the store's rate
+        limit (see _download). Currencies found in the page's structured
+        data are put in `currencies`.
+        """
+        timings = timings if timings is not None else {}
+        lead = sources[0]
+        caches: Dict[str, Optional[dict]] = {}
+        for source in sources:
+            cache = await page_cache_repo.get_entry(source['id'])
+            # A cached price is only valid for the selector / json_path it was extracted with
+            if cache and (
+                cache.get('css_selector') != source['css_selector']
+                or cache.get('json_path') != source.get('json_path')
+                or cache.get('last_price') is None
+            ):
+                cache = None
+            caches[source['id']] = cache
+        lead_cache = caches[lead['id']] or {}
+        conditional = all(caches.values())
+
+        headers = {"User-Agent": USER_AGENT}
+        if conditional:
+            if lead_cache.get('etag'):
+                headers["If-None-Match"] = lead_cache['etag']
+            if lead_cache.get('last_modified'):
+                headers["If-Modified-Since"] = lead_cache['last_modified']
+
+        # Early cut-off only makes sense when a single selector is looked for; structured
+        # data can sit anywhere in the page, so json_path sources read it whole
+        anchor = extraction_service.anchor_for(lead['css_selector']) if len(sources) == 1 and not lead.get('json_path') else None
+        response, body, truncated = await self._download(lead['url'], headers, anchor, timings, paced=paced)
+
+        prices: Dict[str, Any] = {}
+        currencies = currencies if currencies is not None else {}
+        if response.status_code == 304 and conditional:
+            digest = lead_cache['body_digest']
+            prices = {source_id: cache['last_price'] for source_id, cache in caches.items()}
+            currencies.update({source_id: cache['last_currency'] for source_id, cache in caches.items() if cache.get('last_currency')})
+        else:
+            response.raise_for_status()
+            digest = hashlib.sha256(body).hexdigest()
+            pending = []
+            for source in sources:
+                cache = caches[source['id']]
+                if cache and cache.get('body_digest') == digest:
+                    prices[source['id']] = cache['last_price']
+                    if cache.get('last_currency'):
+                        currencies[source['id']] = cache['last_currency']
+                else:
+                    pending.append(source)
+            if pending:
+                parse_started = time.perf_counter()
+                extracted = self._extract_prices(body, response.encoding, pending, currencies)
+                timings["parse_ms"] = (time.perf_counter() - parse_started) * 1000
+                if truncated and any(isinstance(price, Exception) for price in extracted.values()):
+                    # The anchor matched too early; retry with the whole page
+                    response, body, _ = await self._download(lead['url'], headers, timings=timings)
+                    response.raise_for_status()
+                    digest = hashlib.sha256(body).hexdigest()
+                    parse_started = time.perf_counter()
+                    extracted = self._extract_prices(body, response.encoding, pending, currencies)
+                    timings["parse_ms"] += (time.perf_counter() - parse_started) * 1000
+                prices.update(extracted)
+
+        # 304s may omit validators, so keep the previous ones in that case
+        etag = response.headers.get("ETag") or lead_cache.get('etag')
+        last_modified = response.headers.get("Last-Modified") or lead_cache.get('last_modified')
+        db_started = time.perf_counter()
+        for source in sources:
+            price = prices[source['id']]
+            if isinstance(price, Exception):
+                continue
+            await page_cache_repo.save_entry(
+                source['id'],
+                etag=etag,
+                last_modified=last_modified,
+                body_digest=digest,
+                css_selector=source['css_selector'],
+                last_price=price,
+                json_path=source.get('json_path'),
+                last_currency=currencies.get(source['id']),
+                batch=batch
+            )
+        timings["db_ms"] = (time.perf_counter() - db_started) * 1000
+        return prices
+
+    async def _scrape_group(
+        self,
+        sources: List[dict],
+        batch: Optional[WriteBatch] = None,
+        timings: Optional[Dict[str, Dict[str, float]]] = None,
+        wait_ms: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Scrape sources that share one page and record each result.
+
+        Returns {source_id: price or exception}. With a batch, result rows
+        are buffered and committed by the caller. If `timings` is given it
+        receives {source_id: {phase: ms}}; the shared page's fetch phases
+        are reported for every source on it. Pass `wait_ms` when the caller
+        has already waited for the store's rate limit.
+        """
+        page_timings: Dict[str, float] = {} if wait_ms is None else {"wait_ms": wait_ms}
+        currencies: Dict[str, str] = {}
         try:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-            async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
-                html = response.text
-
-            if not selector:
-                raise ValueError("No CSS selector defined")
-
-            soup = BeautifulSoup(html, "html.parser")
-            elements = soup.select(selector)
-            if not elements:
-                raise ValueError(f"Element not found for selector: {selector}")
-            
-            price_text = elements[0].get_text()
-            price = self._clean_price(price_text)
-            
-            await price_repo.add_price_record(source_id, price, success=True)
-            
-            # Check if this price triggers any alerts
-            await alert_service.check_price_against_alerts(
-                source_id=source_id,
-                current_price=price,
-                product_name=source.get('product_name', 'Product'),
-                store_name=source.get('store_name', 'Store'),
-                product_url=source.get('url')
+            outcomes = await self._fetch_prices(
+                sources, batch=batch, timings=page_timings, paced=wait_ms is None, currencies=currencies
             )
-            
-            return price
-            
         except Exception as e:
-            await price_repo.add_price_record(source_id, 0.0, success=False, error=str(e))
-            raise e
+            outcomes = {source['id']: e for source in sources}
 
-    async def scrape_all_active(self) -> Dict[str, Any]:
-        sources = await source_repo.get_all_sources()
-        results = {"success": 0, "failed": 0, "details": []}
-        
         for source in sources:
-            # Check is_active (sqlite returns 1 or 0)
-            if source['is_active']:
-                try:
-                    price = await self.scrape_source(source['id'])
-                    results["details"].append({"id": source['id'], "status": "success", "price": price})
-                    results["success"] += 1
-                except Exception as e:
-                    results["details"].append({"id": source['id'], "status": "failed", "error": str(e)})
-                    results["failed"] += 1
+            source_id = source['id']
+            outcome = outcomes[source_id]
+            source_timings = dict(page_timings)
+            if timings is not None:
+                timings[source_id] = source_timings
+            phase_started = time.perf_counter()
+            try:
+                if isinstance(outcome, Exception):
+                    raise outcome
+
+                # Check if this price triggers any alerts. Done before recording it, so the
+                # stateful alert kinds compare against earlier prices only
+                observed_at = datetime.now().isoformat()
+                await alert_service.check_price_against_alerts(
+                    source_id=source_id,
+                    current_price=outcome,
+                    product_name=source.get('product_name', 'Product'),
+                    store_name=source.get('store_name', 'Store'),
+                    product_url=source.get('url'),
+                    batch=batch,
+                    observed_at=observed_at
+                )
+                source_timings["alert_ms"] = (time.perf_counter() - phase_started) * 1000
+                phase_started = time.perf_counter()
+
+                await price_repo.add_price_record(
+                    source_id, outcome, success=True, batch=batch, timestamp=observed_at, currency=currencies.get(source_id)
+                )
+                source_timings["db_ms"] = source_timings.get("db_ms", 0.0) + (time.perf_counter() - phase_started) * 1000
+            except Exception as e:
+                outcomes[source_id] = e
+                await price_repo.add_price_record(source_id, 0.0, success=False, error=str(e), batch=batch)
+        return outcomes
+
+    async def _scrape(self, source: dict, batch: Optional[WriteBatch] = None) -> float:
+        """Fetch, parse and record the price for an already-loaded source row."""
+        outcome = (await self._scrape_group([source], batch=batch))[source['id']]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def scrape_all_active(
+        self,
+        max_concurrency: Optional[int] = None,
+        per_host_concurrency: Optional[int] = None,
+        job_id: Optional[str] = None,
+        trigger: str = "manual"
+    ) -> Dict[str, Any]:
+        """Scrape every active source (see scrape_sources)."""
+        try:
+            sources = [s for s in await source_repo.get_all_sources() if s['is_active']]
+        except Exception as e:
+            if job_id:
+                await scrape_job_service.fail_job(job_id, str(e))
+            raise
+        return await self.scrape_sources(sources, max_concurrency, per_host_concurrency, job_id, trigger)
+
+    async def scrape_sources(
+        self,
+        sources: List[dict],
+        max_concurrency: Optional[int] = None,
+        per_host_concurrency: Optional[int] = None,
+        job_id: Optional[str] = None,
+        trigger: str = "manual"
+    ) -> Dict[str, Any]:
+        """
+        Scrape the given source rows concurrently as one tracked job.
+
+        A scrape_jobs record is created unless `job_id` (from
+        scrape_job_service.create_job) is passed in; its id is returned as
+        job_id alongside per-source results with phase timings.
+
+        Sources whose URLs canonicalize to the same page are fetched once
+        and every attached selector is applied to that page. At most
+        `max_concurrency` pages are in flight overall, and at most
+        `per_host_concurrency` per store hostname; requests to each store are
+        also paced by its rate limit (see RateLimitService). Sources on a
+        host whose circuit breaker is open are skipped without a request or
+        a price row (status "skipped", with the "retry_at" epoch time).
+        Passing max_concurrency=1 gives the old one-at-a-time behaviour.
+        """
+        max_concurrency = max(1, max_concurrency or MAX_CONCURRENCY)
+        per_host_concurrency = max(1, per_host_concurrency or PER_HOST_CONCURRENCY)
+
+        started = time.perf_counter()
+        results = {"success": 0, "failed": 0, "skipped": 0, "details": []}
+        job_id = job_id or await scrape_job_service.create_job(trigger)
+        results["job_id"] = job_id
+
+        # Plan: one fetch per distinct canonical URL
+        pages: Dict[str, List[dict]] = {}
+        for source in sources:
+            pages.setdefault(url_parser_service.canonicalize_url(source['url']), []).append(source)
+
+        await scrape_job_service.start_job(job_id, len(sources))
+        batch = db_repo.batch(WRITE_BATCH_SIZE)
+        global_limit = asyncio.Semaphore(max_concurrency)
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+
+        async def run_page(canonical_url: str, page_sources: List[dict]) -> Dict[str, Any]:
+            host = self._host_key(canonical_url)
+            host_limit = host_limits.setdefault(host, asyncio.Semaphore(per_host_concurrency))
+            # Take the host slot and wait out the store's rate limit first, so one busy
+            # or throttled store can't hog global slots
+            async with host_limit:
+                timings: Dict[str, Dict[str, float]] = {}
+                if not circuit_breaker.allow(host):
+                    # Checked once the host slot is free, so queued pages see a breaker that opened meanwhile
+                    skipped = CircuitOpenError(host, circuit_breaker.retry_at(host))
+                    page_outcomes = {source['id']: skipped for source in page_sources}
+                else:
+                    waited = await rate_limiter.acquire(canonical_url)
+                    async with global_limit:
+                        page_outcomes = await self._scrape_group(
+                            page_sources, batch=batch, timings=timings, wait_ms=waited * 1000
+                        )
+            for source in page_sources:
+                await scrape_job_service.record_result(
+                    job_id, source['id'], host, page_outcomes[source['id']], timings.get(source['id'], {}), batch=batch
+                )
+            return page_outcomes
+
+        outcomes: Dict[str, Any] = {}
+        try:
+            for page_outcomes in await asyncio.gather(*(run_page(url, group) for url, group in pages.items())):
+                outcomes.update(page_outcomes)
+            await batch.flush()
+        except Exception as e:
+            await scrape_job_service.fail_job(job_id, str(e))
+            raise
+
+        # Details follow the source listing order
+        for source in sources:
+            outcome = outcomes[source['id']]
+            if isinstance(outcome, CircuitOpenError):
+                results["details"].append({"id": source['id'], "status": "skipped", "error": str(outcome), "retry_at": outcome.retry_at})
+                results["skipped"] += 1
+            elif isinstance(outcome, Exception):
+                results["details"].append({"id": source['id'], "status": "failed", "error": str(outcome)})
+                results["failed"] += 1
+            else:
+                results["details"].append({"id": source['id'], "status": "success", "price": outcome})
+                results["success"] += 1
+
+        skipped_pages = sum(isinstance(outcomes[group[0]['id']], CircuitOpenError) for group in pages.values())
+        results["pages_fetched"] = len(pages) - skipped_pages
+        results["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        await scrape_job_service.finish_job(job_id, results)
         return results
 
 scraper_service = ScraperService()
@@ -0,0 +1,54 @@
+"""Serialization Service - Fast JSON encoding for API responses."""
+
+import json
+import logging
+from typing import Any, Iterable
+
+from fastapi.responses import JSONResponse, Response
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson  # optional dependency: several times faster than the stdlib encoder
+except ImportError:
+    orjson = None
+    logger.warning("orjson is not installed; using the standard json encoder")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson (the app's default response class)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_rows_body(rows: Iterable[str], **envelope: Any) -> bytes:
+    """
+    Build {"success": true, "data": [...], **envelope} around rows that are
+    already JSON text (e.g. from SQLite's json_object()). The rows are
+    joined as-is, so no per-row Python objects are created or re-encoded.
+    """
+    head = dumps({"success": True, **envelope})
+    return b"".join((head[:-1], b',"data":[', ",".join(rows).encode("utf-8"), b"]}"))
+
+
+class JSONRowsResponse(Response):
+    """Response for rows pre-encoded as JSON text by the database."""
+
+    media_type = "application/json"
+
+    def __init__(self, rows: Iterable[str], status_code: int = 200, **envelope: Any):
+        super().__init__(content=json_rows_body(rows, **envelope), status_code=status_code)
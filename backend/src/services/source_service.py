@@ -1,14 +1,20 @@
 from src.repositories.source_repository import source_repo
 from src.schemas.source_schema import SourceCreate
-from typing import List
+from typing import List, Optional
+from src.services.scheduler_service import scrape_scheduler
 
 class SourceService:
     async def create_source(self, source: SourceCreate) -> str:
-        return await source_repo.create_source(source)
+        source_id = await source_repo.create_source(source)
+        scrape_scheduler.wake()
+        return source_id
 
     async def get_all_sources(self) -> List[dict]:
         return await source_repo.get_all_sources()
     
+    async def get_sources_json(self, product_id: Optional[str] = None) -> List[str]:
+        return await source_repo.get_sources_json(product_id)
+
     async def get_sources_by_product(self, product_id: str) -> List[dict]:
         return await source_repo.get_sources_by_product(product_id)
 
@@ -16,6 +22,8 @@ class SourceService:
         return await source_repo.get_source_by_id(source_id)
 
     async def delete_source(self, source_id: str) -> bool:
-        return await source_repo.delete_source(source_id)
+        deleted = await source_repo.delete_source(source_id)
+        scrape_scheduler.wake()
+        return deleted
 
 source_service = SourceService()
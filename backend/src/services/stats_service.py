@@ -0,0 +1,200 @@
+"""Stats Service - Price statistics per source and per product."""
+
+import bisect
+import math
+import os
+import statistics
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from src.repositories.price_repository import price_repo
+from src.repositories.source_repository import source_repo
+from src.services.cache_service import response_cache
+
+# Stats settings (overridable for Docker)
+MAX_CACHED_SOURCES = int(os.environ.get("PRICE_STATS_CACHE_SOURCES", "1024"))
+
+PERCENTILES = (10, 25, 75, 90)
+
+
+@dataclass
+class DailySeries:
+    """A source's daily closing prices and scrape counts as parallel columns, oldest first."""
+    days: List[str] = field(default_factory=list)
+    close: array = field(default_factory=lambda: array("d"))
+    count: array = field(default_factory=lambda: array("d"))
+    last_at: Optional[str] = None
+
+    def append(self, day: str, close: float, count: float) -> None:
+        self.days.append(day)
+        self.close.append(close)
+        self.count.append(count)
+
+    def truncate(self, day: str) -> None:
+        """Drop the days from `day` on, so they can be re-read."""
+        keep = bisect.bisect_left(self.days, day)
+        del self.days[keep:], self.close[keep:], self.count[keep:]
+
+    def since(self, day: Optional[str]) -> "DailySeries":
+        """The tail of the series from `day` on (no copy when nothing is cut)."""
+        start = bisect.bisect_left(self.days, day) if day else 0
+        if start == 0:
+            return self
+        return DailySeries(self.days[start:], self.close[start:], self.count[start:], self.last_at)
+
+
+@dataclass
+class _CacheEntry:
+    version: int
+    rebuild_version: int
+    series: DailySeries
+    results: Dict[Optional[str], dict] = field(default_factory=dict)  # by window start day
+
+
+def _round(value: Optional[float], digits: int = 2) -> Optional[float]:
+    return None if value is None or math.isnan(value) else round(float(value), digits)
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Linear interpolation between closest ranks."""
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(series: DailySeries) -> dict:
+    """
+    Statistics over a daily series. Every figure is over daily closing
+    prices (one point per day, whatever the scrape frequency), so min, max,
+    mean, median and the percentiles all describe the same distribution.
+    `observations` is the number of successful scrapes behind those days.
+    """
+    n = len(series.days)
+    if n == 0:
+        return {"points": 0}
+
+    close = series.close
+    current = close[-1]
+    ordered = sorted(close)
+    peak_index = max(range(n), key=close.__getitem__)
+    peak = close[peak_index]
+    changes = [(b - a) / a for a, b in zip(close, close[1:]) if a] if n > 1 else None
+    return {
+        "points": n,
+        "from": series.days[0],
+        "to": series.days[-1],
+        "observations": int(sum(series.count)),
+        "current": _round(current),
+        "currentAt": series.last_at,
+        "min": _round(ordered[0]),
+        "max": _round(peak),
+        "peakDay": series.days[peak_index],
+        "mean": _round(statistics.fmean(close)),
+        "median": _round(_percentile(ordered, 50)),
+        "percentiles": {f"p{q}": _round(_percentile(ordered, q)) for q in PERCENTILES},
+        "stdDev": _round(statistics.pstdev(close)),
+        "volatility": _round(statistics.pstdev(changes) * 100) if changes else None,
+        "dropFromPeak": _round((peak - current) / peak * 100) if peak else None,
+        "currentPercentile": _round(bisect.bisect_right(ordered, current) / n * 100, 1)
+    }
+
+
+class StatsService:
+    """
+    Price statistics from the daily rollups, so the cost depends on the
+    number of days tracked rather than on the number of raw rows (which are
+    also pruned after PRICE_RAW_RETENTION_DAYS, while daily rollups are kept).
+
+    Each source's series is loaded once and then kept up to date in place:
+    a successful scrape bumps the `prices:<source_id>` version in
+    response_cache, and the next request re-reads only the rollups from the
+    series' last day on (the day the scrape landed in, or a new one) and
+    appends them. Imported history can land on any day, so price_repo
+    bumps `price_rollups:<source_id>` for it and the series is reloaded.
+    """
+
+    def __init__(self, max_sources: int = MAX_CACHED_SOURCES):
+        self.max_sources = max_sources
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+
+    async def _load(self, source_id: str, series: DailySeries, start: Optional[str]) -> None:
+        """Append the daily rollups from `start` on (all of them when None), replacing those days."""
+        rows = await price_repo.get_rollups(source_id, "day", start, None)
+        if rows:
+            series.truncate(rows[0]["bucket_start"])
+        for row in rows:
+            series.append(row["bucket_start"], row["close"], row["count"])
+            series.last_at = row["last_at"]
+
+    async def _entry(self, source_id: str) -> _CacheEntry:
+        # Versions are read before querying, so a write landing meanwhile is picked up next time
+        version = response_cache.version(f"prices:{source_id}")
+        rebuild_version = response_cache.version(f"price_rollups:{source_id}")
+        entry = self._entries.get(source_id)
+        if entry is None or entry.rebuild_version != rebuild_version:
+            entry = _CacheEntry(version, rebuild_version, DailySeries())
+            await self._load(source_id, entry.series, None)
+            self._entries[source_id] = entry
+        elif entry.version != version:
+            await self._load(source_id, entry.series, entry.series.days[-1] if entry.series.days else None)
+            entry.version = version
+            entry.results.clear()
+        self._entries.move_to_end(source_id)
+        while len(self._entries) > self.max_sources:
+            self._entries.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def _window_start(days: Optional[int]) -> Optional[str]:
+        if days is None:
+            return None
+        return (datetime.now() - timedelta(days=days - 1)).strftime("%Y-%m-%dT00:00:00")
+
+    async def get_source_stats(self, source_id: str, days: Optional[int] = None) -> dict:
+        """Stats for one source over the last `days` days (all tracked history when None)."""
+        entry = await self._entry(source_id)
+        start = self._window_start(days)
+        if start not in entry.results:
+            entry.results[start] = summarize(entry.series.since(start))
+        return entry.results[start]
+
+    async def get_product_stats(self, product_id: str, days: Optional[int] = None) -> Tuple[dict, List[dict]]:
+        """
+        Stats for a product across its sources, plus each source's stats.
+
+        Each day uses the store with the lowest closing price that day (what
+        the product could be had for); observations count every store.
+        """
+        sources = await source_repo.get_sources_by_product(product_id)
+        start = self._window_start(days)
+        best: Dict[str, Tuple[float, float, str]] = {}
+        per_source = []
+        for source in sources:
+            entry = await self._entry(source["id"])
+            series = entry.series.since(start)
+            if start not in entry.results:
+                entry.results[start] = summarize(series)
+            per_source.append({"sourceId": source["id"], "storeName": source["store_name"], **entry.results[start]})
+            for day, close, count in zip(series.days, series.close, series.count):
+                current = best.get(day)
+                if current is None:
+                    best[day] = (close, count, series.last_at)
+                elif close < current[0]:
+                    best[day] = (close, current[1] + count, series.last_at)
+                else:
+                    best[day] = (current[0], current[1] + count, current[2])
+
+        merged = DailySeries()
+        for day in sorted(best):
+            close, count, _ = best[day]
+            merged.append(day, close, count)
+        if merged.days:
+            merged.last_at = best[merged.days[-1]][2]
+        return summarize(merged), per_source
+
+
+stats_service = StatsService()
@@ -1,29 +1,45 @@
 """URL Parser Service - Extracts store, identifier, and product info from URLs."""
 
 import re
-from urllib.parse import urlparse
-import httpx
-from bs4 import BeautifulSoup
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+from bs4 import BeautifulSoup, SoupStrainer
+from src.services.http_client_service import http_client_service
+from src.services.extraction_service import extraction_service
 from typing import Optional
 
 
 class UrlParserService:
     """Parses product URLs to auto-detect store, identifier, and product name."""
 
-    # Store patterns with CSS selectors (mirrored from frontend STORE_PRESETS)
+    # Store patterns with CSS selectors (mirrored from frontend STORE_PRESETS).
+    # Optional 'rate' (requests/s), 'burst' and 'crawl_delay' (seconds) set the
+    # store's scrape pace (see RateLimitService); a domain_policies row overrides them.
+    # Optional 'tracking_params' / 'tracking_prefixes' are query parameters that
+    # only track referrals on that store, so canonicalize_url drops them there.
     STORE_PATTERNS = {
         'amazon.com': {
             'name': 'Amazon',
             'selector': '.a-price .a-offscreen',
-            'identifier_type': 'ASIN'
+            'identifier_type': 'ASIN',
+            'rate': 0.5,
+            'burst': 1,
+            # Not psc / th: they pick the variant, and with it the price
+            'tracking_params': {
+                'ref', 'ref_', 'tag', 'qid', 'sr', 'keywords', 'crid', 'sprefix', 'dib', 'dib_tag',
+                'content-id', 'linkcode', 'linkid', 'camp', 'creative', 'creativeasin', '_encoding'
+            },
+            'tracking_prefixes': ('pd_rd_', 'pf_rd_', 'ascsubtag')
         },
         'bestbuy.com': {
             'name': 'Best Buy',
-            'selector': '.priceView-customer-price span'
+            'selector': '.priceView-customer-price span',
+            # intl=nosplash only skips the country picker
+            'tracking_params': {'irgwc', 'clickid', 'intl'}
         },
         'walmart.com': {
             'name': 'Walmart',
-            'selector': '[itemprop="price"]'
+            'selector': '[itemprop="price"]',
+            'tracking_params': {'wmlspartner', 'veh', 'sourceid', 'athcpid', 'athpgid', 'athznid'}
         },
         'target.com': {
             'name': 'Target',
@@ -43,10 +59,15 @@ class UrlParserService:
         },
         'ebay.com': {
             'name': 'eBay',
-            'selector': '.x-price-primary span'
+            'selector': '.x-price-primary span',
+            'tracking_prefixes': ('mkevt', 'mkcid', 'mkrid', 'campid', 'toolid')
         },
     }
 
+    # Ad and newsletter click ids that never change the page, on any store
+    TRACKING_PARAMS = {'gclid', 'gclsrc', 'dclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid'}
+    TRACKING_PREFIXES = ('utm_',)
+
     def _extract_hostname(self, url: str) -> Optional[str]:
         """Extract clean hostname from URL (removes www. prefix)."""
         try:
@@ -72,6 +93,54 @@ class UrlParserService:
                 return match.group(1).upper()
         return None
 
+    def _store_for(self, hostname: str) -> dict:
+        """The STORE_PATTERNS entry for a hostname (www. already removed), or {}."""
+        for domain, config in self.STORE_PATTERNS.items():
+            if hostname == domain or hostname.endswith("." + domain):
+                return config
+        return {}
+
+    def canonicalize_url(self, url: str) -> str:
+        """
+        Normalize a product URL so equivalent links compare equal.
+
+        Lowercases the host and drops www., default ports, fragments and
+        tracking query parameters (the universal ones everywhere, a store's
+        own only on that store), sorts what is left of the query, and
+        reduces Amazon product links to /dp/<ASIN>.
+        """
+        try:
+            parsed = urlparse(url.strip())
+        except Exception:
+            return url
+        scheme = (parsed.scheme or "https").lower()
+        hostname = (parsed.hostname or "").lower()
+        if hostname.startswith("www."):
+            hostname = hostname[4:]
+        netloc = hostname
+        if parsed.port and (scheme, parsed.port) not in (("http", 80), ("https", 443)):
+            netloc = f"{hostname}:{parsed.port}"
+
+        path = parsed.path or "/"
+        if "amazon." in hostname:
+            asin = self._extract_amazon_asin(path)
+            if asin:
+                path = f"/dp/{asin}"
+            # "/ref=..." path suffixes are tracking too
+            path = re.sub(r'/ref=[^/]*$', '', path)
+        if len(path) > 1:
+            path = path.rstrip("/")
+
+        store = self._store_for(hostname)
+        params = self.TRACKING_PARAMS | store.get('tracking_params', set())
+        prefixes = self.TRACKING_PREFIXES + store.get('tracking_prefixes', ())
+        query = sorted(
+            (key, value)
+            for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+            if key.lower() not in params and not key.lower().startswith(prefixes)
+        )
+        return urlunparse((scheme, netloc, path, "", urlencode(query), ""))
+
     def parse_url(self, url: str) -> dict:
         """
         Parse a product URL and return detected store info.
@@ -126,12 +195,13 @@ class UrlParserService:
             headers = {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
             }
-            async with httpx.AsyncClient(follow_redirects=True, timeout=15.0) as client:
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
-                html = response.text
+            client = await http_client_service.get_client()
+            response = await client.get(url, headers=headers, timeout=15.0)
+            response.raise_for_status()
+            html = response.text
 
-            soup = BeautifulSoup(html, "html.parser")
+            # Only the <title> tag is needed, so skip building the rest of the tree
+            soup = BeautifulSoup(html, extraction_service.parser, parse_only=SoupStrainer("title"))
             
             # Try <title> first
             title_tag = soup.find("title")
@@ -5,12 +5,17 @@ import InventoryManager from '@/components/features/products/InventoryManager';
 import Dashboard from '@/components/features/products/Dashboard';
 import { useProducts } from '@/hooks/useProducts';
 import { useSources } from '@/hooks/useSources';
+import { useDashboard } from '@/hooks/useDashboard';
 import { api } from '@/services/api';
 
 const App: React.FC = () => {
   const [activeTab, setActiveTab] = useState<Tab>(Tab.Inventory);
   const { products, addProduct, removeProduct, loading: productsLoading } = useProducts();
   const { sources, addSource, removeSource, loading: sourcesLoading } = useSources();
+  // Alerts and sparklines for every source in one request, reloaded when products or sources change
+  const { dashboard, refreshDashboard } = useDashboard(
+    products.map(p => p.id).join(',') + '|' + sources.map(s => s.id).join(',')
+  );
 
   const isLoading = productsLoading || sourcesLoading;
 
@@ -37,6 +42,8 @@ const App: React.FC = () => {
             onAddProduct={addProduct}
             onRemoveProduct={removeProduct}
             sources={sources}
+            dashboard={dashboard}
+            onRefreshDashboard={refreshDashboard}
             onAddSource={addSource}
             onRemoveSource={removeSource}
             onScrapeSource={api.scraper.scrapeSource}
@@ -44,7 +51,7 @@ const App: React.FC = () => {
         )}
 
         {activeTab === Tab.Dashboard && (
-          <Dashboard products={products} sources={sources} />
+          <Dashboard products={products} sources={sources} dashboard={dashboard} />
         )}
       </main>
 
@@ -1,8 +1,12 @@
 import React from 'react';
+import { AlertKind } from '@/types';
 
 interface Alert {
     id: string;
-    targetPrice: number;
+    kind?: AlertKind;
+    targetPrice: number | null;
+    dropPercent?: number | null;
+    windowDays?: number | null;
     isActive: boolean;
     isTriggered: boolean;
     triggeredAt: string | null;
@@ -15,8 +19,22 @@ interface AlertBadgeProps {
     onDelete: () => void;
 }
 
+const describeAlert = (alert: Alert): string => {
+    switch (alert.kind) {
+        case 'percent_drop':
+            return `Drop of ${alert.dropPercent}%`;
+        case 'all_time_low':
+            return 'New all-time low';
+        case 'below_moving_average':
+            return `Below ${alert.windowDays}-day average`;
+        default:
+            return `Below $${(alert.targetPrice ?? 0).toFixed(2)}`;
+    }
+};
+
 const AlertBadge: React.FC<AlertBadgeProps> = ({ alert, currentPrice, onEdit, onDelete }) => {
-    const { targetPrice, isActive, isTriggered, triggeredAt } = alert;
+    const { isActive, isTriggered, triggeredAt } = alert;
+    const label = describeAlert(alert);
 
     // Triggered state
     if (isTriggered) {
@@ -62,7 +80,7 @@ const AlertBadge: React.FC<AlertBadgeProps> = ({ alert, currentPrice, onEdit, on
             <div className="flex items-center gap-2 bg-gray-50 border border-gray-200 rounded-lg px-3 py-2 text-sm">
                 <i className="fas fa-pause-circle text-gray-400"></i>
                 <div className="flex-1">
-                    <span className="text-gray-500">Paused: Below ${targetPrice.toFixed(2)}</span>
+                    <span className="text-gray-500">Paused: {label}</span>
                 </div>
                 <div className="flex gap-1">
                     <button
@@ -90,7 +108,7 @@ const AlertBadge: React.FC<AlertBadgeProps> = ({ alert, currentPrice, onEdit, on
             <i className="fas fa-bell text-indigo-500"></i>
             <div className="flex-1">
                 <span className="font-medium text-indigo-700">
-                    Alert: Below ${targetPrice.toFixed(2)}
+                    Alert: {label}
                 </span>
                 {currentPrice && (
                     <p className="text-xs text-indigo-400">
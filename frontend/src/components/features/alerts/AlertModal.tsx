@@ -9,7 +9,7 @@ interface AlertModalProps {
     currentPrice?: number;
     existingAlert?: {
         id: string;
-        targetPrice: number;
+        targetPrice: number | null;
         webhookUrl: string | null;
         isActive: boolean;
     };
@@ -30,7 +30,7 @@ const AlertModal: React.FC<AlertModalProps> = ({
 
     useEffect(() => {
         if (existingAlert) {
-            setTargetPrice(existingAlert.targetPrice.toString());
+            setTargetPrice(existingAlert.targetPrice?.toString() ?? '');
             setWebhookUrl(existingAlert.webhookUrl || '');
         } else if (currentPrice) {
             // Suggest 10% below current price
@@ -13,33 +13,58 @@ import {
 import { api } from '@/services/api';
 
 interface PricePoint {
-    id: string;
+    id?: string;
     sourceId: string;
     price: number;
-    currency: string;
+    currency?: string;
     fetchedAt: string;
+    // Present on hourly/daily buckets
+    high?: number;
+    low?: number;
 }
 
 interface PriceChartProps {
     sourceId: string;
     storeName: string;
     accentColor?: string;
+    // Daily closing prices, oldest first, from the dashboard payload
+    sparkline: number[];
+}
+
+// PricePoint fields the chart and stats read, plus axis labels
+interface ChartPoint {
+    price: number;
+    high?: number;
+    low?: number;
+    date: string;
+    time: string;
+    displayPrice: number;
 }
 
 type TimeRange = '7d' | '30d' | '90d' | 'all';
 
-const PriceChart: React.FC<PriceChartProps> = ({ sourceId, storeName, accentColor = '#4f46e5' }) => {
+const RANGE_DAYS: Record<TimeRange, number | null> = { '7d': 7, '30d': 30, '90d': 90, 'all': null };
+
+const PriceChart: React.FC<PriceChartProps> = ({ sourceId, storeName, accentColor = '#4f46e5', sparkline }) => {
     const [priceHistory, setPriceHistory] = useState<PricePoint[]>([]);
-    const [loading, setLoading] = useState(true);
+    const [loading, setLoading] = useState(false);
     const [error, setError] = useState<string | null>(null);
     const [timeRange, setTimeRange] = useState<TimeRange>('30d');
+    // Collapsed charts draw the sparkline; full history is only fetched once expanded
+    const [expanded, setExpanded] = useState(false);
 
+    // The server picks raw points or hourly/daily buckets to suit the range
     useEffect(() => {
+        if (!expanded) return;
         const fetchHistory = async () => {
             setLoading(true);
             setError(null);
             try {
-                const data = await api.prices.getHistory(sourceId);
+                const days = RANGE_DAYS[timeRange];
+                const from = days === null
+                    ? undefined
+                    : new Date(Date.now() - days * 24 * 60 * 60 * 1000).toISOString();
+                const data = await api.prices.getHistory(sourceId, { from, resolution: 'auto' });
                 setPriceHistory(data);
             } catch (err: any) {
                 setError(err.message || 'Failed to load price history');
@@ -49,40 +74,30 @@ const PriceChart: React.FC<PriceChartProps> = ({ sourceId, storeName, accentColo
         };
 
         fetchHistory();
-    }, [sourceId]);
-
-    // Filter by time range
-    const filteredData = React.useMemo(() => {
-        if (priceHistory.length === 0) return [];
-
-        const now = new Date();
-        let cutoff = new Date();
-
-        switch (timeRange) {
-            case '7d':
-                cutoff.setDate(now.getDate() - 7);
-                break;
-            case '30d':
-                cutoff.setDate(now.getDate() - 30);
-                break;
-            case '90d':
-                cutoff.setDate(now.getDate() - 90);
-                break;
-            case 'all':
-            default:
-                cutoff = new Date(0); // Beginning of time
-        }
+    }, [sourceId, timeRange, expanded]);
 
+    // Already limited to the range and sorted oldest first by the server
+    const filteredData = React.useMemo<ChartPoint[]>(() => {
+        if (!expanded) {
+            return sparkline.map(price => ({ price, date: '', time: '', displayPrice: price }));
+        }
         return priceHistory
-            .filter(p => new Date(p.fetchedAt) >= cutoff)
             .map(p => ({
                 ...p,
                 date: new Date(p.fetchedAt).toLocaleDateString('en-US', { month: 'short', day: 'numeric' }),
                 time: new Date(p.fetchedAt).toLocaleTimeString('en-US', { hour: '2-digit', minute: '2-digit' }),
                 displayPrice: p.price
-            }))
-            .sort((a, b) => new Date(a.fetchedAt).getTime() - new Date(b.fetchedAt).getTime());
-    }, [priceHistory, timeRange]);
+            }));
+    }, [expanded, sparkline, priceHistory]);
+
+    const expandButton = (
+        <button
+            onClick={() => setExpanded(!expanded)}
+            className="px-2 py-1 text-xs font-medium rounded bg-gray-100 text-gray-600 hover:bg-gray-200 transition-all"
+        >
+            {expanded ? 'Collapse' : 'Full history'}
+        </button>
+    );
 
     // Stats
     const stats = React.useMemo(() => {
@@ -90,8 +105,8 @@ const PriceChart: React.FC<PriceChartProps> = ({ sourceId, storeName, accentColo
 
         const prices = filteredData.map(p => p.price);
         const current = prices[prices.length - 1];
-        const min = Math.min(...prices);
-        const max = Math.max(...prices);
+        const min = Math.min(...filteredData.map(p => p.low ?? p.price));
+        const max = Math.max(...filteredData.map(p => p.high ?? p.price));
         const avg = prices.reduce((a, b) => a + b, 0) / prices.length;
         const first = prices[0];
         const change = first > 0 ? ((current - first) / first) * 100 : 0;
@@ -124,7 +139,10 @@ const PriceChart: React.FC<PriceChartProps> = ({ sourceId, storeName, accentColo
     if (filteredData.length === 0) {
         return (
             <div className="bg-white rounded-xl border border-gray-100 p-6">
-                <h4 className="font-bold text-gray-700 mb-2">{storeName}</h4>
+                <div className="flex justify-between items-start mb-2">
+                    <h4 className="font-bold text-gray-700">{storeName}</h4>
+                    {expandButton}
+                </div>
                 <div className="text-center py-8 text-gray-400">
                     <i className="fas fa-chart-line text-4xl mb-2 opacity-30"></i>
                     <p>No price history data yet.</p>
@@ -140,22 +158,29 @@ const PriceChart: React.FC<PriceChartProps> = ({ sourceId, storeName, accentColo
             <div className="flex justify-between items-start mb-4">
                 <div>
                     <h4 className="font-bold text-gray-800">{storeName}</h4>
-                    <p className="text-xs text-gray-400">{filteredData.length} data points</p>
+                    <p className="text-xs text-gray-400">
+                        {expanded ? `${filteredData.length} data points` : `Daily close, last ${filteredData.length} days with prices`}
+                    </p>
                 </div>
-                {/* Time Range Selector */}
-                <div className="flex gap-1 bg-gray-100 rounded-lg p-1">
-                    {(['7d', '30d', '90d', 'all'] as TimeRange[]).map(range => (
-                        <button
-                            key={range}
-                            onClick={() => setTimeRange(range)}
-                            className={`px-2 py-1 text-xs font-medium rounded transition-all ${timeRange === range
-                                ? 'bg-white text-gray-800 shadow-sm'
-                                : 'text-gray-500 hover:text-gray-700'
-                                }`}
-                        >
-                            {range === 'all' ? 'All' : range.toUpperCase()}
-                        </button>
-                    ))}
+                <div className="flex items-center gap-2">
+                    {/* Time Range Selector */}
+                    {expanded && (
+                        <div className="flex gap-1 bg-gray-100 rounded-lg p-1">
+                            {(['7d', '30d', '90d', 'all'] as TimeRange[]).map(range => (
+                                <button
+                                    key={range}
+                                    onClick={() => setTimeRange(range)}
+                                    className={`px-2 py-1 text-xs font-medium rounded transition-all ${timeRange === range
+                                        ? 'bg-white text-gray-800 shadow-sm'
+                                        : 'text-gray-500 hover:text-gray-700'
+                                        }`}
+                                >
+                                    {range === 'all' ? 'All' : range.toUpperCase()}
+                                </button>
+                            ))}
+                        </div>
+                    )}
+                    {expandButton}
                 </div>
             </div>
 
@@ -195,6 +220,7 @@ const PriceChart: React.FC<PriceChartProps> = ({ sourceId, storeName, accentColo
                         </defs>
                         <CartesianGrid strokeDasharray="3 3" vertical={false} stroke="#f0f0f0" />
                         <XAxis
+                            hide={!expanded}
                             dataKey="date"
                             axisLine={false}
                             tickLine={false}
@@ -219,6 +245,9 @@ const PriceChart: React.FC<PriceChartProps> = ({ sourceId, storeName, accentColo
                                 return [`$${numValue.toFixed(2)}`, 'Price'];
                             }}
                             labelFormatter={(label, payload) => {
+                                if (!expanded) {
+                                    return 'Daily close';
+                                }
                                 if (payload && payload[0]) {
                                     return `${label} at ${payload[0].payload.time}`;
                                 }
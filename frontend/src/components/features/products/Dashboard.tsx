@@ -1,10 +1,11 @@
 import React, { useState } from 'react';
-import { Product, Source } from '@/types';
+import { DashboardProduct, Product, Source } from '@/types';
 import PriceChart from '@/components/features/charts/PriceChart';
 
 interface DashboardProps {
   products: Product[];
   sources: Source[];
+  dashboard: DashboardProduct[];
 }
 
 // Color palette for charts
@@ -17,14 +18,13 @@ const CHART_COLORS = [
   '#dc2626', // red
 ];
 
-const Dashboard: React.FC<DashboardProps> = ({ products, sources }) => {
+const Dashboard: React.FC<DashboardProps> = ({ products, sources, dashboard }) => {
   const [selectedProductId, setSelectedProductId] = useState<string | null>(null);
 
   // Get sources for the selected product
   const selectedProduct = products.find(p => p.id === selectedProductId);
-  const productSources = selectedProductId
-    ? sources.filter(s => s.productId === selectedProductId)
-    : [];
+  // Charts open on the dashboard's sparklines, so selecting a product costs no extra requests
+  const productSources = dashboard.find(p => p.id === selectedProductId)?.sources ?? [];
 
   return (
     <div className="space-y-8 animate-fadeIn">
@@ -102,6 +102,7 @@ const Dashboard: React.FC<DashboardProps> = ({ products, sources }) => {
                   key={source.id}
                   sourceId={source.id}
                   storeName={source.storeName}
+                  sparkline={source.sparkline}
                   accentColor={CHART_COLORS[index % CHART_COLORS.length]}
                 />
               ))}
@@ -1,5 +1,5 @@
-import React, { useState, useEffect } from 'react';
-import { Product, Source, IdentifierType } from '@/types';
+import React, { useState, useMemo } from 'react';
+import { Product, Source, IdentifierType, DashboardProduct } from '@/types';
 import { api } from '@/services/api';
 import AlertModal from '../alerts/AlertModal';
 import AlertBadge from '../alerts/AlertBadge';
@@ -22,6 +22,8 @@ interface InventoryManagerProps {
   onAddProduct: (product: any) => Promise<{ id: string }>;
   onRemoveProduct: (id: string) => Promise<void>;
   sources: Source[];
+  dashboard: DashboardProduct[];
+  onRefreshDashboard: () => Promise<void>;
   onAddSource: (source: any) => Promise<void>;
   onRemoveSource: (id: string) => Promise<void>;
   onScrapeSource: (sourceId: string) => Promise<{ price: number }>;
@@ -32,6 +34,8 @@ const InventoryManager: React.FC<InventoryManagerProps> = ({
   onAddProduct,
   onRemoveProduct,
   sources,
+  dashboard,
+  onRefreshDashboard,
   onAddSource,
   onRemoveSource,
   onScrapeSource
@@ -55,25 +59,18 @@ const InventoryManager: React.FC<InventoryManagerProps> = ({
   const [scrapingStatus, setScrapingStatus] = useState<Record<string, { loading: boolean; result?: string; error?: string }>>({});
 
   // Alerts state
-  const [alerts, setAlerts] = useState<Record<string, any[]>>({});  // keyed by sourceId
   const [alertModalOpen, setAlertModalOpen] = useState(false);
   const [alertModalSource, setAlertModalSource] = useState<{ sourceId: string; productId: string; productName: string; storeName: string; currentPrice?: number } | null>(null);
   const [editingAlert, setEditingAlert] = useState<any | null>(null);
 
-  // Fetch alerts when a product is expanded
-  useEffect(() => {
-    if (expandedProductId) {
-      const productSources = sources.filter(s => s.productId === expandedProductId);
-      productSources.forEach(async (source) => {
-        try {
-          const sourceAlerts = await api.alerts.list(source.id);
-          setAlerts(prev => ({ ...prev, [source.id]: sourceAlerts }));
-        } catch (e) {
-          console.error('Failed to fetch alerts for source', source.id);
-        }
-      });
-    }
-  }, [expandedProductId, sources]);
+  // Every source's alerts come with the dashboard payload (one request, not one per source)
+  const alerts = useMemo(() => {
+    const bySource: Record<string, any[]> = {};
+    dashboard.forEach(p => p.sources.forEach(s => {
+      bySource[s.id] = s.alerts;
+    }));
+    return bySource;
+  }, [dashboard]);
 
   const handleScrapeSource = async (sourceId: string) => {
     setScrapingStatus(prev => ({ ...prev, [sourceId]: { loading: true } }));
@@ -282,15 +279,12 @@ const InventoryManager: React.FC<InventoryManagerProps> = ({
       });
     }
 
-    // Refresh alerts for this source
-    const sourceAlerts = await api.alerts.list(alertModalSource.sourceId);
-    setAlerts(prev => ({ ...prev, [alertModalSource.sourceId]: sourceAlerts }));
+    await onRefreshDashboard();
   };
 
-  const handleDeleteAlert = async (alertId: string, sourceId: string) => {
+  const handleDeleteAlert = async (alertId: string) => {
     await api.alerts.delete(alertId);
-    const sourceAlerts = await api.alerts.list(sourceId);
-    setAlerts(prev => ({ ...prev, [sourceId]: sourceAlerts }));
+    await onRefreshDashboard();
   };
 
   const identifierOptions: IdentifierType[] = ['EAN', 'UPC', 'ASIN', 'MPN', 'SKU'];
@@ -461,6 +455,20 @@ const InventoryManager: React.FC<InventoryManagerProps> = ({
                         <div>
                           <h4 className="font-bold text-gray-800">{p.name}</h4>
                           <p className="text-sm text-gray-500 font-mono">{p.identifierValue}</p>
+                          {/* Cheapest store per currency */}
+                          {p.bestPrices && p.bestPrices.length > 0 && (
+                            <div className="flex flex-wrap gap-1 mt-1">
+                              {p.bestPrices.map(best => (
+                                <span
+                                  key={best.currency}
+                                  className="text-xs bg-green-50 text-green-700 px-2 py-0.5 rounded"
+                                  title={`Checked ${new Date(best.fetchedAt).toLocaleString()}`}
+                                >
+                                  Best: {best.price.toFixed(2)} {best.currency} at {best.storeName}
+                                </span>
+                              ))}
+                            </div>
+                          )}
                         </div>
                       </div>
                       <div className="flex items-center gap-2">
@@ -568,7 +576,7 @@ const InventoryManager: React.FC<InventoryManagerProps> = ({
                                           alert={alert}
                                           currentPrice={status?.result ? parseFloat(status.result.replace('$', '')) : undefined}
                                           onEdit={() => handleEditAlert(alert, s, p)}
-                                          onDelete={() => handleDeleteAlert(alert.id, s.id)}
+                                          onDelete={() => handleDeleteAlert(alert.id)}
                                         />
                                       ))}
                                     </div>
@@ -0,0 +1,24 @@
+import { useState, useEffect } from 'react';
+import { api } from '@/services/api';
+import { DashboardProduct } from '@/types';
+
+// Products with sources, latest prices, alerts and sparklines from one request.
+// Reloaded whenever `key` changes (e.g. when products or sources are added or removed).
+export const useDashboard = (key: string) => {
+    const [dashboard, setDashboard] = useState<DashboardProduct[]>([]);
+
+    const fetchDashboard = async () => {
+        try {
+            const data = await api.dashboard.get();
+            setDashboard(data);
+        } catch (err) {
+            console.error(err);
+        }
+    };
+
+    useEffect(() => {
+        fetchDashboard();
+    }, [key]);
+
+    return { dashboard, refreshDashboard: fetchDashboard };
+};
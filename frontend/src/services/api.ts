@@ -1,3 +1,5 @@
+import { AlertKind, DashboardProduct, Product } from '@/types';
+
 // In development, use explicit localhost. In production (Docker), nginx proxies /api/ to backend
 const API_BASE_URL = import.meta.env.VITE_API_URL || (import.meta.env.DEV ? 'http://localhost:8000/api' : '/api');
 
@@ -34,7 +36,8 @@ async function fetchJson<T>(endpoint: string, options: RequestInit = {}): Promis
 
 export const api = {
     products: {
-        list: () => fetchJson<any[]>('/products/'),
+        // Products with their bestPrices
+        list: () => fetchJson<Product[]>('/products/'),
         create: (product: any) => fetchJson<{ id: string }>('/products/', {
             method: 'POST',
             body: JSON.stringify(product),
@@ -62,19 +65,43 @@ export const api = {
             method: 'POST',
         }),
         // Scrape all active sources
-        scrapeAll: () => fetchJson<{ success: number; failed: number; details: any[] }>('/scraper/run-sync', {
+        scrapeAll: () => fetchJson<{ jobId: string; success: number; failed: number; skipped: number; pagesFetched: number; elapsedSeconds: number; details: any[] }>('/scraper/run-sync', {
             method: 'POST',
         }),
     },
     prices: {
-        // Get price history for a source
-        getHistory: (sourceId: string) => fetchJson<Array<{
-            id: string;
-            sourceId: string;
-            price: number;
-            currency: string;
-            fetchedAt: string;
-        }>>(`/prices/${sourceId}`),
+        // Get price history for a source. With from/to/resolution the server returns
+        // raw points or hourly/daily OHLC buckets (price = bucket close), oldest first
+        getHistory: (sourceId: string, range?: {
+            from?: string;
+            to?: string;
+            resolution?: 'auto' | 'raw' | 'hour' | 'day';
+        }) => {
+            const params = new URLSearchParams();
+            if (range?.from) params.set('from', range.from);
+            if (range?.to) params.set('to', range.to);
+            if (range) params.set('resolution', range.resolution || 'auto');
+            const query = params.toString() ? `?${params.toString()}` : '';
+            return fetchJson<Array<{
+                id?: string;
+                sourceId: string;
+                price: number;
+                currency?: string;
+                fetchedAt: string;
+                open?: number;
+                high?: number;
+                low?: number;
+                close?: number;
+                count?: number;
+            }>>(`/prices/${sourceId}${query}`);
+        },
+    },
+    dashboard: {
+        // Products with sources, latest prices, alerts and sparklines in one request
+        get: (sparklineDays?: number) => {
+            const query = sparklineDays ? `?sparklineDays=${sparklineDays}` : '';
+            return fetchJson<DashboardProduct[]>(`/dashboard${query}`);
+        },
     },
     alerts: {
         // List alerts (optionally filtered)
@@ -84,7 +111,10 @@ export const api = {
                 id: string;
                 productId: string;
                 sourceId: string;
-                targetPrice: number;
+                kind: AlertKind;
+                targetPrice: number | null;
+                dropPercent: number | null;
+                windowDays: number | null;
                 webhookUrl: string | null;
                 isActive: boolean;
                 isTriggered: boolean;
@@ -96,7 +126,10 @@ export const api = {
         create: (alert: {
             productId: string;
             sourceId: string;
-            targetPrice: number;
+            kind?: AlertKind;
+            targetPrice?: number;
+            dropPercent?: number;
+            windowDays?: number;
             webhookUrl?: string;
         }) => fetchJson<{ id: string }>('/alerts/', {
             method: 'POST',
@@ -105,6 +138,8 @@ export const api = {
         // Update alert
         update: (id: string, update: {
             targetPrice?: number;
+            dropPercent?: number;
+            windowDays?: number;
             webhookUrl?: string;
             isActive?: boolean;
         }) => fetchJson<void>(`/alerts/${id}`, {
@@ -6,6 +6,8 @@ export interface Product {
   name: string;
   identifierType: IdentifierType;
   identifierValue: string;
+  createdAt?: string;
+  bestPrices?: BestPrice[]; // Cheapest store per currency (from the product list)
 }
 
 export interface Source {
@@ -22,6 +24,38 @@ export interface PriceRecord {
   sourceId: string;
 }
 
+export interface DashboardSource extends Source {
+  jsonPath: string | null;
+  isActive: boolean;
+  latestPrice: {
+    price: number;
+    fetchedAt: string;
+    success: boolean;
+    error: string | null;
+    lastSuccessPrice: number | null;
+    lastSuccessAt: string | null;
+  } | null;
+  alertState: { active: number; triggered: number; lowestTarget: number | null };
+  alerts: any[];
+  sparkline: number[]; // Daily closing prices, oldest first
+}
+
+export interface DashboardProduct extends Product {
+  sources: DashboardSource[];
+}
+
+export type AlertKind = 'target' | 'percent_drop' | 'all_time_low' | 'below_moving_average';
+
+export interface BestPrice {
+  productId: string;
+  sourceId: string;
+  storeName: string;
+  url: string;
+  price: number;
+  currency: string;
+  fetchedAt: string;
+}
+
 export enum Tab {
   Inventory = 'inventory',
   Dashboard = 'dashboard'